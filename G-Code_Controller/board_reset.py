@@ -0,0 +1,315 @@
+"""
+Remise en place automatique du plateau en fin de partie.
+
+1. Affectation : chaque case de la position initiale reçoit une pièce de même type et de
+   même couleur, prise sur le plateau (pièce déplacée) ou dans la zone de capture. Les
+   pièces déjà sur leur case ne bougent pas ; les autres vont à la case la plus proche
+   (glouton), puis des échanges deux à deux réduisent la distance totale. Une pièce en
+   trop sur le plateau part dans la zone de capture.
+2. Dépendances : une pièce n'est posée que sur une case vide, la pièce qui l'occupe doit
+   partir avant. Un cycle (a1 -> b1 et b1 -> a1) est cassé par un tampon : une pièce du
+   cycle passe par un emplacement libre de la zone de capture.
+3. Ordre : plus proche voisin depuis la position de l'outil, puis 2-opt (inversion de
+   sous-suites qui respectent les dépendances) sur la distance totale parcourue.
+4. Le plan est enregistré dans une seule séquence (MotionSequence), envoyée en flux
+   par run_sequence.
+
+Le plan naïf de comparaison place les pièces case par case (a1, b1, ... h8), en
+repoussant seulement les transferts bloqués.
+
+Usage (plan seul, d'après robot_state.json et capture_zone.jsonl) :
+    python board_reset.py
+"""
+
+import math
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from gcode_program import capture_slot_position, estimate_steps, pick_and_place
+from motion_sequence import MotionSequence
+
+RESET = "remise en place"  # Type de séquence (statistiques, watchdog)
+BACK_RANK = ('rook', 'knight', 'bishop', 'queen', 'king', 'bishop', 'knight', 'rook')
+FILES = 'abcdefgh'
+
+
+def starting_position():
+    """Position initiale : case -> {'color', 'type'}."""
+    position = {}
+    for color, back, pawns in (('white', '1', '2'), ('black', '8', '7')):
+        for file, piece_type in zip(FILES, BACK_RANK):
+            position[f"{file}{back}"] = {"color": color, "type": piece_type}
+            position[f"{file}{pawns}"] = {"color": color, "type": "pawn"}
+    return position
+
+
+def square_order(square):
+    """Ordre de lecture du plateau : a1, b1, ... h1, a2, ... h8."""
+    return (int(square[1]), FILES.index(square[0]))
+
+
+@dataclass
+class Transfer:
+    """Une prise et dépose. Emplacement : ('square', 'e4') ou ('slot', (is_white, index))."""
+    piece: dict
+    source: Tuple[str, object]
+    target: Tuple[str, object]
+    source_xy: Tuple[float, float]
+    target_xy: Tuple[float, float]
+
+    @property
+    def distance(self):
+        return math.dist(self.source_xy, self.target_xy)
+
+    def __str__(self):
+        def name(place):
+            kind, ref = place
+            return ref if kind == 'square' else f"zone {'B' if ref[0] else 'N'}{ref[1] + 1}"
+        return f"{self.piece.get('type') or '?'} {self.piece.get('color')}: {name(self.source)} -> {name(self.target)}"
+
+
+def assign(sources, targets):
+    """
+    Affecte des sources à des cibles [(ref, (x, y))] : paires les plus proches d'abord,
+    puis échanges de cibles tant qu'ils réduisent la distance totale.
+
+    Returns:
+        ([(source, target)], sources restantes, cibles restantes)
+    """
+    pairs = sorted(((math.dist(s[1], t[1]), i, j) for i, s in enumerate(sources) for j, t in enumerate(targets)))
+    used_sources, used_targets, matched = set(), set(), []
+    for _, i, j in pairs:
+        if i not in used_sources and j not in used_targets:
+            used_sources.add(i)
+            used_targets.add(j)
+            matched.append([sources[i], targets[j]])
+    improved = True
+    while improved:
+        improved = False
+        for a in range(len(matched)):
+            for b in range(a + 1, len(matched)):
+                (sa, ta), (sb, tb) = matched[a], matched[b]
+                if math.dist(sa[1], tb[1]) + math.dist(sb[1], ta[1]) < math.dist(sa[1], ta[1]) + math.dist(sb[1], tb[1]) - 1e-9:
+                    matched[a][1], matched[b][1] = tb, ta
+                    improved = True
+    return ([tuple(pair) for pair in matched],
+            [s for i, s in enumerate(sources) if i not in used_sources],
+            [t for j, t in enumerate(targets) if j not in used_targets])
+
+
+def route_length(order, start=None):
+    """Distance parcourue (mm) : à vide jusqu'à chaque prise, puis chargée jusqu'à la dépose."""
+    total, position = 0.0, start
+    for transfer in order:
+        if position is not None:
+            total += math.dist(position, transfer.source_xy)
+        total += transfer.distance
+        position = transfer.target_xy
+    return total
+
+
+def blockers(transfers):
+    """transfert -> transfert qui doit libérer sa case cible avant lui."""
+    leaving = {t.source: t for t in transfers if t.source[0] == 'square'}
+    return {id(t): leaving[t.target] for t in transfers if t.target in leaving and leaving[t.target] is not t}
+
+
+def is_valid(order, blocked_by):
+    done = set()
+    for transfer in order:
+        blocker = blocked_by.get(id(transfer))
+        if blocker is not None and id(blocker) not in done:
+            return False
+        done.add(id(transfer))
+    return True
+
+
+def nearest_neighbour(transfers, start, blocked_by):
+    order, done, position = [], set(), start
+    remaining = list(transfers)
+    while remaining:
+        ready = [t for t in remaining
+                 if blocked_by.get(id(t)) is None or id(blocked_by[id(t)]) in done]
+        ready = ready or remaining  # Ne devrait pas arriver : les cycles sont cassés avant
+        nearest = min(ready, key=lambda t: math.dist(position, t.source_xy) if position else 0.0)
+        order.append(nearest)
+        done.add(id(nearest))
+        remaining.remove(nearest)
+        position = nearest.target_xy
+    return order
+
+
+def two_opt(order, start, blocked_by):
+    """Inverse des sous-suites tant que la distance baisse et que les dépendances tiennent."""
+    best = route_length(order, start)
+    improved = True
+    while improved:
+        improved = False
+        for i in range(len(order) - 1):
+            for j in range(i + 1, len(order)):
+                candidate = order[:i] + order[i:j + 1][::-1] + order[j + 1:]
+                length = route_length(candidate, start)
+                if length < best - 1e-9 and is_valid(candidate, blocked_by):
+                    order, best, improved = candidate, length, True
+    return order
+
+
+def in_square_order(transfers, blocked_by):
+    """Plan naïf : case cible par case cible, un transfert bloqué attend son tour."""
+    def key(t):
+        kind, ref = t.target
+        return (0, square_order(ref)) if kind == 'square' else (1, ref)
+    pending, order, done = sorted(transfers, key=key), [], set()
+    while pending:
+        for transfer in pending:
+            blocker = blocked_by.get(id(transfer))
+            if blocker is None or id(blocker) in done:
+                break
+        pending.remove(transfer)
+        order.append(transfer)
+        done.add(id(transfer))
+    return order
+
+
+class ResetPlan:
+    """Transferts ordonnés, plan naïf de comparaison et pièces introuvables."""
+
+    def __init__(self, robot, order, naive, missing, start):
+        self.robot = robot
+        self.order = order
+        self.naive = naive
+        self.missing = missing     # [(case, pièce attendue)] sans pièce disponible
+        self.start = start         # Position (x, y) de l'outil au départ
+
+    def sequence(self, order=None):
+        robot = self.robot
+        sequence = MotionSequence(robot.tool_position, z_key=robot.z_key)
+        if sequence.z is None:
+            sequence.move_z(robot.Z_SAFE)  # Hauteur inconnue : monter avant le premier XY
+        for transfer in self.order if order is None else order:
+            pick_and_place(sequence, robot, transfer.source_xy, transfer.target_xy)
+        return sequence
+
+    def duration(self, order=None):
+        return estimate_steps(self.robot, self.sequence(order).steps, self.robot.tool_position)
+
+    def report(self):
+        planned, naive = route_length(self.order, self.start), route_length(self.naive, self.start)
+        planned_time, naive_time = self.duration(), self.duration(self.naive)
+        print(f"[RESET] {len(self.order)} transferts")
+        for i, transfer in enumerate(self.order, 1):
+            print(f"[RESET] {i:>2}. {transfer}")
+        print(f"[RESET] Distance: {planned:.0f} mm (naïf {naive:.0f} mm, -{naive - planned:.0f} mm) ; "
+              f"durée prévue {planned_time:.1f}s (naïf {naive_time:.1f}s)")
+        for square, piece in self.missing:
+            print(f"[RESET] Pièce introuvable pour {square}: {piece['type']} {piece['color']}")
+        return {'transfers': len(self.order), 'distance': planned, 'naive_distance': naive,
+                'duration': planned_time, 'naive_duration': naive_time}
+
+
+def plan_reset(robot) -> ResetPlan:
+    """Plan de remise en place depuis robot.board_state et la zone de capture."""
+    start_position = starting_position()
+    board = robot.board_state
+    zone = robot.capture_zone
+    xy = robot.uci_to_coordinates
+
+    def slot_xy(slot):
+        return capture_slot_position(robot, *slot)
+
+    # Cases à remplir et pièces à déplacer (plateau puis zone de capture)
+    targets, sources = {}, {}
+    for square, piece in start_position.items():
+        current = board.get(square)
+        if not current or (current.get('color'), current.get('type')) != (piece['color'], piece['type']):
+            targets.setdefault((piece['color'], piece['type']), []).append((('square', square), xy(square)))
+    for square, piece in board.items():
+        if start_position.get(square) != {'color': piece.get('color'), 'type': piece.get('type')}:
+            sources.setdefault((piece.get('color'), piece.get('type')), []).append((('square', square), xy(square)))
+    for is_white, index, piece in zone.occupied():
+        color = piece.get('color') or ('white' if is_white else 'black')
+        sources.setdefault((color, piece.get('type')), []).append((('slot', (is_white, index)), slot_xy((is_white, index))))
+
+    transfers, surplus, missing = [], [], []
+    unfilled_by_color = {}
+    for (color, piece_type), group in targets.items():
+        matched, left, unfilled = assign(sources.pop((color, piece_type), []), group)
+        transfers += [(source, target, {'color': color, 'type': piece_type}) for source, target in matched]
+        surplus += [(source, {'color': color, 'type': piece_type}) for source in left]
+        unfilled_by_color.setdefault(color, []).extend(unfilled)
+    for (color, piece_type), group in sources.items():
+        surplus += [(source, {'color': color, 'type': piece_type}) for source in group]
+
+    # Pièces de type inconnu (anciens états : seuls les compteurs étaient sauvegardés)
+    for color, unfilled in unfilled_by_color.items():
+        wildcards = [(source, piece) for source, piece in surplus if piece['color'] == color and piece['type'] is None]
+        matched, _, unfilled = assign([source for source, _ in wildcards], unfilled)
+        used = {source[0] for source, _ in matched}
+        surplus = [(source, piece) for source, piece in surplus if source[0] not in used]
+        for source, target in matched:
+            transfers.append((source, target, dict(start_position[target[0][1]])))
+        missing += [(target[0][1], start_position[target[0][1]]) for target in unfilled]
+
+    # Emplacements libres : pièces en trop (plateau) et tampons des cycles
+    free = [(is_white, index) for is_white in (True, False) for index in zone.free_slots(is_white)]
+
+    def take_free_slot(near, is_white):
+        if not free:
+            return None
+        slot = min(free, key=lambda s: (s[0] != is_white, math.dist(near, slot_xy(s))))
+        free.remove(slot)
+        return slot
+
+    plan = [Transfer(piece, source[0], target[0], source[1], target[1]) for source, target, piece in transfers]
+    for source, piece in surplus:
+        if source[0][0] == 'square':
+            slot = take_free_slot(source[1], piece['color'] == 'white')
+            if slot is None:
+                print(f"[RESET] Zone de capture pleine : {piece['type']} en {source[0][1]} laissé en place")
+                continue
+            plan.append(Transfer(piece, source[0], ('slot', slot), source[1], slot_xy(slot)))
+
+    plan = break_cycles(plan, take_free_slot, slot_xy)
+    blocked_by = blockers(plan)
+    start = robot.tool_position[:2] if robot.tool_position else None
+    order = two_opt(nearest_neighbour(plan, start, blocked_by), start, blocked_by)
+    return ResetPlan(robot, order, in_square_order(plan, blocked_by), missing, start)
+
+
+def break_cycles(plan, take_free_slot, slot_xy):
+    """Coupe chaque cycle de dépendances en faisant passer une de ses pièces par un tampon."""
+    while True:
+        blocked_by = blockers(plan)
+        cycle = find_cycle(plan, blocked_by)
+        if cycle is None:
+            return plan
+        transfer = cycle[0]
+        buffer = take_free_slot(transfer.source_xy, transfer.piece.get('color') == 'white')
+        if buffer is None:
+            print(f"[RESET] Aucun emplacement libre pour casser le cycle de {transfer}")
+            return plan
+        parked = Transfer(transfer.piece, transfer.source, ('slot', buffer), transfer.source_xy, slot_xy(buffer))
+        resumed = Transfer(transfer.piece, ('slot', buffer), transfer.target, slot_xy(buffer), transfer.target_xy)
+        plan = [t for t in plan if t is not transfer] + [parked, resumed]
+
+
+def find_cycle(plan, blocked_by) -> Optional[list]:
+    for transfer in plan:
+        seen, current = [], transfer
+        while current is not None and id(current) not in {id(t) for t in seen}:
+            seen.append(current)
+            current = blocked_by.get(id(current))
+        if current is not None:
+            return seen[[id(t) for t in seen].index(id(current)):]
+    return None
+
+
+def main():
+    from robot_chess_controller import ChessRobotController
+
+    robot = ChessRobotController()
+    plan_reset(robot).report()
+
+
+if __name__ == "__main__":
+    main()
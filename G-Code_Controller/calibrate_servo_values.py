@@ -6,6 +6,8 @@ Teste différentes valeurs d'angle pour déterminer UP et DOWN
 import serial
 import time
 
+from serial_io import open_firmware
+
 def calibrate_servo(port='COM3', baudrate=115200):
     """
     Calibre le servo en testant différentes valeurs d'angle
@@ -19,11 +21,7 @@ def calibrate_servo(port='COM3', baudrate=115200):
     try:
         # Connexion
         print(f"Connexion au port {port}...")
-        ser = serial.Serial(port=port, baudrate=baudrate, timeout=2)
-        time.sleep(2)
-
-        # Vider le buffer
-        ser.read_all()
+        ser, _, _ = open_firmware(port, baudrate)  # Attend que la carte réponde
 
         print("[OK] Connecté\n")
 
@@ -226,9 +224,7 @@ def manual_test(port='COM3', baudrate=115200):
     print("="*70)
 
     try:
-        ser = serial.Serial(port=port, baudrate=baudrate, timeout=2)
-        time.sleep(2)
-        ser.read_all()
+        ser, _, _ = open_firmware(port, baudrate)
 
         print("\nConnecté. Entrez des valeurs S (0-180) pour tester.")
         print("Tapez 'quit' pour quitter.\n")
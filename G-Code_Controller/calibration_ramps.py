@@ -9,14 +9,42 @@ import time
 import configparser
 import os
 
+from serial_io import SerialIO, open_firmware, BUSY
+
+
+def update_config_section(path, section, values):
+    """Met à jour (ou ajoute) des clés d'une section d'un fichier .ini ligne par ligne."""
+    with open(path, encoding='utf-8') as f:
+        lines = f.read().splitlines()
+    remaining = dict(values)
+    start = next((i for i, line in enumerate(lines) if line.strip() == f"[{section}]"), None)
+    if start is None:
+        lines += ["", f"[{section}]"]
+        start = len(lines) - 1
+    end = start + 1
+    while end < len(lines) and not lines[end].strip().startswith('['):
+        key = lines[end].split('=', 1)[0].strip()
+        if '=' in lines[end] and key in remaining:
+            lines[end] = f"{key} = {remaining.pop(key)}"
+        end += 1
+    # Nouvelles clés à la fin de la section (avant les lignes vides qui la séparent de la suivante)
+    while end > start + 1 and not lines[end - 1].strip():
+        end -= 1
+    lines[end:end] = [f"{key} = {value}" for key, value in remaining.items()]
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("\n".join(lines) + "\n")
+
 
 class RampCalibrator:
     """Calibrateur de rampes d'accélération pour le robot d'échecs."""
     
     def __init__(self, config_file='robot_config.ini'):
         self.ser = None
+        self.io = None    # Lecteur série (réponses associées aux commandes)
+        self.config_file = config_file
         self.config = self.load_config(config_file)
         self.firmware = "MARLIN"  # Par défaut, peut être changé en "GRBL"
+        self.tuned = {}  # Rampes réglées pendant la session, écrites dans [KINEMATICS] à la sauvegarde
         
     def load_config(self, config_file):
         """Charge la configuration depuis robot_config.ini"""
@@ -43,30 +71,20 @@ class RampCalibrator:
         """Établit la connexion série."""
         port = port or self.config['SERIAL'].get('port', 'COM3')
         baudrate = baudrate or int(self.config['SERIAL'].get('baudrate', '115200'))
-        timeout = float(self.config['SERIAL'].get('timeout', '2'))
+        reset = self.config['SERIAL'].get('reset', 'true').lower() == 'true'
         
         print(f"\n[CONNEXION] {port} @ {baudrate} bauds...")
         
         try:
-            self.ser = serial.Serial(
-                port=port,
-                baudrate=baudrate,
-                timeout=timeout
-            )
-            
-            # Attendre l'initialisation du contrôleur
-            time.sleep(2)
-            
-            # Vider le buffer
-            self.flush_serial()
+            # Attend la réponse du contrôleur (bannière, M115 / $I) et détecte le firmware
+            self.ser, firmware, banner = open_firmware(port, baudrate, reset=reset)
+            if banner:
+                print(f"[STARTUP] {' | '.join(banner)[:100]}...")
+            self.firmware = firmware.upper()
+            print(f"[INFO] Firmware détecté: {self.firmware}")
             
-            # Lire le message de démarrage
-            if self.ser.in_waiting:
-                startup = self.ser.read(self.ser.in_waiting).decode(errors='ignore')
-                print(f"[STARTUP] {startup[:100]}...")
-            
-            # Détecter le firmware
-            self.detect_firmware()
+            self.io = SerialIO(self.ser, firmware).start()
+            self.io.subscribe(lambda kind, line: print(f"    {line}"), (BUSY,))
             
             print("[OK] Connexion réussie ✓")
             return True
@@ -76,64 +94,33 @@ class RampCalibrator:
             return False
     
     def flush_serial(self):
-        """Vide les buffers série."""
-        if self.ser:
+        """Vide les buffers série (avant le démarrage du lecteur), sinon attend les réponses en cours."""
+        if self.io:
+            self.io.flush(timeout=5.0)
+        elif self.ser:
             self.ser.reset_input_buffer()
             self.ser.reset_output_buffer()
     
-    def detect_firmware(self):
-        """Détecte le type de firmware (GRBL ou Marlin)."""
-        # Tester avec une commande GRBL
-        response = self.send_gcode("$I", wait_response=True)
-        
-        if response and ("Grbl" in response or "grbl" in response):
-            self.firmware = "GRBL"
-            print("[INFO] Firmware détecté: GRBL")
-        else:
-            # Tester avec Marlin
-            response = self.send_gcode("M115", wait_response=True)
-            if response and "FIRMWARE" in response.upper():
-                self.firmware = "MARLIN"
-                print("[INFO] Firmware détecté: MARLIN")
-            else:
-                print("[INFO] Firmware non détecté, utilisation de MARLIN par défaut")
-                self.firmware = "MARLIN"
-    
-    def send_gcode(self, cmd, wait_response=True):
+    def send_gcode(self, cmd, wait_response=True, timeout=10.0):
         """
         Envoie une commande G-code et attend la réponse.
-        Utilise decode(errors='ignore') pour éviter les erreurs UTF-8.
+        Retourne les lignes reçues pour cette commande (données puis ok / erreur) ;
+        les messages spontanés du firmware (busy, températures) n'en font pas partie.
         """
-        if not self.ser or not self.ser.is_open:
+        if not self.io or not self.ser or not self.ser.is_open:
             print("[ERREUR] Pas de connexion active")
             return None
         
         try:
-            # Envoyer la commande
-            self.ser.write(f"{cmd}\n".encode())
-            
             if not wait_response:
+                self.io.send(cmd)
                 return None
             
-            # Attendre et lire la réponse
-            time.sleep(0.1)
-            response_lines = []
-            timeout_count = 0
-            
-            while timeout_count < 10:  # Max 1 seconde d'attente
-                if self.ser.in_waiting:
-                    line = self.ser.readline().decode(errors='ignore').strip()
-                    if line:
-                        response_lines.append(line)
-                        # Vérifier si on a reçu un OK ou une erreur
-                        if 'ok' in line.lower() or 'error' in line.lower():
-                            break
-                    timeout_count = 0
-                else:
-                    time.sleep(0.1)
-                    timeout_count += 1
-            
-            return '\n'.join(response_lines)
+            command = self.io.request(cmd, timeout)
+            if command is None:
+                print(f"[ERREUR] Pas de réponse à {cmd} après {timeout:.0f}s")
+                return None
+            return command.response()
             
         except Exception as e:
             print(f"[ERREUR] Envoi commande: {e}")
@@ -197,6 +184,7 @@ class RampCalibrator:
         else:  # MARLIN
             self.send_gcode(f"M201 X{accel_x} Y{accel_y}")
         
+        self.tuned['accel'] = min(accel_x, accel_y)  # L'axe le plus lent limite les diagonales
         print(f"[SET] Accélération: X={accel_x} Y={accel_y} mm/s²")
     
     def set_max_speed(self, speed_x, speed_y=None):
@@ -220,6 +208,7 @@ class RampCalibrator:
             print("[INFO] GRBL n'a pas de paramètre jerk direct")
         else:  # MARLIN
             self.send_gcode(f"M205 X{jerk_x} Y{jerk_y}")
+            self.tuned['jerk'] = min(jerk_x, jerk_y)
             print(f"[SET] Jerk: X={jerk_x} Y={jerk_y} mm/s")
     
     def save_settings(self):
@@ -229,6 +218,22 @@ class RampCalibrator:
         else:  # MARLIN
             self.send_gcode("M500")
             print("[OK] Paramètres sauvegardés en EEPROM (M500)")
+        self.save_kinematics()
+
+    def save_kinematics(self):
+        """
+        Écrit les rampes réglées dans [KINEMATICS] de robot_config.ini : le contrôleur
+        s'en sert pour prévoir la durée des coups. Les autres lignes (et commentaires)
+        du fichier sont conservées.
+        """
+        values = dict(self.tuned)
+        if self.firmware == "GRBL":
+            values['jerk'] = 0  # Pas de jerk : chaque mouvement part et s'arrête à vitesse nulle
+        if not values or not os.path.exists(self.config_file):
+            return
+        update_config_section(self.config_file, 'KINEMATICS', values)
+        print(f"[OK] Rampes enregistrées dans {self.config_file} [KINEMATICS]: "
+              + ", ".join(f"{key}={value}" for key, value in values.items()))
     
     def test_movement(self, distance=100, speed=None):
         """
@@ -270,8 +275,9 @@ class RampCalibrator:
         """Attend que le mouvement soit terminé."""
         if self.firmware == "GRBL":
             for _ in range(100):  # Max 10 secondes
-                response = self.send_gcode("?")
-                if response and "Idle" in response:
+                # '?' est une commande temps réel : réponse '<Idle|...>' sans ok
+                status = self.io.query_status(0.1)
+                if status and status.startswith("<Idle"):
                     break
                 time.sleep(0.1)
         else:  # MARLIN
@@ -451,6 +457,9 @@ Commandes disponibles:
     
     def close(self):
         """Ferme la connexion série."""
+        if self.io:
+            self.io.close()
+            self.io = None
         if self.ser and self.ser.is_open:
             self.ser.close()
             print("[INFO] Connexion fermée")
@@ -0,0 +1,158 @@
+"""
+Occupation de la zone de capture : emplacements tenus en mémoire, journal en ajout seul.
+
+Chaque couleur a 16 emplacements (disposition : gcode_program.capture_slot_position).
+Une pièce prise va dans l'emplacement libre le plus proche de la case de capture ;
+un emplacement est libéré quand la pièce est remise sur le plateau.
+
+Journal JSONL (capture_zone.jsonl, dossier courant comme robot_state.json) :
+    {"op": "take", "white": true, "index": 3, "piece": {"type": "pawn", "color": "white"}}
+    {"op": "free", "white": true, "index": 3}
+    {"op": "clear"}
+    {"op": "snapshot", "slots": [[true, 3, {"type": "pawn", "color": "white"}], ...]}
+
+- L'enregistrement est écrit avant la mise à jour en mémoire : après un crash, relire
+  le journal redonne l'occupation physique.
+- Au-delà de compact_every enregistrements, le fichier est remplacé (de façon atomique)
+  par un instantané d'une ligne.
+- Une dernière ligne tronquée (crash pendant l'écriture) est ignorée.
+"""
+
+import json
+import math
+import os
+
+SLOTS_PER_COLOR = 16
+
+
+class CaptureAllocator:
+    """
+    Args:
+        slot_position: slot_position(is_white, index) -> (x, y) de l'emplacement
+        path: Journal de la zone de capture
+        compact_every: Enregistrements au-delà desquels le journal est compacté
+    """
+
+    def __init__(self, slot_position, path="capture_zone.jsonl", compact_every=64,
+                 slots_per_color=SLOTS_PER_COLOR):
+        self.slot_position = slot_position
+        self.path = path
+        self.compact_every = compact_every
+        self.slots_per_color = slots_per_color
+        self.slots = {}     # (is_white, index) -> {'type', 'color'}
+        self.records = 0    # Lignes du journal depuis la dernière compaction
+        self.needs_newline = False  # Dernière ligne tronquée : la terminer avant d'ajouter
+
+    # ==================== JOURNAL ====================
+
+    def load(self):
+        """Relit le journal ; False s'il n'existe pas encore."""
+        try:
+            with open(self.path, "r") as f:
+                text = f.read()
+        except OSError:
+            return False
+        lines = text.splitlines()
+        self.needs_newline = bool(text) and not text.endswith("\n")
+        self.slots = {}
+        self.records = 0
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # Ligne tronquée
+            self.apply(record)
+            self.records += 1
+        if self.records > self.compact_every:
+            self.compact()
+        return True
+
+    def apply(self, record):
+        op = record.get("op")
+        if op == "take":
+            self.slots[(record["white"], record["index"])] = record.get("piece") or {}
+        elif op == "free":
+            self.slots.pop((record["white"], record["index"]), None)
+        elif op in ("clear", "snapshot"):
+            self.slots = {(white, index): piece or {} for white, index, piece in record.get("slots", [])}
+
+    def record(self, record):
+        """Écrit l'enregistrement dans le journal, puis l'applique en mémoire."""
+        try:
+            with open(self.path, "a") as f:
+                f.write(("\n" if self.needs_newline else "") + json.dumps(record) + "\n")
+            self.needs_newline = False
+            self.records += 1
+        except OSError as e:
+            print(f"[CAPTURE] Journal non écrit: {e}")
+        self.apply(record)
+        if self.records > self.compact_every:
+            self.compact()
+
+    def compact(self):
+        """Remplace le journal par un instantané de l'occupation (remplacement atomique)."""
+        snapshot = {"op": "snapshot",
+                    "slots": [[white, index, piece] for (white, index), piece in sorted(self.slots.items())]}
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                f.write(json.dumps(snapshot) + "\n")
+            os.replace(tmp_path, self.path)
+            self.records = 1
+            self.needs_newline = False
+        except OSError as e:
+            print(f"[CAPTURE] Compaction du journal impossible: {e}")
+
+    # ==================== EMPLACEMENTS ====================
+
+    def free_slots(self, is_white):
+        return [index for index in range(self.slots_per_color) if (is_white, index) not in self.slots]
+
+    def occupied(self, is_white=None):
+        """[(is_white, index, pièce)] des emplacements occupés (d'une couleur ou de toutes)."""
+        return [(white, index, piece) for (white, index), piece in sorted(self.slots.items())
+                if is_white is None or white == is_white]
+
+    def count(self, is_white):
+        return sum(1 for white, _ in self.slots if white == is_white)
+
+    def allocate(self, is_white, piece=None, near=None):
+        """
+        Réserve un emplacement pour une pièce de la couleur is_white.
+
+        Args:
+            piece: {'type', 'color'} mémorisé avec l'emplacement
+            near: (x, y) de la case de capture : l'emplacement libre le plus proche est choisi
+
+        Returns:
+            Index de l'emplacement (au-delà de 15 si la zone est pleine)
+        """
+        free = self.free_slots(is_white)
+        if not free:
+            index = self.slots_per_color
+            while (is_white, index) in self.slots:
+                index += 1
+            print(f"[CAPTURE] Zone {'blanche' if is_white else 'noire'} pleine, emplacement #{index + 1} hors zone")
+        elif near is None:
+            index = free[0]
+        else:
+            index = min(free, key=lambda i: math.dist(near, self.slot_position(is_white, i)))
+        self.take(is_white, index, piece)
+        return index
+
+    def take(self, is_white, index, piece=None):
+        """Occupe un emplacement donné (pièce rangée par la remise en place du plateau)."""
+        self.record({"op": "take", "white": is_white, "index": index,
+                     "piece": {key: piece[key] for key in ('type', 'color') if key in piece} if piece else {}})
+
+    def release(self, is_white, index):
+        """Libère un emplacement (pièce remise sur le plateau) ; retourne la pièce qu'il contenait."""
+        piece = self.slots.get((is_white, index))
+        if piece is not None:
+            self.record({"op": "free", "white": is_white, "index": index})
+        return piece
+
+    def clear(self):
+        """Zone vidée (plateau remis en place à la main)."""
+        if self.slots:
+            self.record({"op": "clear"})
@@ -12,13 +12,13 @@ class ChessWithRobot:
     À utiliser en remplacement ou en extension de chess_with_validation.py
     """
     
-    def __init__(self, enable_robot: bool = True, serial_port: str = 'COM3'):
+    def __init__(self, enable_robot: bool = True, serial_port: str = None):
         """
         Initialise le contrôle du robot.
         
         Args:
             enable_robot: Active/désactive le robot physique
-            serial_port: Port série du robot
+            serial_port: Port série du robot (None : port de [SERIAL] dans robot_config.ini)
         """
         self.robot_enabled = enable_robot
         self.robot = None
@@ -32,7 +32,7 @@ class ChessWithRobot:
         """Initialise la connexion avec le robot."""
         try:
             print("[ROBOT] Initialisation du contrôleur robot...")
-            self.robot = ChessRobotController(port=self.serial_port, baudrate=115200)
+            self.robot = ChessRobotController(port=self.serial_port)
             
             if self.robot.connect():
                 print("[ROBOT] Robot connecté et prêt ✓")
@@ -106,7 +106,7 @@ def __init__(self, screen, pieces_src, square_coords, square_length):
     # NOUVEAU: Initialiser le robot
     self.robot_controller = ChessWithRobot(
         enable_robot=True,  # Mettre False pour désactiver
-        serial_port='COM3'  # Adapter à votre configuration
+        serial_port=None  # None : port de robot_config.ini ([SERIAL])
     )
 
 # MODIFICATION 3: Dans validate_and_apply_move (coups de Stockfish):
@@ -179,8 +179,8 @@ class RobotMoveExecutor:
     Utiliser en parallèle du jeu d'échecs existant.
     """
     
-    def __init__(self, serial_port: str = 'COM3'):
-        self.robot = ChessRobotController(port=serial_port, baudrate=115200)
+    def __init__(self, serial_port: str = None):
+        self.robot = ChessRobotController(port=serial_port)
         self.board_state = {}  # Dict pour suivre l'état du plateau
         self.init_board_state()
     
@@ -234,52 +234,55 @@ class RobotMoveExecutor:
         print("Appuyez sur Ctrl+C pour arrêter\n")
         
         last_move = ""
-        last_modified = 0
 
         # Construire le chemin vers bestmove.txt dans le dossier parent
         import os
+        import sys
         current_dir = os.path.dirname(os.path.abspath(__file__))
         parent_dir = os.path.dirname(current_dir)
         bestmove_path = os.path.join(parent_dir, "bestmove.txt")
 
-        print(f"[INFO] Surveillance du fichier: {bestmove_path}")
+        if parent_dir not in sys.path:
+            sys.path.insert(0, parent_dir)
+        from file_watcher import create_watcher
+        watcher = create_watcher(bestmove_path)
+
+        print(f"[INFO] Surveillance du fichier: {bestmove_path} ({watcher.kind})")
 
         try:
             while True:
+                # Le fichier est relu à chaque réveil : pas de comparaison de mtime,
+                # dont la granularité peut masquer deux écritures rapprochées
                 if os.path.exists(bestmove_path):
-                    current_modified = os.path.getmtime(bestmove_path)
-
-                    if current_modified != last_modified:
-                        last_modified = current_modified
-
-                        with open(bestmove_path, 'r') as f:
-                            move = f.read().strip()
+                    with open(bestmove_path, 'r') as f:
+                        move = f.read().strip()
+                    
+                    if move and move != last_move and len(move) >= 4:
+                        last_move = move
+                        
+                        # Déterminer si c'est une capture
+                        is_capture = self.is_capture(move)
+                        
+                        # Exécuter le mouvement
+                        print(f"\n{'='*60}")
+                        print(f"NOUVEAU COUP DÉTECTÉ: {move}")
+                        if is_capture:
+                            print("Type: CAPTURE")
+                        print(f"{'='*60}\n")
+                        
+                        self.robot.execute_move(move, is_capture)
+                        
+                        # Mettre à jour l'état
+                        self.update_board_state(move)
                         
-                        if move and move != last_move and len(move) >= 4:
-                            last_move = move
-                            
-                            # Déterminer si c'est une capture
-                            is_capture = self.is_capture(move)
-                            
-                            # Exécuter le mouvement
-                            print(f"\n{'='*60}")
-                            print(f"NOUVEAU COUP DÉTECTÉ: {move}")
-                            if is_capture:
-                                print("Type: CAPTURE")
-                            print(f"{'='*60}\n")
-                            
-                            self.robot.execute_move(move, is_capture)
-                            
-                            # Mettre à jour l'état
-                            self.update_board_state(move)
-                            
-                            print("\n[OK] Mouvement terminé - En attente du prochain coup...")
+                        print("\n[OK] Mouvement terminé - En attente du prochain coup...")
                 
-                time.sleep(0.5)
+                watcher.wait(0.5)  # Réveil immédiat à l'écriture, 500ms au plus sinon
                 
         except KeyboardInterrupt:
             print("\n\n[INFO] Arrêt demandé par l'utilisateur")
         finally:
+            watcher.close()
             self.robot.stop()
             print("[INFO] Robot arrêté proprement")
 
@@ -308,7 +311,7 @@ if __name__ == "__main__":
         print("- Linux: /dev/ttyUSB0, /dev/ttyACM0, ...")
         print("- Mac: /dev/cu.usbserial, /dev/cu.usbmodem, ...")
         
-        port = input("\nPort série (défaut: COM3): ").strip() or "COM3"
+        port = input("\nPort série (défaut: robot_config.ini): ").strip() or None
         
         executor = RobotMoveExecutor(serial_port=port)
         executor.run()
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Programmes G-code précompilés des coups d'échecs.
+
+La géométrie d'un coup ne dépend que de (case de départ, case d'arrivée, type de coup,
+emplacement de la zone de capture) et de robot_config.ini. MoveCompiler transforme ces
+entrées en un GCodeProgram (étapes optimisées par MotionSequence, lignes G-code déjà
+formatées, durée prévue avec les rampes du firmware), mémorisé dans un cache LRU. Le cache est vidé et la
+configuration rechargée dès que robot_config.ini change (mtime, taille, inode).
+
+Un programme est compilé depuis la hauteur Z_SAFE, position XY quelconque : chaque coup
+se termine à Z_SAFE. Le contrôleur le rejoue à partir de la position réelle de l'outil
+(run_program), ce qui supprime encore un éventuel premier déplacement inutile.
+
+Sans matériel, les programmes s'inspectent et se comparent :
+    python gcode_program.py e2e4
+    python gcode_program.py e4d5 --kind capture --slot N:3
+    python gcode_program.py e1g1 --kind roque --diff autre_config.ini
+"""
+
+import argparse
+import difflib
+import math
+import os
+from functools import lru_cache
+
+from motion_sequence import MotionSequence
+from motion_timing import ServoDwellModel
+
+# Types de coup (mêmes libellés que les statistiques de séquence du contrôleur)
+MOVE = "déplacement"
+CAPTURE = "capture"
+EN_PASSANT = "prise en passant"
+CASTLING = "roque"
+KINDS = (MOVE, CAPTURE, EN_PASSANT, CASTLING)
+
+# (départ du roi, arrivée du roi) -> (départ de la tour, arrivée de la tour)
+CASTLING_ROOKS = {
+    ('e1', 'g1'): ('h1', 'f1'),
+    ('e1', 'c1'): ('a1', 'd1'),
+    ('e8', 'g8'): ('h8', 'f8'),
+    ('e8', 'c8'): ('a8', 'd8'),
+}
+
+
+def config_signature(path):
+    # mtime_ns + taille + inode : deux écritures rapprochées restent distinguables
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def captured_square(from_square, to_square, kind):
+    """Case de la pièce prise (None si le coup ne prend rien)."""
+    if kind == CAPTURE:
+        return to_square
+    if kind == EN_PASSANT:
+        # Le pion pris est sur la colonne d'arrivée, au rang de départ
+        return f"{to_square[0]}{from_square[1]}"
+    return None
+
+
+def capture_slot_position(robot, is_white_piece, index):
+    """
+    Coordonnées de l'emplacement index (0-15) de la zone de capture d'une couleur.
+
+    Disposition (vue de dessus, blancs en bas) :
+
+        [N 2x4]  [  PLATEAU  ]  [N 2x4]    <- côté noir (rangs 7-8)
+                 [           ]
+                 [           ]
+        [B 2x4]  [  PLATEAU  ]  [B 2x4]    <- côté blanc (rangs 1-2)
+
+    - Pièces BLANCHES : côté blanc (X bas), zone gauche (0-7) puis droite (8-15)
+    - Pièces NOIRES : côté noir (X haut), zone gauche puis droite
+    - Chaque zone : 2 colonnes (Y) × 4 rangées (X), espacement SQUARE_SIZE
+    """
+    spacing = robot.SQUARE_SIZE
+    board_size = spacing * 8
+    local_index = index if index < 8 else index - 8
+    col = local_index % 2   # 0 ou 1 (colonne Y)
+    row = local_index // 2  # 0 à 3 (rangée X)
+
+    if index < 8:
+        capture_y = robot.BOARD_OFFSET_Y - spacing - (col * spacing)
+    else:
+        capture_y = robot.BOARD_OFFSET_Y + board_size + (col * spacing)
+    if is_white_piece:
+        capture_x = robot.BOARD_OFFSET_X + (row * spacing) + (spacing / 2)
+    else:
+        capture_x = robot.BOARD_OFFSET_X + board_size - (row * spacing) - (spacing / 2)
+    return (capture_x, capture_y)
+
+
+def pick_and_place(sequence, robot, source, target):
+    """Prise en source et dépose en target (coordonnées en mm), enregistrées dans sequence."""
+    source_x, source_y = source
+    target_x, target_y = target
+    # 1. Au-dessus de la pièce, 2. descente, 3. préhension, 4. remontée avec la pièce
+    sequence.move_to(source_x, source_y, robot.Z_SAFE, robot.FEED_RATE_TRAVEL)
+    sequence.move_to(source_x, source_y, robot.Z_GRAB, robot.FEED_RATE_WORK)
+    sequence.action(robot.GRAB_COMMAND, robot.GRAB_DELAY)
+    sequence.move_to(source_x, source_y, robot.Z_LIFT, robot.FEED_RATE_WORK)
+    # 5. Vers la destination, 6. descente, 7. dépose, 8. hauteur de sécurité
+    sequence.move_to(target_x, target_y, robot.Z_LIFT, robot.FEED_RATE_TRAVEL)
+    sequence.move_to(target_x, target_y, robot.Z_GRAB, robot.FEED_RATE_WORK)
+    sequence.action(robot.RELEASE_COMMAND, robot.RELEASE_DELAY)
+    sequence.move_to(target_x, target_y, robot.Z_SAFE, robot.FEED_RATE_WORK)
+
+
+def estimate_steps(robot, steps, position=None):
+    """
+    Durée prévue (s) d'une suite d'étapes depuis position (x, y, z) : rampes du firmware
+    (robot.xy_profile / robot.z_profile), attentes du mode de synchronisation (MOTION_SYNC),
+    modèle du servo et pauses de préhension.
+    """
+    firmware = robot.MOTION_SYNC == 'firmware'
+    model = robot.servo_model
+    servo = ServoDwellModel(model.sec_per_60deg, model.margin, model.floor, model.full_travel)
+    servo.angles = dict(model.angles)  # Angles actuels, sans modifier le modèle du robot
+    x, y, z = position if position else (None, None, None)
+    total = 0.0
+    for i, step in enumerate(steps):
+        next_kind = steps[i + 1].kind if i + 1 < len(steps) else None
+        if step.kind == 'xy':
+            distance = 0.0 if x is None else math.hypot(step.x - x, step.y - y)
+            travel = robot.xy_profile.move_time(distance, step.feed or robot.FEED_RATE_TRAVEL)
+            x, y = step.x, step.y
+            if next_kind == 'xy':
+                total += travel  # Deux XY successifs s'enchaînent sans attente
+            else:
+                total += (travel + robot.SETTLE_FLOOR) if firmware else max(travel, robot.XY_SETTLE_DELAY)
+        elif step.kind == 'z':
+            if robot.z_is_stepper():
+                distance = abs(step.z - z) if z is not None else abs(robot.Z_SAFE - robot.Z_GRAB)
+                travel = robot.z_profile.move_time(distance, robot.FEED_RATE_TRAVEL)
+                total += (travel + robot.SETTLE_FLOOR) if firmware else max(travel, robot.Z_MOVE_DELAY)
+            else:
+                modeled = servo.dwell_for_command(robot.z_command(step.z))
+                total += modeled if firmware and modeled is not None else robot.Z_MOVE_DELAY
+            z = step.z
+        else:
+            total += step.delay
+    return total
+
+
+class GCodeProgram:
+    """
+    Programme compilé d'un coup : étapes (MotionStep), lignes G-code et listing annoté
+    des attentes. Partagé par le cache : ne pas modifier les étapes.
+    """
+
+    def __init__(self, key, steps, requested, robot):
+        self.key = key
+        self.from_square, self.to_square, self.kind, self.slot = key
+        self.steps = steps
+        self.requested = requested  # Commandes qu'aurait envoyées la séquence naïve
+        self.lines = [step.gcode(robot.z_command) for step in steps]
+        self.listing = self.annotate(robot)
+        self.duration = self.estimate(robot)
+
+    def __repr__(self):
+        return (f"GCodeProgram({self.from_square}{self.to_square}, {self.kind}, "
+                f"{len(self.lines)} lignes, ~{self.duration:.1f}s)")
+
+    def annotate(self, robot):
+        """Lignes G-code suivies des attentes que le contrôleur insère (commentaires)."""
+        listing = []
+        for i, (step, line) in enumerate(zip(self.steps, self.lines)):
+            next_kind = self.steps[i + 1].kind if i + 1 < len(self.steps) else None
+            if step.kind == 'xy' and next_kind != 'xy':
+                listing.append(f"{line:<32}; fin du mouvement XY")
+            elif step.kind == 'z' and not robot.z_is_stepper():
+                listing.append(f"{line:<32}; attente servo")
+            elif step.kind == 'action' and step.delay:
+                listing.append(f"{line:<32}; pause {step.delay:.2f}s")
+            else:
+                listing.append(line)
+        return listing
+
+    def estimate(self, robot):
+        """Durée estimée (s) depuis Z_SAFE, premier déplacement XY non compté (départ inconnu)."""
+        return estimate_steps(robot, self.steps, (None, None, robot.Z_SAFE))
+
+    def dry_run(self):
+        """Affiche le programme sans rien envoyer ; retourne les lignes G-code."""
+        print(f"[PROGRAMME] {self.from_square} → {self.to_square} ({self.kind}"
+              f"{f', emplacement {self.slot}' if self.slot else ''}) : "
+              f"{len(self.lines)} lignes, ~{self.duration:.1f}s")
+        for line in self.listing:
+            print(f"[PROGRAMME]   {line}")
+        return list(self.lines)
+
+    def diff(self, other, name='a', other_name='b'):
+        """Différences (format unifié) entre les listings de deux programmes."""
+        return list(difflib.unified_diff(self.listing, other.listing, name, other_name, lineterm=''))
+
+
+class MoveCompiler:
+    """
+    Compile les coups en GCodeProgram avec un cache LRU.
+
+    Args:
+        robot: Fournit la configuration (attributs de ChessRobotController.load_config,
+               uci_to_coordinates, z_command, z_key, z_is_stepper)
+        config_file: robot_config.ini surveillé ; modifié -> robot.load_config et cache vidé
+        maxsize: Taille du cache (un coup = une entrée par emplacement de capture)
+    """
+
+    def __init__(self, robot, config_file, maxsize=512):
+        self.robot = robot
+        self.config_file = config_file
+        self.signature = config_signature(config_file)
+        self.reloads = 0
+        self._compile = lru_cache(maxsize=maxsize)(self.build)
+
+    def refresh(self):
+        """Recharge la configuration si robot_config.ini a changé depuis la dernière compilation."""
+        signature = config_signature(self.config_file)
+        if signature == self.signature:
+            return False
+        self.signature = signature
+        print(f"[PROGRAMME] {os.path.basename(self.config_file)} modifié : configuration rechargée, cache vidé")
+        self.robot.load_config(self.config_file)
+        self._compile.cache_clear()
+        self.reloads += 1
+        return True
+
+    def compile(self, from_square, to_square, kind=MOVE, slot=None):
+        """
+        Args:
+            from_square, to_square: Cases UCI (pour un roque : celles du roi)
+            kind: MOVE, CAPTURE, EN_PASSANT ou CASTLING
+            slot: (is_white_piece, index) de la pièce prise dans la zone de capture
+        """
+        if kind not in KINDS:
+            raise ValueError(f"Type de coup inconnu: {kind}")
+        if kind in (CAPTURE, EN_PASSANT) and slot is None:
+            raise ValueError(f"Emplacement de capture requis pour {kind} {from_square}{to_square}")
+        self.refresh()
+        return self._compile(from_square, to_square, kind, slot if kind in (CAPTURE, EN_PASSANT) else None)
+
+    def build(self, from_square, to_square, kind, slot):
+        robot = self.robot
+        coordinates = robot.uci_to_coordinates
+        sequence = MotionSequence((None, None, robot.Z_SAFE), z_key=robot.z_key)
+        if kind == CASTLING:
+            if (from_square, to_square) not in CASTLING_ROOKS:
+                raise ValueError(f"Roque invalide: {from_square}{to_square}")
+            rook_from, rook_to = CASTLING_ROOKS[(from_square, to_square)]
+            pick_and_place(sequence, robot, coordinates(from_square), coordinates(to_square))
+            pick_and_place(sequence, robot, coordinates(rook_from), coordinates(rook_to))
+        else:
+            taken = captured_square(from_square, to_square, kind)
+            if taken:
+                # La pièce prise part d'abord vers la zone de capture
+                pick_and_place(sequence, robot, coordinates(taken), capture_slot_position(robot, *slot))
+            pick_and_place(sequence, robot, coordinates(from_square), coordinates(to_square))
+        return GCodeProgram((from_square, to_square, kind, slot), sequence.steps, sequence.requested, robot)
+
+    def cache_info(self):
+        return self._compile.cache_info()
+
+
+# ==================== INSPECTION SANS MATÉRIEL ====================
+
+def parse_slot(text):
+    """'B:3' / 'N:0' -> (is_white_piece, index)."""
+    color, _, index = text.partition(':')
+    if color.upper() not in ('B', 'N') or not index.isdigit():
+        raise argparse.ArgumentTypeError(f"Emplacement invalide: {text} (attendu B:index ou N:index)")
+    return (color.upper() == 'B', int(index))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile un coup en programme G-code (sans robot)")
+    parser.add_argument("move", help="Coup UCI (ex: e2e4 ; roque : e1g1)")
+    parser.add_argument("--kind", choices=KINDS, default=None, help="Type de coup (roque détecté par défaut)")
+    parser.add_argument("--slot", type=parse_slot, default=(True, 0), help="Emplacement de capture, ex: N:3")
+    parser.add_argument("--config", default="robot_config.ini", help="Configuration du robot")
+    parser.add_argument("--diff", metavar="CONFIG", help="Compare avec le programme compilé pour une autre configuration")
+    args = parser.parse_args(argv)
+
+    # Import local : le contrôleur importe ce module
+    from robot_chess_controller import ChessRobotController
+
+    from_square, to_square = args.move[:2], args.move[2:4]
+    kind = args.kind or (CASTLING if (from_square, to_square) in CASTLING_ROOKS else MOVE)
+    program = ChessRobotController(config_file=args.config).compiler.compile(from_square, to_square, kind, args.slot)
+    program.dry_run()
+    if args.diff:
+        other = ChessRobotController(config_file=args.diff).compiler.compile(from_square, to_square, kind, args.slot)
+        print(f"[PROGRAMME] {args.config} -> {args.diff} : ~{program.duration:.1f}s -> ~{other.duration:.1f}s")
+        for line in program.diff(other, args.config, args.diff) or ["(programmes identiques)"]:
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
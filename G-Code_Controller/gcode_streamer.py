@@ -0,0 +1,37 @@
+"""
+Envoi de G-code en flux : plusieurs commandes en vol pour garder le planificateur
+du firmware rempli (pas d'arrêt entre deux segments en attendant l'aller-retour série).
+
+Deux contrôles de flux :
+- Marlin : crédit d'ok. Au plus `window` commandes sans réponse (BUFSIZE du firmware,
+  4 par défaut) ; chaque 'ok' libère une place.
+- GRBL : comptage de caractères. La somme des lignes en vol (retour à la ligne compris)
+  ne dépasse pas la taille du tampon de réception (127 octets utilisables).
+
+La lecture du port et l'association des réponses aux commandes sont faites par
+SerialIO (serial_io.py) ; les lignes qui ne sont pas des acquittements sont transmises
+à on_message.
+"""
+
+from serial_io import PendingCommand, SerialIO
+
+# Nom historique de la commande en vol
+StreamedCommand = PendingCommand
+
+
+class GCodeStreamer(SerialIO):
+    """
+    Args:
+        serial_conn: Port série ouvert (pyserial, avec un timeout de lecture)
+        firmware: 'marlin' (crédit d'ok) ou 'grbl' (comptage de caractères)
+        window: Commandes en vol au maximum (Marlin)
+        rx_buffer: Octets du tampon de réception (GRBL)
+        on_message: Appelé avec chaque ligne qui n'est pas une réponse à une commande
+    """
+
+    def __init__(self, serial_conn, firmware='marlin', window=4, rx_buffer=127, on_message=None):
+        grbl = firmware.lower() == 'grbl'
+        super().__init__(serial_conn, firmware, window=None if grbl else window,
+                         rx_buffer=rx_buffer if grbl else None)
+        if on_message:
+            self.subscribe(lambda kind, line: on_message(line))
@@ -0,0 +1,122 @@
+"""
+Construction de la séquence de mouvements d'un coup (prise et dépose).
+
+Les méthodes du contrôleur (move_to_position, grab_piece, release_piece) décrivent
+chaque étape comme « XY puis Z » ; envoyées telles quelles, elles répètent le même
+G0 X.. Y.. pour chaque changement de hauteur. MotionSequence enregistre ces étapes
+en suivant la position connue de l'outil et ne garde que les mouvements utiles :
+- un déplacement XY vers la position actuelle est supprimé ;
+- plusieurs mouvements Z consécutifs (sans XY ni action entre eux) sont fusionnés
+  en un seul vers la dernière hauteur ;
+- un mouvement Z vers la hauteur actuelle est supprimé.
+"""
+
+XY_TOLERANCE = 0.01  # mm
+
+
+class MotionStep:
+    """Une commande de la séquence : 'xy', 'z' ou 'action' (préhension)."""
+
+    def __init__(self, kind, x=None, y=None, z=None, feed=None, command=None, delay=0.0, z_before=None):
+        self.kind = kind
+        self.x, self.y, self.z = x, y, z
+        self.feed = feed
+        self.command = command
+        self.delay = delay
+        self.z_before = z_before  # Hauteur avant ce mouvement Z (pour annuler une fusion)
+        self.line = None          # Ligne G-code, formatée une seule fois (programmes compilés)
+
+    def __repr__(self):
+        if self.kind == 'xy':
+            return f"XY({self.x:.2f}, {self.y:.2f})"
+        if self.kind == 'z':
+            return f"Z({self.z:.2f})"
+        return f"ACTION({self.command})"
+
+    def gcode(self, z_command):
+        """Ligne G-code de l'étape ; z_command(z) -> ligne pour un mouvement Z."""
+        if self.line is None:
+            if self.kind == 'xy':
+                feed = f" F{self.feed}" if self.feed else ""
+                self.line = f"G0 X{self.x:.2f} Y{self.y:.2f}{feed}"
+            elif self.kind == 'z':
+                self.line = z_command(self.z)
+            else:
+                self.line = self.command
+        return self.line
+
+
+class MotionSequence:
+    """
+    Args:
+        position: (x, y, z) connue au départ, ou None si inconnue
+        z_key: Hauteur effective (ex: servo -> haut/bas) ; deux Z de même clé sont identiques
+    """
+
+    def __init__(self, position=None, z_key=None):
+        self.x, self.y, self.z = position if position else (None, None, None)
+        self.z_key = z_key or (lambda z: round(z, 2))
+        self.steps = []
+        self.requested = 0  # Commandes qu'aurait envoyées la séquence naïve
+
+    @property
+    def position(self):
+        if self.x is None or self.z is None:
+            return None
+        return (self.x, self.y, self.z)
+
+    def same_xy(self, x, y):
+        return (self.x is not None and abs(self.x - x) < XY_TOLERANCE and abs(self.y - y) < XY_TOLERANCE)
+
+    def same_z(self, z):
+        return self.z is not None and self.z_key(self.z) == self.z_key(z)
+
+    def move_to(self, x, y, z, feed=None):
+        """Même sens que move_to_position : XY d'abord, puis Z."""
+        self.requested += 2
+        if not self.same_xy(x, y):
+            self.steps.append(MotionStep('xy', x=x, y=y, feed=feed))
+            self.x, self.y = x, y
+        self.move_z(z)
+
+    def move_z(self, z):
+        last = self.steps[-1] if self.steps else None
+        if last is not None and last.kind == 'z':
+            # Fusion : l'outil n'a rien fait à la hauteur intermédiaire
+            self.steps.pop()
+            self.z = last.z_before
+        if self.same_z(z):
+            self.z = z
+            return
+        self.steps.append(MotionStep('z', z=z, z_before=self.z))
+        self.z = z
+
+    def action(self, command, delay=0.0):
+        self.requested += 1
+        self.steps.append(MotionStep('action', command=command, delay=delay))
+
+    def replay(self, steps):
+        """
+        Ajoute des étapes déjà optimisées (programme compilé) depuis la position courante :
+        un premier XY vers la position actuelle disparaît, un Z se fusionne comme dans move_z.
+        """
+        for step in steps:
+            if step.kind == 'xy':
+                if not self.same_xy(step.x, step.y):
+                    self.steps.append(step)
+                    self.x, self.y = step.x, step.y
+            elif step.kind == 'z':
+                self.move_z(step.z)
+            else:
+                self.steps.append(step)
+
+    def counts(self):
+        """Nombre de commandes par type après optimisation."""
+        counts = {'xy': 0, 'z': 0, 'action': 0}
+        for step in self.steps:
+            counts[step.kind] += 1
+        return counts
+
+    def program(self, z_command):
+        """Programme G-code des mouvements (sans les attentes) ; z_command(z) -> ligne."""
+        return [step.gcode(z_command) for step in self.steps]
@@ -0,0 +1,156 @@
+"""
+Modèles de durée des mouvements du robot.
+
+TrapezoidProfile : durée d'un déplacement pas-à-pas avec les rampes du firmware
+(accélération, jerk), à partir de la vitesse d'avance demandée (F, mm/min).
+Les valeurs viennent de [KINEMATICS] dans robot_config.ini, enregistrées par
+calibration_ramps.py après le réglage.
+
+MoveWatchdog : suivi du coup en cours (durée prévue, temps écoulé) ; donne la
+progression affichée par le jeu, les timeouts adaptés à la durée prévue et la
+détection d'un bras bloqué.
+
+ServoDwellModel : temps d'attente après une commande servo (M280), proportionnel à
+l'angle parcouru. Un servo n'a pas de retour de position : le firmware ne peut pas
+signaler la fin du mouvement comme pour les moteurs pas-à-pas (M400 / état Idle).
+Le modèle remplace le délai fixe z_move_delay / pronation_delay ; un plancher reste
+appliqué par sécurité.
+
+Calibration ([MOTION] dans robot_config.ini) :
+    servo_sec_per_60deg : vitesse du servo (fiche technique, ex: SG90 ≈ 0.10 s/60° à 4.8 V,
+                          MG996R ≈ 0.17 s/60°), à augmenter tant que la pince arrive en retard
+    servo_margin        : temps ajouté à chaque mouvement (stabilisation, charge)
+    servo_floor         : attente minimale
+"""
+
+import math
+import re
+import time
+
+SERVO_COMMAND = re.compile(r"^M280\s+P(\d+)\s+S(\d+(?:\.\d+)?)", re.IGNORECASE)
+
+
+def parse_servo_command(command):
+    """Retourne (broche, angle) d'une commande 'M280 P0 S90', ou None."""
+    match = SERVO_COMMAND.match(command.strip())
+    if not match:
+        return None
+    return int(match.group(1)), float(match.group(2))
+
+
+class ServoDwellModel:
+
+    def __init__(self, sec_per_60deg=0.12, margin=0.05, floor=0.1, full_travel=180.0):
+        self.sec_per_60deg = sec_per_60deg
+        self.margin = margin
+        self.floor = floor
+        self.full_travel = full_travel
+        self.angles = {}  # broche -> dernier angle commandé
+
+    def dwell(self, pin, angle):
+        """Attente (s) pour amener le servo de la broche à angle ; mémorise le nouvel angle."""
+        previous = self.angles.get(pin)
+        # Position inconnue (démarrage) : on suppose la course complète
+        travel = self.full_travel if previous is None else abs(angle - previous)
+        self.angles[pin] = angle
+        if travel == 0:
+            return 0.0
+        return max(self.floor, self.margin + travel / 60.0 * self.sec_per_60deg)
+
+    def dwell_for_command(self, command):
+        """Attente pour une commande G-code (None si ce n'est pas une commande servo)."""
+        target = parse_servo_command(command)
+        if target is None:
+            return None
+        return self.dwell(*target)
+
+
+class TrapezoidProfile:
+    """
+    Profil trapézoïdal : accélération constante jusqu'à la vitesse d'avance, palier,
+    décélération symétrique. Un déplacement trop court pour atteindre la vitesse
+    d'avance a un profil triangulaire.
+
+    Args:
+        accel: Accélération (mm/s²), M201/M204 sur Marlin, $120/$121 sur GRBL
+        jerk: Vitesse de départ et d'arrivée sans rampe (mm/s, M205 Marlin) ; 0 pour GRBL
+        max_speed: Vitesse maximale de l'axe (mm/min), None = pas de limite
+    """
+
+    def __init__(self, accel=1000.0, jerk=0.0, max_speed=None):
+        self.accel = accel
+        self.jerk = jerk
+        self.max_speed = max_speed
+
+    def move_time(self, distance, feed):
+        """Durée (s) d'un déplacement de distance mm à la vitesse d'avance feed (mm/min)."""
+        if distance <= 0:
+            return 0.0
+        speed = feed / 60.0
+        if self.max_speed:
+            speed = min(speed, self.max_speed / 60.0)
+        start = min(self.jerk, speed)
+        ramp = (speed ** 2 - start ** 2) / (2 * self.accel)  # Distance de chaque rampe
+        if 2 * ramp >= distance:
+            # Triangle : vitesse de pointe atteinte au milieu du déplacement
+            peak = math.sqrt(start ** 2 + self.accel * distance)
+            return 2 * (peak - start) / self.accel
+        return 2 * (speed - start) / self.accel + (distance - 2 * ramp) / speed
+
+
+class MoveWatchdog:
+    """
+    Coup en cours d'exécution : timeout = durée prévue × factor + margin.
+    Écrit par le thread du robot (start / finish), lu par l'interface (progress, stalled).
+    """
+
+    def __init__(self, factor=2.0, margin=5.0):
+        self.factor = factor
+        self.margin = margin
+        self.label = None
+        self.predicted = None
+        self.started = None
+        self.last = None  # (label, prévu, réel) du dernier coup terminé
+
+    def start(self, predicted, label=None):
+        self.label = label
+        self.predicted = predicted
+        self.started = time.monotonic()
+
+    def finish(self):
+        """Termine le coup en cours ; retourne (label, prévu, réel) ou None."""
+        if self.started is None:
+            return None
+        self.last = (self.label, self.predicted, time.monotonic() - self.started)
+        self.started = None
+        return self.last
+
+    @property
+    def running(self):
+        return self.started is not None
+
+    def elapsed(self):
+        return time.monotonic() - self.started if self.running else 0.0
+
+    def timeout(self, predicted=None):
+        """Délai accordé pour une durée prévue (par défaut celle du coup en cours)."""
+        predicted = self.predicted if predicted is None else predicted
+        return predicted * self.factor + self.margin
+
+    def time_left(self, default):
+        """Temps restant avant le timeout du coup en cours (default si aucun coup n'est suivi)."""
+        if not self.running:
+            return default
+        return max(0.0, self.timeout() - self.elapsed())
+
+    def progress(self):
+        """Avancement prévu (0-1) ; plafonné à 0.99 tant que le coup n'est pas terminé."""
+        if not self.running:
+            return None
+        if not self.predicted:
+            return 0.99
+        return min(0.99, self.elapsed() / self.predicted)
+
+    def stalled(self):
+        """True si le coup en cours dépasse largement sa durée prévue (bras bloqué)."""
+        return self.running and self.elapsed() > self.timeout()
@@ -9,11 +9,14 @@ import time
 import configparser
 import os
 
+from serial_io import SerialIO, open_firmware
+
 class RobotCalibration:
     """Outil de calibration et test du robot d'échecs."""
     
     def __init__(self):
         self.serial_conn = None
+        self.io = None  # Lecteur série (réponses associées aux commandes)
         self.config = self.load_config()
         self.load_z_commands()
     
@@ -104,23 +107,15 @@ class RobotCalibration:
         print(f"\n[TEST] Connexion à {port} @ {baudrate} bauds...")
         
         try:
-            self.serial_conn = serial.Serial(
-                port=port,
-                baudrate=baudrate,
-                timeout=2
-            )
-            
-            time.sleep(2)  # Attendre la réinitialisation
+            reset = self.config['SERIAL'].get('reset', 'true').lower() == 'true'
+            self.serial_conn, firmware, banner = open_firmware(port, baudrate, reset=reset)
+            if banner:
+                print(f"[OK] Réponse: {banner[0]}")
             
-            # Lire le message de démarrage
-            if self.serial_conn.in_waiting:
-                # Ligne corrigée
-                startup = self.serial_conn.read_until(b'\n').decode(errors='ignore').strip()
-                print(f"[OK] Réponse: {startup}")
+            self.io = SerialIO(self.serial_conn, firmware).start()
             
             # Tester une commande simple
             self.send_test_command("G21")  # Mode millimètres
-            time.sleep(0.5)
             self.send_test_command("G90")  # Positionnement absolu
             
             print("[OK] Connexion réussie ✓")
@@ -135,7 +130,7 @@ class RobotCalibration:
     
     def send_test_command(self, command):
         """Envoie une commande de test."""
-        if not self.serial_conn or not self.serial_conn.is_open:
+        if not self.io or not self.serial_conn or not self.serial_conn.is_open:
             print("[ERREUR] Pas de connexion active")
             return False
 
@@ -151,29 +146,19 @@ class RobotCalibration:
                     coords = ' '.join(parts[1:])
 
                     # Passer en mode relatif, bouger, puis revenir en absolu
-                    self.serial_conn.write(b"G91\n")
-                    time.sleep(0.1)
-                    self.serial_conn.write(f"{move_cmd} {coords}\n".encode())
-                    time.sleep(0.2)
-                    self.serial_conn.write(b"G90\n")
                     print(f">>> G91 (relatif)")
+                    self.exchange("G91")
                     print(f">>> {move_cmd} {coords}")
+                    self.exchange(f"{move_cmd} {coords}")
                     print(f">>> G90 (absolu)")
+                    self.exchange("G90")
                 else:
-                    self.serial_conn.write(f"{command}\n".encode())
                     print(f">>> {command}")
+                    self.exchange(command)
             else:
                 # Commande normale
-                self.serial_conn.write(f"{command}\n".encode())
                 print(f">>> {command}")
-
-            # Lire la réponse
-            time.sleep(0.2)
-            while self.serial_conn.in_waiting:
-                # Ligne corrigée
-                response = self.serial_conn.readline().decode(errors='ignore').strip()
-                if response:
-                    print(f"<<< {response}")
+                self.exchange(command)
 
             return True
 
@@ -181,6 +166,16 @@ class RobotCalibration:
             print(f"[ERREUR] Envoi commande: {e}")
             return False
     
+    def exchange(self, command, timeout=10.0):
+        """Envoie une ligne et affiche sa réponse (données puis ok / erreur)."""
+        reply = self.io.request(command, timeout)
+        if reply is None:
+            print(f"[ERREUR] Pas de réponse à {command}")
+            return False
+        for line in reply.response().split('\n'):
+            print(f"<<< {line}")
+        return reply.ok
+
     def test_movement(self):
         """Teste les mouvements de base."""
         print("\n" + "="*60)
@@ -391,6 +386,9 @@ SYSTÈME:
     
     def close(self):
         """Ferme la connexion série."""
+        if self.io:
+            self.io.close()
+            self.io = None
         if self.serial_conn and self.serial_conn.is_open:
             self.serial_conn.close()
             print("[INFO] Connexion fermée")
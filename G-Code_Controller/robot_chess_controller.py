@@ -1,10 +1,26 @@
 import serial
 import time
 import os
+import sys
 import configparser
+from contextlib import contextmanager
 from threading import Thread, Event
 from typing import Tuple, Optional
-from threading import Thread, Event
+
+from gcode_streamer import GCodeStreamer
+from serial_io import SerialIO, open_firmware, STATUS, TEMPERATURE
+from motion_timing import ServoDwellModel, TrapezoidProfile, MoveWatchdog
+from motion_sequence import MotionSequence
+from capture_allocator import CaptureAllocator
+from board_reset import RESET, plan_reset, starting_position
+from gcode_program import (MoveCompiler, capture_slot_position, captured_square, estimate_steps,
+                           MOVE, CAPTURE, EN_PASSANT, CASTLING)
+
+# Modules partagés avec le jeu (journal des coups, surveillance, traces) : dossier parent
+PARENT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PARENT_DIR not in sys.path:
+    sys.path.insert(0, PARENT_DIR)
+import move_trace
 
 class ChessRobotController:
     """
@@ -12,13 +28,14 @@ class ChessRobotController:
     Lit les coups depuis bestmove.txt et convertit en mouvements physiques.
     """
     
-    def __init__(self, port: str = 'COM5', baudrate: int = 250000, config_file: str = 'robot_config.ini'):
+    def __init__(self, port: str = None, baudrate: int = None, config_file: str = 'robot_config.ini'):
         """
         Initialise le contrôleur du robot.
 
         Args:
-            port: Port série (ex: 'COM3' sous Windows, '/dev/ttyUSB0' sous Linux)
-            baudrate: Vitesse de communication (115200 par défaut)
+            port: Port série (ex: 'COM3' sous Windows, '/dev/ttyUSB0' sous Linux, port du
+                  firmware simulé) ; prioritaire sur [SERIAL] de robot_config.ini
+            baudrate: Vitesse de communication (None : [SERIAL], sinon 250000)
             config_file: Chemin vers le fichier de configuration
         """
         self.port = port
@@ -26,6 +43,16 @@ class ChessRobotController:
         self.serial_conn: Optional[serial.Serial] = None
         self.is_connected = False
         self.stop_monitoring = Event()
+        self.serial_io: Optional[SerialIO] = None     # Lecteur série (réponses et messages du firmware)
+        self.streamer: Optional[GCodeStreamer] = None  # Même objet quand l'envoi en flux est actif
+        self.firmware = 'marlin'
+        self.batch_depth = 0  # > 0 : les commandes sont mises en file sans attendre leur ok
+        self.batch_ok = True  # False si la dernière séquence en flux a échoué (timeout, erreur)
+        self.grbl_status = None     # Dernier état GRBL reçu ('<Idle|...>')
+        self.tool_position = None   # (x, y, z) connue après une séquence ; None = inconnue
+        self.sequence: Optional[MotionSequence] = None  # Séquence en cours d'enregistrement
+        self.sequence_stats = {}    # type de coup -> compteurs (voir run_sequence)
+        self.watchdog = MoveWatchdog()  # Coup en cours : durée prévue, progression, blocage
 
         # Construire le chemin absolu du fichier de config s'il est relatif
         if not os.path.isabs(config_file):
@@ -34,16 +61,22 @@ class ChessRobotController:
 
         # Charger la configuration depuis robot_config.ini
         self.load_config(config_file)
+        # Programmes G-code des coups, recompilés si robot_config.ini change
+        self.compiler = MoveCompiler(self, config_file)
 
-        self.capture_count = 0
-        self.white_capture_count = 0  # Pièces blanches capturées
-        self.black_capture_count = 0  # Pièces noires capturées
+        # Emplacements occupés de la zone de capture (journal capture_zone.jsonl)
+        self.capture_zone = CaptureAllocator(lambda is_white, index: capture_slot_position(self, is_white, index))
 
         # Tracking de l'état du plateau pour connaître la couleur des pièces
         self.board_state = {}
-        self.captured_pieces = []  # List to store captured pieces: {'type', 'color', 'storage_pos'}
         self.init_board_state()
 
+        # Curseur du journal : dernier coup exécuté physiquement (reprise après un crash)
+        self.journal_game = None
+        self.journal_seq = 0
+        self.state_loaded = False
+        self.load_state()
+
     def load_config(self, config_file: str):
         """Charge la configuration depuis robot_config.ini"""
         config = configparser.ConfigParser()
@@ -80,11 +113,14 @@ class ChessRobotController:
                 'release_delay': '0.5'
             }
 
-        # Charger les paramètres série (écrase les valeurs passées au constructeur)
-        if 'SERIAL' in config:
-            self.port = config['SERIAL'].get('port', self.port)
-            self.baudrate = int(config['SERIAL'].get('baudrate', self.baudrate))
-            print(f"[CONFIG] Port série: {self.port} à {self.baudrate} bauds")
+        # Charger les paramètres série (les valeurs passées au constructeur sont prioritaires)
+        serial_config = config['SERIAL'] if 'SERIAL' in config else {}
+        self.port = self.port or serial_config.get('port', 'COM5')
+        self.baudrate = self.baudrate or int(serial_config.get('baudrate', '250000'))
+        # reset = false : la carte n'est pas redémarrée à l'ouverture (DTR bas)
+        self.SERIAL_RESET = serial_config.get('reset', 'true').lower() == 'true'
+        print(f"[CONFIG] Port série: {self.port} à {self.baudrate} bauds"
+              f"{'' if self.SERIAL_RESET else ' (sans redémarrage)'}")
 
         # Charger les paramètres du plateau
         self.SQUARE_SIZE = float(config['BOARD']['square_size'])
@@ -122,6 +158,41 @@ class ChessRobotController:
             self.Z_DOWN_COMMAND = 'M280 P0 S168'
             self.Z_MOVE_DELAY = 0.5
 
+        # Envoi en flux (plusieurs commandes dans le planificateur du firmware)
+        if 'STREAMING' in config:
+            self.STREAMING_ENABLED = config['STREAMING'].get('enabled', 'true').lower() == 'true'
+            self.STREAM_WINDOW = int(config['STREAMING'].get('window', '4'))
+            self.STREAM_RX_BUFFER = int(config['STREAMING'].get('rx_buffer', '127'))
+        else:
+            self.STREAMING_ENABLED = True
+            self.STREAM_WINDOW = 4
+            self.STREAM_RX_BUFFER = 127
+
+        # Synchronisation des mouvements : 'firmware' (M400 / état Idle, modèle servo)
+        # ou 'sleep' (délais fixes xy_settle_delay / z_move_delay / pronation_delay)
+        motion = config['MOTION'] if 'MOTION' in config else {}
+        self.MOTION_SYNC = motion.get('sync', 'firmware').lower()
+        self.SETTLE_FLOOR = float(motion.get('settle_floor', '0.05'))
+        self.MOTION_TIMEOUT = float(motion.get('motion_timeout', '30.0'))
+        self.servo_model = ServoDwellModel(float(motion.get('servo_sec_per_60deg', '0.12')),
+                                           float(motion.get('servo_margin', '0.05')),
+                                           float(motion.get('servo_floor', '0.1')))
+        # Timeouts adaptés à la durée prévue du coup : prévu × timeout_factor + timeout_margin
+        # (motion_timeout ne sert plus que si aucune prévision n'est disponible)
+        self.watchdog.factor = float(motion.get('timeout_factor', '2.0'))
+        self.watchdog.margin = float(motion.get('timeout_margin', '5.0'))
+
+        # Rampes du firmware (réglées avec calibration_ramps.py) : prévision des durées
+        kinematics = config['KINEMATICS'] if 'KINEMATICS' in config else {}
+        self.xy_profile = TrapezoidProfile(float(kinematics.get('accel', '1000')),
+                                           float(kinematics.get('jerk', '8')))
+        self.z_profile = TrapezoidProfile(float(kinematics.get('z_accel', '100')),
+                                          float(kinematics.get('z_jerk', '0.3')))
+
+        # Remise en place du plateau en fin de partie (board_reset)
+        reset = config['RESET'] if 'RESET' in config else {}
+        self.RESET_AUTO = reset.get('auto', 'false').lower() == 'true'
+
         # Paramètres avancés
         if 'ADVANCED' in config:
             self.XY_SETTLE_DELAY = float(config['ADVANCED'].get('xy_settle_delay', '1.0'))
@@ -147,7 +218,13 @@ class ChessRobotController:
         print(f"[CONFIG] Plateau: {self.SQUARE_SIZE}mm/case, offset=({self.BOARD_OFFSET_X}, {self.BOARD_OFFSET_Y})")
         print(f"[CONFIG] Hauteurs: safe={self.Z_SAFE}, grab={self.Z_GRAB}, lift={self.Z_LIFT}")
         print(f"[CONFIG] Axe Z: UP={self.Z_UP_COMMAND}, DOWN={self.Z_DOWN_COMMAND}")
-        print(f"[CONFIG] Délai stabilisation XY: {self.XY_SETTLE_DELAY}s")
+        if self.MOTION_SYNC == 'firmware':
+            print(f"[CONFIG] Synchronisation: fin de mouvement firmware + {self.SETTLE_FLOOR}s, "
+                  f"servo {self.servo_model.sec_per_60deg}s/60°")
+        else:
+            print(f"[CONFIG] Délai stabilisation XY: {self.XY_SETTLE_DELAY}s")
+        print(f"[CONFIG] Rampes: XY {self.xy_profile.accel:g} mm/s² (jerk {self.xy_profile.jerk:g}), "
+              f"Z {self.z_profile.accel:g} mm/s² (jerk {self.z_profile.jerk:g})")
         if self.PRONATION_ENABLED:
             print(f"[CONFIG] Pronation: P{self.PRONATION_PIN}, neutre={self.PRONATION_NEUTRAL}°, gauche={self.PRONATION_LEFT}°, droite={self.PRONATION_RIGHT}°")
 
@@ -159,25 +236,33 @@ class ChessRobotController:
             True si la connexion est établie, False sinon
         """
         try:
-            self.serial_conn = serial.Serial(
-                port=self.port,
-                baudrate=self.baudrate,
-                timeout=2,
-                write_timeout=2
-            )
-            time.sleep(2)  # Attendre la réinitialisation de l'Arduino/GRBL
-            
-            # Attendre le message de démarrage
-            startup_msg = self.serial_conn.read_until(b'\n')
-            print(f"[ROBOT] Démarrage: {startup_msg.decode(errors='ignore').strip()}")
-            
-            # Initialiser le robot
+            # Rend la main dès que le firmware répond (bannière puis sonde M115 / $I)
+            self.serial_conn, self.firmware, banner = open_firmware(self.port, self.baudrate,
+                                                                    reset=self.SERIAL_RESET)
+            if banner:
+                print(f"[ROBOT] Démarrage: {banner[0]}")
+            self.tool_position = None  # Position inconnue jusqu'au homing ou à la première séquence
+
+            if self.STREAMING_ENABLED:
+                self.streamer = GCodeStreamer(self.serial_conn, self.firmware, self.STREAM_WINDOW,
+                                              self.STREAM_RX_BUFFER)
+                self.serial_io = self.streamer
+                limit = (f"tampon {self.STREAM_RX_BUFFER} octets" if self.firmware == 'grbl'
+                         else f"fenêtre {self.STREAM_WINDOW}")
+                print(f"[ROBOT] Envoi en flux ({self.firmware}, {limit})")
+            else:
+                # Une commande à la fois : envoi puis attente de l'ok
+                self.serial_io = SerialIO(self.serial_conn, self.firmware)
+            self.serial_io.subscribe(self.on_firmware_message)
+            self.serial_io.start()
+
+            # Initialiser le robot (send_command refuse d'envoyer tant que is_connected est faux)
+            self.is_connected = True
             self.send_command("G21")  # Mode millimètres
             self.send_command("G90")  # Positionnement absolu
             self.send_command("G94")  # Vitesse en mm/min
             self.send_command(f"F{self.FEED_RATE_TRAVEL}")  # Vitesse par défaut
-            
-            self.is_connected = True
+
             print(f"[ROBOT] Connecté sur {self.port} à {self.baudrate} bauds")
             return True
             
@@ -188,6 +273,15 @@ class ChessRobotController:
     
     def disconnect(self):
         """Ferme la connexion série."""
+        if self.sequence_stats:
+            self.sequence_report()
+        if self.serial_io:
+            self.serial_io.flush(timeout=10.0)
+            if self.streamer:
+                print(f"[ROBOT] Flux G-code: {self.streamer.report()}")
+            self.serial_io.close()
+            self.serial_io = None
+            self.streamer = None
         if self.serial_conn and self.serial_conn.is_open:
             self.serial_conn.close()
             self.is_connected = False
@@ -204,59 +298,133 @@ class ChessRobotController:
         Returns:
             True si la commande est acceptée, False sinon
         """
-        if not self.is_connected or not self.serial_conn:
+        if not self.is_connected or not self.serial_io:
             print("[ERREUR] Robot non connecté")
             return False
         
         try:
-            # Envoyer la commande
-            cmd_line = command.strip() + '\n'
-            self.serial_conn.write(cmd_line.encode())
-            print(f"[ROBOT] >>> {command}")
-            
-            if wait_ok:
-                # Attendre la réponse
-                while True:
-                    response = self.serial_conn.readline().decode(errors='ignore').strip()
-                    if response:
-                        print(f"[ROBOT] <<< {response}")
-                        if 'ok' in response.lower():
-                            return True
-                        elif 'error' in response.lower():
-                            print(f"[ERREUR] Commande rejetée: {command}")
-                            return False
-            
-            return True
-            
+            with move_trace.span("gcode", cmd=command.strip()):
+                return self._send_command(command, wait_ok)
         except Exception as e:
             print(f"[ERREUR] Envoi commande: {e}")
             return False
-    
+
+    def _send_command(self, command: str, wait_ok: bool) -> bool:
+        sent = self.serial_io.send(command)
+        if sent is None:
+            print(f"[ERREUR] Port fermé, commande non envoyée: {command}")
+            return False
+        print(f"[ROBOT] >>> {command}")
+        if wait_ok and not self.batch_depth:
+            ok = self.serial_io.wait(sent, self.watchdog.time_left(self.MOTION_TIMEOUT))
+            if not sent.done:
+                print(f"[ERREUR] Pas de réponse à {command} (bras bloqué ?)")
+                return False
+            print(f"[ROBOT] <<< {'ok' if ok else sent.error} ({sent.rtt * 1000:.1f} ms)")
+            return ok
+        return True
+
+    def on_firmware_message(self, kind: str, line: str):
+        """Lignes du firmware qui ne sont pas des acquittements (lecteur série)."""
+        if kind == STATUS:
+            self.grbl_status = line  # Réponse GRBL à '?'
+            return
+        if kind == TEMPERATURE:
+            return  # Rapport automatique (M155), sans intérêt pour le bras
+        print(f"[ROBOT] <<< {line}")
+
+    def wait_motion_complete(self, timeout: float = None) -> bool:
+        """
+        Attend que le firmware ait terminé tous les mouvements planifiés.
+        Marlin : M400 (l'ok n'arrive qu'une fois le planificateur vide).
+        GRBL : interrogation '?' jusqu'à l'état Idle.
+        Dans une séquence en flux, la synchronisation est mise en file (M400 / G4 P0) :
+        le firmware retient les commandes suivantes sans bloquer l'envoi.
+
+        Returns:
+            True si le mouvement est terminé, False en cas de timeout ou d'erreur
+        """
+        if self.batch_depth and self.streamer:
+            return self.send_command("G4 P0" if self.firmware == 'grbl' else "M400")
+        if self.firmware == 'grbl':
+            return self.wait_grbl_idle(self.watchdog.time_left(self.MOTION_TIMEOUT) if timeout is None else timeout)
+        return self.send_command("M400")
+
+    def wait_grbl_idle(self, timeout: float) -> bool:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            # '?' est une commande temps réel : pas de retour à la ligne, pas d'ok
+            status = self.serial_io.query_status(0.2)
+            if status and status.startswith('<Idle'):
+                return True
+            time.sleep(0.02)
+        print(f"[ERREUR] Mouvement non terminé après {timeout:.0f}s (état: {self.grbl_status})")
+        return False
+
+    def settle(self, fixed_delay: float):
+        """
+        Attente après un mouvement pas-à-pas avant l'action suivante : fin réelle du
+        mouvement (firmware) puis settle_floor, ou fixed_delay en mode 'sleep'.
+        """
+        if self.MOTION_SYNC == 'firmware':
+            self.wait_motion_complete()
+            self.dwell(self.SETTLE_FLOOR)
+        else:
+            self.dwell(fixed_delay)
+
+    def servo_dwell(self, command: str, fixed_delay: float):
+        """Attente après une commande servo : modèle calibré (plancher inclus) ou fixed_delay."""
+        modeled = self.servo_model.dwell_for_command(command)
+        if self.MOTION_SYNC == 'firmware' and modeled is not None:
+            self.dwell(modeled)
+        else:
+            self.dwell(fixed_delay)
+
+    @contextmanager
+    def command_batch(self):
+        """
+        Séquence envoyée d'un bloc : les commandes s'empilent dans le planificateur du
+        firmware sans attendre chaque ok, les pauses deviennent des G4 (dwell).
+        Attend la fin de l'envoi à la sortie (résultat dans batch_ok). Sans flux, ne change rien.
+        """
+        if not self.batch_depth:
+            self.batch_ok = True
+        errors = self.streamer.errors if self.streamer else 0
+        self.batch_depth += 1
+        try:
+            yield
+        finally:
+            self.batch_depth -= 1
+            if not self.batch_depth and self.streamer:
+                if not self.streamer.flush(timeout=self.watchdog.time_left(self.MOTION_TIMEOUT)):
+                    print(f"[ERREUR] Commandes sans réponse après {self.watchdog.elapsed():.1f}s (bras bloqué ?)")
+                    self.batch_ok = False
+                elif self.streamer.errors > errors:
+                    print(f"[ERREUR] {self.streamer.errors - errors} commande(s) refusée(s) par le firmware")
+                    self.batch_ok = False
+
+    def dwell(self, seconds: float):
+        """
+        Pause de seconds. Dans une séquence en flux, la pause est exécutée par le firmware
+        (G4, après la fin des mouvements déjà planifiés) au lieu de bloquer l'envoi.
+        """
+        if seconds <= 0:
+            return
+        if self.batch_depth and self.streamer:
+            # G4 : P en millisecondes sur Marlin, en secondes sur GRBL
+            if self.firmware == 'grbl':
+                self.send_command(f"G4 P{seconds:.3f}")
+            else:
+                self.send_command(f"G4 P{int(round(seconds * 1000))}")
+        else:
+            time.sleep(seconds)
+
+    def z_is_stepper(self) -> bool:
+        return self.Z_UP_COMMAND.startswith('G0') or self.Z_UP_COMMAND.startswith('G1')
+
     def init_board_state(self):
         """Initialise l'état du plateau avec la position de départ des échecs."""
-        self.board_state = {}
-        
-        # Pièces blanches (rang 1 et 2)
-        for file in 'abcdefgh':
-            self.board_state[f"{file}2"] = {"color": "white", "type": "pawn"}
-            
-        self.board_state.update({
-            "a1": {"color": "white", "type": "rook"}, "h1": {"color": "white", "type": "rook"},
-            "b1": {"color": "white", "type": "knight"}, "g1": {"color": "white", "type": "knight"},
-            "c1": {"color": "white", "type": "bishop"}, "f1": {"color": "white", "type": "bishop"},
-            "d1": {"color": "white", "type": "queen"}, "e1": {"color": "white", "type": "king"}
-        })
-
-        # Pièces noires (rang 7 et 8)
-        for file in 'abcdefgh':
-            self.board_state[f"{file}7"] = {"color": "black", "type": "pawn"}
-            
-        self.board_state.update({
-            "a8": {"color": "black", "type": "rook"}, "h8": {"color": "black", "type": "rook"},
-            "b8": {"color": "black", "type": "knight"}, "g8": {"color": "black", "type": "knight"},
-            "c8": {"color": "black", "type": "bishop"}, "f8": {"color": "black", "type": "bishop"},
-            "d8": {"color": "black", "type": "queen"}, "e8": {"color": "black", "type": "king"}
-        })
+        self.board_state = starting_position()
 
     def update_board_state(self, move_uci: str):
         """
@@ -298,6 +466,7 @@ class ChessRobotController:
         # Commande 2 : Aller aux coordonnées X/Y du coin a1
         # Ces coordonnées (self.BOARD_OFFSET_X/Y) viennent de votre calibration !
         self.send_command(f"G0 X{self.BOARD_OFFSET_X} Y{self.BOARD_OFFSET_Y}")
+        self.tool_position = (self.BOARD_OFFSET_X, self.BOARD_OFFSET_Y, self.Z_SAFE)
         
         print("[ROBOT] Initialisation terminée. Robot en position d'attente au-dessus de a1.")
     
@@ -330,21 +499,38 @@ class ChessRobotController:
 
         Args:
             z_target: Hauteur cible en mm
+
+        Returns:
+            True si la commande est acceptée
         """
+        command = self.z_command(z_target)
         # Vérifier si les commandes Z sont des G0 (stepper) ou M280 (servo)
-        if self.Z_UP_COMMAND.startswith('G0') or self.Z_UP_COMMAND.startswith('G1'):
+        if self.z_is_stepper():
             # Mode stepper : utiliser G0 Z directement avec la hauteur cible
             print(f"[Z-AXIS] Déplacement vers Z={z_target:.2f}mm")
-            self.send_command(f"G0 Z{z_target:.2f} F{self.FEED_RATE_TRAVEL}")
+            ok = self.send_command(command)
         else:
             # Mode servo : utiliser les commandes UP/DOWN configurées
-            if z_target <= self.Z_GRAB:
-                print(f"[Z-AXIS] Descente (Z={z_target:.2f}mm)")
-                self.send_command(self.Z_DOWN_COMMAND)
-            else:
-                print(f"[Z-AXIS] Montée (Z={z_target:.2f}mm)")
-                self.send_command(self.Z_UP_COMMAND)
-        time.sleep(self.Z_MOVE_DELAY)
+            print(f"[Z-AXIS] {'Descente' if z_target <= self.Z_GRAB else 'Montée'} (Z={z_target:.2f}mm)")
+            ok = self.send_command(command)
+            self.servo_dwell(command, self.Z_MOVE_DELAY)
+            return ok
+        if self.batch_depth and self.streamer:
+            return ok  # Le planificateur exécute les mouvements dans l'ordre : pas d'attente
+        self.settle(self.Z_MOVE_DELAY)
+        return ok
+
+    def z_command(self, z_target: float) -> str:
+        """Commande G-code qui amène l'axe Z à z_target (G0 Z pas-à-pas, ou UP/DOWN servo)."""
+        if self.z_is_stepper():
+            return f"G0 Z{z_target:.2f} F{self.FEED_RATE_TRAVEL}"
+        return self.Z_DOWN_COMMAND if z_target <= self.Z_GRAB else self.Z_UP_COMMAND
+
+    def z_key(self, z: float):
+        """Hauteur effective : un servo n'a que deux positions (haut / bas)."""
+        if self.z_is_stepper():
+            return round(z, 2)
+        return z <= self.Z_GRAB
 
     def move_to_position(self, x: float, y: float, z: float, feed_rate: int = None):
         """
@@ -356,6 +542,10 @@ class ChessRobotController:
             x, y, z: Coordonnées en millimètres
             feed_rate: Vitesse de déplacement pour X et Y (optionnelle)
         """
+        if self.sequence is not None:
+            self.sequence.move_to(x, y, z, feed_rate)
+            return
+        self.tool_position = None  # Mouvement hors séquence : position non suivie
         # Déplacer X et Y avec G0
         if feed_rate:
             self.send_command(f"G0 X{x:.2f} Y{y:.2f} F{feed_rate}")
@@ -363,9 +553,11 @@ class ChessRobotController:
             self.send_command(f"G0 X{x:.2f} Y{y:.2f}")
 
         # IMPORTANT: Attendre que les axes XY atteignent leur position
-        # avant de bouger l'axe Z (évite que la pince descende en vol)
-        print(f"[WAIT] Attente stabilisation XY ({self.XY_SETTLE_DELAY}s)...")
-        time.sleep(self.XY_SETTLE_DELAY)
+        # avant de bouger l'axe Z (évite que la pince descende en vol).
+        # En flux avec un Z pas-à-pas, le planificateur garantit déjà cet ordre ;
+        # un servo (M280) n'est pas planifié et a besoin de la fin du mouvement.
+        if not (self.batch_depth and self.streamer and self.z_is_stepper()):
+            self.settle(self.XY_SETTLE_DELAY)
 
         # Déplacer Z avec M280
         self.move_z(z)
@@ -375,13 +567,127 @@ class ChessRobotController:
         Active le mécanisme de préhension (électro-aimant ou pince).
         Utilise la commande configurée dans robot_config.ini
         """
+        if self.sequence is not None:
+            self.sequence.action(self.GRAB_COMMAND, self.GRAB_DELAY)
+            return
         self.send_command(self.GRAB_COMMAND)
-        time.sleep(self.GRAB_DELAY)
+        self.dwell(self.GRAB_DELAY)
 
     def release_piece(self):
         """Désactive le mécanisme de préhension."""
+        if self.sequence is not None:
+            self.sequence.action(self.RELEASE_COMMAND, self.RELEASE_DELAY)
+            return
         self.send_command(self.RELEASE_COMMAND)
-        time.sleep(self.RELEASE_DELAY)
+        self.dwell(self.RELEASE_DELAY)
+
+    # ==================== SÉQUENCES DE MOUVEMENTS ====================
+
+    @contextmanager
+    def motion_sequence(self, kind: str):
+        """
+        Enregistre les mouvements du bloc (move_to_position, grab_piece, release_piece)
+        puis envoie la séquence optimisée (MotionSequence) à la sortie.
+        Les blocs imbriqués (capture dans un coup) s'ajoutent à la séquence englobante.
+        """
+        if self.sequence is not None:
+            yield
+            return
+        self.sequence = MotionSequence(self.tool_position, z_key=self.z_key)
+        try:
+            yield
+        except Exception:
+            self.sequence = None
+            raise
+        sequence, self.sequence = self.sequence, None
+        self.run_sequence(sequence, kind)
+
+    def run_sequence(self, sequence: MotionSequence, kind: str):
+        """
+        Envoie une séquence optimisée et met à jour la position connue de l'outil.
+        La durée prévue (estimate_steps) arme le watchdog : timeouts des attentes,
+        progression affichée par le jeu, détection d'un bras bloqué.
+
+        Returns:
+            True si toutes les commandes ont été acceptées
+        """
+        predicted = estimate_steps(self, sequence.steps, self.tool_position)
+        self.watchdog.start(predicted, kind)
+        self.tool_position = None  # Inconnue si l'envoi échoue en cours de route
+        ok = True
+        try:
+            with self.command_batch():
+                steps = sequence.steps
+                for i, step in enumerate(steps):
+                    if step.kind == 'xy':
+                        ok &= self.send_command(step.gcode(self.z_command))
+                        # Attente avant Z ou la préhension ; deux XY successifs s'enchaînent
+                        next_kind = steps[i + 1].kind if i + 1 < len(steps) else None
+                        if next_kind != 'xy' and not (self.batch_depth and self.streamer and self.z_is_stepper()):
+                            self.settle(self.XY_SETTLE_DELAY)
+                    elif step.kind == 'z':
+                        ok &= self.move_z(step.z)
+                    else:
+                        ok &= self.send_command(step.command)
+                        self.dwell(step.delay)
+            ok &= self.batch_ok
+        finally:
+            _, predicted, actual = self.watchdog.finish()
+        if ok:
+            self.tool_position = sequence.position
+        print(f"[TIMING] {kind}: prévu {predicted:.1f}s, réel {actual:.1f}s")
+        self.record_sequence_stats(sequence, kind)
+        return ok
+
+    def run_program(self, program):
+        """
+        Exécute un programme compilé (MoveCompiler) depuis la position connue de l'outil.
+        Hauteur inconnue (démarrage, mouvement hors séquence) : l'outil monte à Z_SAFE
+        avant le premier déplacement XY. Dans un bloc motion_sequence, le programme
+        s'ajoute à la séquence en cours.
+        """
+        if self.sequence is not None:
+            self.sequence.replay(program.steps)
+            self.sequence.requested += program.requested
+            return
+        sequence = MotionSequence(self.tool_position, z_key=self.z_key)
+        if sequence.z is None:
+            sequence.move_z(self.Z_SAFE)
+        sequence.replay(program.steps)
+        sequence.requested += program.requested
+        self.run_sequence(sequence, program.kind)
+
+    def estimated_step_cost(self, kind: str) -> float:
+        """Temps estimé (s) d'une commande de mouvement inutile : aller-retour + attente."""
+        command_cost = 0.01
+        streamed_stepper = self.streamer is not None and self.z_is_stepper()
+        if self.MOTION_SYNC != 'firmware':
+            return command_cost + (self.XY_SETTLE_DELAY if kind == 'xy' else self.Z_MOVE_DELAY)
+        if streamed_stepper:
+            return command_cost
+        if kind == 'z' and not self.z_is_stepper():
+            return command_cost + self.servo_model.floor
+        return command_cost + self.SETTLE_FLOOR
+
+    def record_sequence_stats(self, sequence: MotionSequence, kind: str):
+        counts = sequence.counts()
+        moves = sequence.requested - counts['action']  # move_to_position appelés
+        dropped_xy = moves // 2 - counts['xy']
+        dropped_z = moves // 2 - counts['z']
+        saved = dropped_xy * self.estimated_step_cost('xy') + dropped_z * self.estimated_step_cost('z')
+        stats = self.sequence_stats.setdefault(kind, {'moves': 0, 'naive': 0, 'sent': 0, 'saved': 0.0})
+        stats['moves'] += 1
+        stats['naive'] += sequence.requested
+        stats['sent'] += len(sequence.steps)
+        stats['saved'] += saved
+        print(f"[SEQUENCE] {kind}: {sequence.requested} -> {len(sequence.steps)} commandes "
+              f"({dropped_xy} XY, {dropped_z} Z supprimés), ~{saved:.1f}s économisées")
+
+    def sequence_report(self):
+        print("[SEQUENCE] Type de coup      coups  naïf  envoyé  gain estimé")
+        for kind, stats in self.sequence_stats.items():
+            print(f"[SEQUENCE] {kind:<18}{stats['moves']:>5}{stats['naive'] / stats['moves']:>6.1f}"
+                  f"{stats['sent'] / stats['moves']:>8.1f}{stats['saved'] / stats['moves']:>10.1f}s")
 
     # ==================== FONCTIONS DE PRONATION ====================
 
@@ -400,7 +706,7 @@ class ChessRobotController:
         cmd = f"M280 P{self.PRONATION_PIN} S{angle}"
         print(f"[PRONATION] Rotation vers {angle}°")
         self.send_command(cmd)
-        time.sleep(self.PRONATION_DELAY)
+        self.servo_dwell(cmd, self.PRONATION_DELAY)
 
     def pronation_neutral(self):
         """Place la pince en position neutre."""
@@ -414,58 +720,16 @@ class ChessRobotController:
         """Tourne la pince vers la droite."""
         self.pronation_set_angle(self.PRONATION_RIGHT)
 
-    def execute_castling(self, king_from: str, king_to: str, rook_from: str, rook_to: str):
-        """
-        Exécute un roque (roi + tour).
-
-        Args:
-            king_from: Case de départ du roi (ex: 'e1')
-            king_to: Case d'arrivée du roi (ex: 'g1')
-            rook_from: Case de départ de la tour (ex: 'h1')
-            rook_to: Case d'arrivée de la tour (ex: 'f1')
-        """
-        print(f"[ROBOT] === EXÉCUTION DU ROQUE ===")
-
-        # 1. Déplacer le roi
-        print(f"[ROBOT] Étape 1/2 : Déplacement du roi {king_from} → {king_to}")
-        king_from_x, king_from_y = self.uci_to_coordinates(king_from)
-        king_to_x, king_to_y = self.uci_to_coordinates(king_to)
-
-        self.move_to_position(king_from_x, king_from_y, self.Z_SAFE, self.FEED_RATE_TRAVEL)
-        self.move_to_position(king_from_x, king_from_y, self.Z_GRAB, self.FEED_RATE_WORK)
-        self.grab_piece()
-        self.move_to_position(king_from_x, king_from_y, self.Z_LIFT, self.FEED_RATE_WORK)
-        self.move_to_position(king_to_x, king_to_y, self.Z_LIFT, self.FEED_RATE_TRAVEL)
-        self.move_to_position(king_to_x, king_to_y, self.Z_GRAB, self.FEED_RATE_WORK)
-        self.release_piece()
-        self.move_to_position(king_to_x, king_to_y, self.Z_SAFE, self.FEED_RATE_WORK)
-
-        # 2. Déplacer la tour
-        print(f"[ROBOT] Étape 2/2 : Déplacement de la tour {rook_from} → {rook_to}")
-        rook_from_x, rook_from_y = self.uci_to_coordinates(rook_from)
-        rook_to_x, rook_to_y = self.uci_to_coordinates(rook_to)
-
-        self.move_to_position(rook_from_x, rook_from_y, self.Z_SAFE, self.FEED_RATE_TRAVEL)
-        self.move_to_position(rook_from_x, rook_from_y, self.Z_GRAB, self.FEED_RATE_WORK)
-        self.grab_piece()
-        self.move_to_position(rook_from_x, rook_from_y, self.Z_LIFT, self.FEED_RATE_WORK)
-        self.move_to_position(rook_to_x, rook_to_y, self.Z_LIFT, self.FEED_RATE_TRAVEL)
-        self.move_to_position(rook_to_x, rook_to_y, self.Z_GRAB, self.FEED_RATE_WORK)
-        self.release_piece()
-        self.move_to_position(rook_to_x, rook_to_y, self.Z_SAFE, self.FEED_RATE_WORK)
-
-        # 3. Mettre à jour le board_state
+    def update_castling_state(self, king_from: str, king_to: str, rook_from: str, rook_to: str):
         king_data = self.board_state.get(king_from)
         self.board_state[king_to] = king_data
-        
+
         rook_data = self.board_state.get(rook_from)
         self.board_state[rook_to] = rook_data
-        
+
         del self.board_state[king_from]
         del self.board_state[rook_from]
 
-        print(f"[ROBOT] Roque terminé ✓")
-
     def is_castling(self, uci_move: str) -> tuple:
         """
         Détermine si un coup est un roque et retourne les infos nécessaires.
@@ -509,7 +773,7 @@ class ChessRobotController:
 
         # Vérifier si c'est un pion
         piece_data = self.board_state.get(from_square)
-        if piece_data is None:
+        if piece_data is None or piece_data.get('type') != 'pawn':
             return None
 
         # Prise en passant : mouvement diagonal d'un pion vers une case vide
@@ -534,6 +798,9 @@ class ChessRobotController:
         """
         Exécute un mouvement d'échecs sur le robot, en gérant les captures,
         le roque et la prise en passant.
+        Le coup est compilé en programme G-code (MoveCompiler, mis en cache par type de
+        coup et emplacement de capture) puis envoyé en flux (run_program) : retourne
+        quand le firmware a accepté toutes les commandes.
 
         Args:
             uci_move: Coup au format UCI (ex: 'e2e4', 'g1f3')
@@ -548,242 +815,214 @@ class ChessRobotController:
         to_square = uci_move[2:4]
         print(f"\n[ROBOT] [INFO] Reçu nouvelle instruction: {from_square} → {to_square} (Capture: {is_capture})")
 
-        # --- 2. Gestion des coups spéciaux (Roque) ---
-        is_castling_move, rook_from, rook_to = self.is_castling(uci_move)
-        if is_castling_move:
+        # --- 2. Type de coup (roque, prise en passant, capture) ---
+        kind = self.move_kind(uci_move, is_capture)
+        if kind == CASTLING:
             print(f"[ROBOT] [INFO] Coup spécial détecté: ROQUE.")
-            self.execute_castling(from_square, to_square, rook_from, rook_to)
-            print(f"[ROBOT] [SUCCESS] Roque {uci_move} terminé.")
-            return
-
-        # --- 3. Gestion de la capture (si nécessaire) ---
-        captured_piece_square = None  # Retiendra la case de la pièce capturée
-
-        # Cas spécial : Prise en Passant
-        en_passant_square = self.is_en_passant(uci_move)
-        if en_passant_square:
-            print(f"[ROBOT] [INFO] Coup spécial détecté: PRISE EN PASSANT. Pion capturé en {en_passant_square}.")
-            captured_piece_square = en_passant_square
-        # Cas d'une capture normale
-        elif is_capture:
+        elif kind == EN_PASSANT:
+            print(f"[ROBOT] [INFO] Coup spécial détecté: PRISE EN PASSANT. Pion capturé en {captured_square(from_square, to_square, kind)}.")
+        elif kind == CAPTURE:
             print("[ROBOT] [INFO] Capture normale détectée.")
-            captured_piece_square = to_square
 
-        # S'il y a bien une pièce à capturer, on la retire du plateau en premier
-        if captured_piece_square:
-            captured_piece_data = self.board_state.get(captured_piece_square)
-            
+        # --- 3. Emplacement de la pièce capturée dans la zone de capture ---
+        taken_square = captured_square(from_square, to_square, kind)
+        slot = None
+        if taken_square:
+            captured_piece_data = self.board_state.get(taken_square)
+
             # Sécurité : vérifier que le robot pense bien qu'il y a une pièce à cet endroit
             if captured_piece_data is None:
-                print(f"[ROBOT] [ERREUR] Désynchronisation! Le jeu a signalé une capture en {captured_piece_square}, mais le robot ne voit aucune pièce à cet endroit.")
+                print(f"[ROBOT] [ERREUR] Désynchronisation! Le jeu a signalé une capture en {taken_square}, mais le robot ne voit aucune pièce à cet endroit.")
+                kind, taken_square = MOVE, None
             else:
-                print(f"[ROBOT] [ACTION] Début de la procédure de capture pour la pièce {captured_piece_data} en {captured_piece_square}.")
+                print(f"[ROBOT] [ACTION] Début de la procédure de capture pour la pièce {captured_piece_data} en {taken_square}.")
                 is_white_captured = (captured_piece_data['color'] == "white")
-                cap_x, cap_y = self.uci_to_coordinates(captured_piece_square)
-                
-                # Séquence de retrait de la pièce capturée
-                self.remove_captured_piece(cap_x, cap_y, is_white_piece=is_white_captured, captured_piece_data=captured_piece_data)
-                
-                # Mettre à jour l'état du plateau IMMÉDIATEMENT pour la pièce capturée
-                del self.board_state[captured_piece_square]
-                print(f"[ROBOT] [STATE] Pièce en {captured_piece_square} retirée de l'état interne.")
-
-        # --- 4. Exécution du mouvement principal de la pièce ---
-        from_x, from_y = self.uci_to_coordinates(from_square)
-        to_x, to_y = self.uci_to_coordinates(to_square)
-
-        print(f"[ROBOT] [ACTION] Déplacement de la pièce de {from_square} à {to_square}.")
-
-        # Séquence "Pick and Place"
-        # 1. Aller au-dessus de la pièce source
-        self.move_to_position(from_x, from_y, self.Z_SAFE, self.FEED_RATE_TRAVEL)
-        # 2. Descendre pour attraper
-        self.move_to_position(from_x, from_y, self.Z_GRAB, self.FEED_RATE_WORK)
-        # 3. Activer la préhension
-        self.grab_piece()
-        # 4. Remonter avec la pièce
-        self.move_to_position(from_x, from_y, self.Z_LIFT, self.FEED_RATE_WORK)
-        # 5. Se déplacer vers la destination
-        self.move_to_position(to_x, to_y, self.Z_LIFT, self.FEED_RATE_TRAVEL)
-        # 6. Descendre pour déposer
-        self.move_to_position(to_x, to_y, self.Z_GRAB, self.FEED_RATE_WORK)
-        # 7. Relâcher la pièce
-        self.release_piece()
-        # 8. Remonter à une hauteur de sécurité
-        self.move_to_position(to_x, to_y, self.Z_SAFE, self.FEED_RATE_WORK)
-
-        # --- 5. Mise à jour de l'état interne du plateau pour la pièce déplacée ---
+                index = self.allocate_capture_slot(is_white_captured, captured_piece_data,
+                                                   self.uci_to_coordinates(taken_square))
+                slot = (is_white_captured, index)
+
+        # --- 4. Programme G-code du coup (cache) et exécution ---
+        program = self.compiler.compile(from_square, to_square, kind, slot)
+        print(f"[ROBOT] [ACTION] Déplacement de la pièce de {from_square} à {to_square} ({program}).")
+        self.run_program(program)
+
+        # --- 5. Mise à jour de l'état interne du plateau ---
+        if kind == CASTLING:
+            rook_from, rook_to = self.is_castling(uci_move)[1:]
+            self.update_castling_state(from_square, to_square, rook_from, rook_to)
+            print(f"[ROBOT] [SUCCESS] Roque {uci_move} terminé.")
+            return
+        if taken_square:
+            # La pièce capturée quitte le plateau avant que la pièce jouée n'arrive
+            del self.board_state[taken_square]
+            print(f"[ROBOT] [STATE] Pièce en {taken_square} retirée de l'état interne.")
         self.update_board_state(uci_move)
         print(f"[ROBOT] [STATE] État interne mis à jour pour le coup {uci_move}.")
         print(f"[ROBOT] [SUCCESS] Coup {uci_move} terminé ✓")
-        
-    def get_capture_zone_position(self, is_white_piece: bool):
-        """
-        Calcule la position de la zone de capture pour une pièce.
-
-        Disposition (vue de dessus, blancs en bas) :
-
-            [N 2x4]  [  PLATEAU  ]  [N 2x4]    <- côté noir (rangs 7-8)
-                     [           ]
-                     [           ]
-            [B 2x4]  [  PLATEAU  ]  [B 2x4]    <- côté blanc (rangs 1-2)
 
-        - Pièces BLANCHES capturées : zones côté blanc (X bas), gauche puis droite
-        - Pièces NOIRES capturées : zones côté noir (X haut), gauche puis droite
-        - Chaque zone : 2 colonnes (Y) × 4 rangées (X) = 8 cases
-        - Espacement : même que SQUARE_SIZE
+    def move_kind(self, uci_move: str, is_capture: bool) -> str:
+        """Type de coup (clé du programme compilé et des statistiques de séquence)."""
+        if self.is_castling(uci_move)[0]:
+            return CASTLING
+        if self.is_en_passant(uci_move):
+            return EN_PASSANT
+        return CAPTURE if is_capture else MOVE
+
+    @property
+    def white_capture_count(self) -> int:
+        """Pièces blanches dans la zone de capture."""
+        return self.capture_zone.count(True)
+
+    @property
+    def black_capture_count(self) -> int:
+        """Pièces noires dans la zone de capture."""
+        return self.capture_zone.count(False)
+
+    @property
+    def captured_pieces(self) -> list:
+        """Pièces de la zone de capture : {'type', 'color', 'slot', 'storage_pos'}."""
+        return [dict(piece, slot=(is_white, index), storage_pos=capture_slot_position(self, is_white, index))
+                for is_white, index, piece in self.capture_zone.occupied()]
+
+    def allocate_capture_slot(self, is_white_piece: bool, captured_piece_data: dict = None, near=None) -> int:
         """
-        # Charger l'état si disponible pour ne pas écraser les pièces précédentes après redémarrage
-        self.load_state()
-
-        spacing = self.SQUARE_SIZE  # Même espacement que le plateau
-        board_size = self.SQUARE_SIZE * 8
-
-        if is_white_piece:
-            # Pièces BLANCHES capturées : côté blanc du plateau (rangs 1-2, X bas)
-            count = self.white_capture_count
-
-            # Zone gauche (0-7) puis zone droite (8-15)
-            if count < 8:
-                # Zone GAUCHE : Y < plateau, X aligné sur rangs 1-4
-                zone = "gauche"
-                local_index = count
-                # 2 colonnes (Y) × 4 rangées (X)
-                col = local_index % 2  # 0 ou 1 (colonne Y)
-                row = local_index // 2  # 0 à 3 (rangée X)
-
-                # Position : à gauche du plateau
-                capture_y = self.BOARD_OFFSET_Y - spacing - (col * spacing)
-                capture_x = self.BOARD_OFFSET_X + (row * spacing) + (spacing / 2)
-            else:
-                # Zone DROITE : Y > plateau, X aligné sur rangs 1-4
-                zone = "droite"
-                local_index = count - 8
-                col = local_index % 2
-                row = local_index // 2
-
-                # Position : à droite du plateau
-                capture_y = self.BOARD_OFFSET_Y + board_size + (col * spacing)
-                capture_x = self.BOARD_OFFSET_X + (row * spacing) + (spacing / 2)
-
-            self.white_capture_count += 1
-            self.save_state()
-            print(f"[CAPTURE] Pièce BLANCHE #{count+1} -> zone {zone} ({capture_x:.1f}, {capture_y:.1f})")
-
-        else:
-            # Pièces NOIRES capturées : côté noir du plateau (rangs 7-8, X haut)
-            count = self.black_capture_count
-
-            # Zone gauche (0-7) puis zone droite (8-15)
-            if count < 8:
-                # Zone GAUCHE : Y < plateau, X aligné sur rangs 5-8
-                zone = "gauche"
-                local_index = count
-                col = local_index % 2
-                row = local_index // 2
-
-                # Position : à gauche du plateau, côté haut (rangs 5-8)
-                capture_y = self.BOARD_OFFSET_Y - spacing - (col * spacing)
-                capture_x = self.BOARD_OFFSET_X + board_size - (row * spacing) - (spacing / 2)
-            else:
-                # Zone DROITE : Y > plateau, X aligné sur rangs 5-8
-                zone = "droite"
-                local_index = count - 8
-                col = local_index % 2
-                row = local_index // 2
-
-                # Position : à droite du plateau, côté haut
-                capture_y = self.BOARD_OFFSET_Y + board_size + (col * spacing)
-                capture_x = self.BOARD_OFFSET_X + board_size - (row * spacing) - (spacing / 2)
-
-            self.black_capture_count += 1
-            self.save_state()
-            print(f"[CAPTURE] Pièce NOIRE #{count+1} -> zone {zone} ({capture_x:.1f}, {capture_y:.1f})")
+        Réserve l'emplacement libre de la zone de capture le plus proche de near (coordonnées
+        de la case de capture) et retourne son index (disposition : voir
+        gcode_program.capture_slot_position). L'occupation est tenue en mémoire et journalisée.
+        """
+        index = self.capture_zone.allocate(is_white_piece, captured_piece_data, near)
+        capture_x, capture_y = capture_slot_position(self, is_white_piece, index)
+        zone = "gauche" if index < 8 else "droite"
+        print(f"[CAPTURE] Pièce {'BLANCHE' if is_white_piece else 'NOIRE'} -> emplacement #{index+1}, zone {zone} ({capture_x:.1f}, {capture_y:.1f})")
+        if captured_piece_data:
+            print(f"[MEMORY] Pièce ajoutée à la mémoire: {captured_piece_data['type']} {captured_piece_data['color']} -> ({capture_x:.1f}, {capture_y:.1f})")
 
         # Vérification des coordonnées négatives
         if capture_x < 0 or capture_y < 0:
             print(f"[WARNING] Coordonnée négative détectée! ({capture_x:.1f}, {capture_y:.1f})")
-            print(f"[WARNING] Vérifiez board_offset_x/y dans robot_config.ini (min recommandé: {2*spacing:.1f}mm)")
+            print(f"[WARNING] Vérifiez board_offset_x/y dans robot_config.ini (min recommandé: {2*self.SQUARE_SIZE:.1f}mm)")
+        return index
+
+    def get_capture_zone_position(self, is_white_piece: bool, near=None):
+        """Réserve un emplacement de la zone de capture pour une pièce et retourne ses coordonnées."""
+        return capture_slot_position(self, is_white_piece, self.allocate_capture_slot(is_white_piece, near=near))
 
-        return (capture_x, capture_y)
+    def release_capture_slot(self, is_white_piece: bool, index: int):
+        """Libère un emplacement de la zone de capture (pièce remise sur le plateau) ; retourne la pièce."""
+        piece = self.capture_zone.release(is_white_piece, index)
+        if piece is not None:
+            print(f"[CAPTURE] Emplacement #{index+1} {'BLANC' if is_white_piece else 'NOIR'} libéré ({piece.get('type')})")
+        return piece
 
     def load_state(self):
-        """Charge les compteurs de capture depuis un fichier json."""
+        """Charge l'état du robot (compteurs, plateau, zone de capture, curseur du journal)."""
+        # On ne charge qu'une fois (démarrage du script)
+        if self.state_loaded:
+            return
+        self.state_loaded = True
         state_file = "robot_state.json"
         if os.path.exists(state_file):
             try:
                 import json
                 with open(state_file, 'r') as f:
                     data = json.load(f)
-                    # On ne charge que si les compteurs actuels sont à 0 (démarrage du script)
-                    if self.white_capture_count == 0 and self.black_capture_count == 0:
-                        self.white_capture_count = data.get('white_count', 0)
-                        self.black_capture_count = data.get('black_count', 0)
-                        print(f"[STATE] État chargé: W={self.white_capture_count}, B={self.black_capture_count}")
+                # Anciennes versions : seuls les compteurs étaient sauvegardés
+                if 'board_state' in data:
+                    self.board_state = data['board_state']
+                    self.journal_game = data.get('journal_game')
+                    self.journal_seq = data.get('journal_seq', 0)
+                if not self.capture_zone.load():
+                    self.import_capture_counts(data)
+                print(f"[STATE] État chargé: W={self.white_capture_count}, B={self.black_capture_count}, "
+                      f"{len(self.board_state)} pièces sur le plateau")
             except Exception as e:
                 print(f"[STATE] Erreur chargement état: {e}")
+        else:
+            self.capture_zone.load()
+
+    def import_capture_counts(self, data: dict):
+        """Anciens robot_state.json : compteurs de captures -> emplacements 0..n-1 occupés."""
+        for is_white, color in ((True, 'white'), (False, 'black')):
+            pieces = [p for p in data.get('captured_pieces', []) if p.get('color') == color]
+            for i in range(data.get('white_count' if is_white else 'black_count', 0)):
+                self.capture_zone.allocate(is_white, pieces[i] if i < len(pieces) else {'color': color})
 
     def save_state(self):
-        """Sauvegarde les compteurs de capture."""
+        """Sauvegarde l'état complet du robot (écriture atomique : jamais de fichier à moitié écrit)."""
         state_file = "robot_state.json"
         try:
             import json
+            # La zone de capture a son propre journal (capture_zone.jsonl)
             data = {
-                'white_count': self.white_capture_count,
-                'black_count': self.black_capture_count
+                'board_state': self.board_state,
+                'journal_game': self.journal_game,
+                'journal_seq': self.journal_seq
             }
-            with open(state_file, 'w') as f:
+            tmp_file = state_file + ".tmp"
+            with open(tmp_file, 'w') as f:
                 json.dump(data, f)
+            os.replace(tmp_file, state_file)
         except Exception as e:
             print(f"[STATE] Erreur sauvegarde état: {e}")
 
-    def remove_captured_piece(self, x: float, y: float, is_white_piece: bool = None, captured_piece_data: dict = None):
+    def reset_board(self, dry_run: bool = False) -> dict:
         """
-        Retire une pièce capturée et la place dans la zone de capture à côté du plateau.
+        Remet le plateau en position initiale : pièces déplacées et pièces de la zone de
+        capture, dans l'ordre qui minimise le trajet (board_reset), envoyé en une séquence.
 
-        Args:
-            x, y: Coordonnées de la pièce à capturer
-            is_white_piece: True si pièce blanche, False si noire, None pour auto-détection (obsolète)
-            captured_piece_data: Données de la pièce (optionnel, pour mémoire)
+        Returns:
+            Statistiques du plan (distance et durée prévues, plan naïf en comparaison) ;
+            'done' vaut True si le plateau est remis en place et son état enregistré
         """
-        # Si is_white_piece n'est pas fourni, utiliser l'ancien système (rétrocompatibilité)
-        if is_white_piece is None:
-            capture_x = self.CAPTURE_ZONE_X + (self.capture_count % 8) * self.CAPTURE_SPACING
-            capture_y = self.CAPTURE_ZONE_Y + (self.capture_count // 8) * self.CAPTURE_SPACING
-            self.capture_count += 1
-        else:
-            # Nouveau système : placer à côté du plateau selon la couleur
-            capture_x, capture_y = self.get_capture_zone_position(is_white_piece)
-            
-        # Enregistrer dans la mémoire des pièces capturées
-        if captured_piece_data:
-            self.captured_pieces.append({
-                'type': captured_piece_data['type'],
-                'color': captured_piece_data['color'],
-                'storage_pos': (capture_x, capture_y)
-            })
-            print(f"[MEMORY] Pièce ajoutée à la mémoire: {captured_piece_data['type']} {captured_piece_data['color']} -> ({capture_x:.1f}, {capture_y:.1f})")
-
-        print(f"[ROBOT] Déplacement pièce capturée vers zone ({capture_x:.1f}, {capture_y:.1f})")
+        plan = plan_reset(self)
+        stats = plan.report()
+        stats['done'] = not dry_run and not plan.order
+        if dry_run or not plan.order:
+            return stats
+        if not self.run_sequence(plan.sequence(), RESET):
+            # Plan interrompu : position réelle des pièces inconnue, l'état n'est pas modifié
+            print("[RESET] Remise en place interrompue : plateau à vérifier à la main")
+            return stats
+        for transfer in plan.order:
+            kind, ref = transfer.source
+            if kind == 'square':
+                self.board_state.pop(ref, None)
+            else:
+                self.capture_zone.release(*ref)
+            kind, ref = transfer.target
+            if kind == 'square':
+                self.board_state[ref] = dict(transfer.piece)
+            else:
+                self.capture_zone.take(*ref, transfer.piece)
+        self.save_state()
+        stats['done'] = True
+        print(f"[RESET] Plateau remis en place ({len(plan.order)} pièces déplacées)")
+        return stats
 
-        # Aller chercher la pièce
-        self.move_to_position(x, y, self.Z_SAFE, self.FEED_RATE_TRAVEL)
-        self.move_to_position(x, y, self.Z_GRAB, self.FEED_RATE_WORK)
-        self.grab_piece()
-        self.move_to_position(x, y, self.Z_LIFT, self.FEED_RATE_WORK)
+    def start_new_game(self, game_id, board_reset: bool = False):
+        """
+        Nouvelle partie dans le journal : le plateau repart de la position initiale.
 
-        # Déplacer vers la zone de capture
-        self.move_to_position(capture_x, capture_y, self.Z_LIFT, self.FEED_RATE_TRAVEL)
-        self.move_to_position(capture_x, capture_y, self.Z_GRAB, self.FEED_RATE_WORK)
-        self.release_piece()
-        self.move_to_position(capture_x, capture_y, self.Z_SAFE, self.FEED_RATE_WORK)
+        Args:
+            board_reset: Plateau remis en place par reset_board : l'état du plateau et de la
+                         zone de capture (pièces en trop, tampons) est déjà exact et conservé
+        """
+        if board_reset:
+            print(f"[STATE] Nouvelle partie {game_id}: plateau remis en place par le robot")
+        else:
+            print(f"[STATE] Nouvelle partie {game_id}: plateau réinitialisé")
+            self.init_board_state()
+            self.capture_zone.clear()  # Pièces prises remises en place à la main avec le plateau
+        self.journal_game = game_id
+        self.journal_seq = 0
+        self.save_state()
 
     def parse_next_move(self, move_line: str) -> dict:
         """
-        Parse le format du fichier next_move.txt: {couleur};{mouvement};{capture}
+        Parse le format du fichier next_move.txt: [{seq};]{couleur};{mouvement};{capture}
 
         Args:
-            move_line: Ligne du fichier (ex: "B;e2e4;0" ou "N;e4d5;1")
+            move_line: Ligne du fichier (ex: "B;e2e4;0", "N;e4d5;1" ou "12;N;e4d5;1" pour le journal)
 
         Returns:
             Dictionnaire avec 'color', 'move' et 'is_capture', ou None si invalide
@@ -795,6 +1034,9 @@ class ChessRobotController:
         """
         try:
             parts = move_line.strip().split(';')
+            # Lignes du journal : le numéro de séquence précède la couleur
+            if len(parts) == 4 and parts[0].strip().isdigit():
+                parts = parts[1:]
             if len(parts) < 2 or len(parts) > 3:
                 print(f"[ERREUR] Format invalide: {move_line} (doit être 'couleur;mouvement' ou 'couleur;mouvement;capture')")
                 return None
@@ -832,66 +1074,88 @@ class ChessRobotController:
     def monitor_next_move_file(self, filename: str = "next_move.txt", callback=None, move_complete_event: Event = None):
         """
         Surveille le fichier next_move.txt et exécute les coups automatiquement et signale move_complete_event après chaque coup.
-        Format attendu: {couleur};{mouvement}
-        Exemple: B;e2e4 (Blanc joue e2 vers e4)
+        Format attendu: journal en ajout seul {seq};{couleur};{mouvement};{capture}
+        Exemple: 1;W;e2e4;0 (Blanc joue e2 vers e4)
 
         Args:
             filename: Nom du fichier à surveiller
             callback: Fonction appelée après chaque mouvement
         """
-        last_move = ""
-        last_modified = 0
-
         # Si un chemin relatif est fourni, le construire depuis le dossier parent
+        current_dir = os.path.dirname(os.path.abspath(__file__))
+        parent_dir = os.path.dirname(current_dir)
         if not os.path.isabs(filename):
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            parent_dir = os.path.dirname(current_dir)
             filename = os.path.join(parent_dir, filename)
 
-        print(f"[ROBOT] Surveillance du fichier {filename}...")
-        print("[INFO] Format attendu: couleur;mouvement (ex: B;e2e4)")
+        # Le journal des coups est partagé avec le jeu (dossier parent, voir PARENT_DIR)
+        from move_journal import JournalReader
+        from file_watcher import create_watcher
+
+        # Lecture incrémentale : seuls les octets ajoutés depuis la dernière lecture sont lus,
+        # aucun coup n'est perdu même si plusieurs arrivent entre deux vérifications
+        reader = JournalReader(filename, skip_existing=False)
+        pending = reader.read_new()
+        if reader.game_id != self.journal_game:
+            # Journal d'une autre partie : ne pas rejouer les coups déjà présents
+            pending = []
+        elif pending:
+            # Reprise après un crash : seuls les coups non exécutés seront joués
+            print(f"[ROBOT] Reprise de la partie {self.journal_game} après le coup {self.journal_seq}")
+        # Réveil dès l'écriture d'un coup (inotify) au lieu d'une vérification toutes les 500ms
+        watcher = create_watcher(filename)
+
+        print(f"[ROBOT] Surveillance du fichier {filename} ({watcher.kind})...")
+        print("[INFO] Format attendu: seq;couleur;mouvement;capture (ex: 1;W;e2e4;0)")
 
         while not self.stop_monitoring.is_set():
             try:
-                if os.path.exists(filename):
-                    current_modified = os.path.getmtime(filename)
-
-                    # Si le fichier a été modifié
-                    if current_modified != last_modified:
-                        last_modified = current_modified
-
-                        with open(filename, 'r') as f:
-                            move_line = f.read().strip()
-
-                        # Si c'est un nouveau coup
-                        if move_line and move_line != last_move:
-                            last_move = move_line
-                            print(f"\n[ROBOT] Nouvelle instruction détectée: {move_line}")
-
-                            # Parser le coup
-                            parsed = self.parse_next_move(move_line)
-                            if parsed:
-                                color_name = "Blanc" if parsed['is_white'] else "Noir"
-                                capture_status = "CAPTURE" if parsed['is_capture'] else "Déplacement"
-                                print(f"[ROBOT] Couleur: {color_name}, Coup: {parsed['move']}, Type: {capture_status}")
-
-                                # Exécuter le mouvement avec l'info de capture
-                                self.execute_move(parsed['move'], is_capture=parsed['is_capture'])
-
-                                if callback:
-                                    callback(parsed)
-                                # Signaler au thread principal que le mouvement est terminé.
-                                if move_complete_event:
-                                    print("[ROBOT] Mouvement terminé, envoi du signal de complétion.")
-                                    move_complete_event.set()
-
-
-                time.sleep(0.5)  # Vérifier toutes les 500ms
+                entries, pending = pending + reader.read_new(), []
+                for entry in entries:
+                    if entry.game_id != self.journal_game:
+                        board_reset = False
+                        if self.RESET_AUTO and self.journal_game is not None:
+                            board_reset = self.reset_board()['done']
+                        self.start_new_game(entry.game_id, board_reset)
+                    if entry.seq <= self.journal_seq:
+                        continue  # Déjà exécuté avant un redémarrage
+                    move_line = entry.to_line()
+                    print(f"\n[ROBOT] Nouvelle instruction détectée: {move_line}")
+                    # Même identifiant que côté jeu : (partie, seq) du journal
+                    trace_id = move_trace.move_id(entry.game_id, entry.seq)
+                    move_trace.event("journal_read", trace_id, watcher=watcher.kind)
+
+                    # Parser le coup
+                    with move_trace.span("parse", trace_id):
+                        parsed = self.parse_next_move(move_line)
+                    if parsed:
+                        color_name = "Blanc" if parsed['is_white'] else "Noir"
+                        capture_status = "CAPTURE" if parsed['is_capture'] else "Déplacement"
+                        print(f"[ROBOT] Couleur: {color_name}, Coup: {parsed['move']}, Type: {capture_status}")
+
+                        # Exécuter le mouvement avec l'info de capture (les commandes G-code
+                        # envoyées pendant ce temps sont rattachées au coup)
+                        with move_trace.tracer.move(trace_id), move_trace.span("robot_execute", capture=parsed['is_capture']):
+                            self.execute_move(parsed['move'], is_capture=parsed['is_capture'])
+                        self.journal_seq = entry.seq
+                        self.save_state()
+                        move_trace.event("robot_done", trace_id)
+
+                        if callback:
+                            callback(parsed)
+                        # Signaler au thread principal que le mouvement est terminé.
+                        if move_complete_event:
+                            print("[ROBOT] Mouvement terminé, envoi du signal de complétion.")
+                            move_complete_event.set()
+
+                # Attente d'une modification ; le timeout sert de filet de sécurité
+                watcher.wait(0.5)
 
             except Exception as e:
                 print(f"[ERREUR] Surveillance: {e}")
                 time.sleep(1)
 
+        watcher.close()
+
     def start_monitoring_next_move(self, filename: str = "next_move.txt", callback=None, event: Event = None):
         """
         Démarre la surveillance de next_move.txt dans un thread séparé.
@@ -941,7 +1205,8 @@ def main():
         print("2. Mode surveillance next_move.txt (format: couleur;mouvement)")
         print("3. Mode test manuel")
         print("4. Test pronation (servo)")
-        print("5. Quitter")
+        print("5. Remise en place du plateau")
+        print("6. Quitter")
 
         choice = input("\nVotre choix: ")
 
@@ -1019,6 +1284,11 @@ def main():
                         robot.pronation_set_angle(angle)
                     except ValueError:
                         print("Commande invalide. Utilisez n/g/d ou un angle 0-180")
+        elif choice == '5':
+            # Remise en place : plan affiché, puis exécution après confirmation
+            robot.reset_board(dry_run=True)
+            if input("\nExécuter ce plan? (o/n): ").lower() == 'o':
+                robot.reset_board()
     else:
         # Si la connexion a échoué, afficher une erreur et arrêter
         print("\n[ERREUR FATALE] Impossible de continuer sans connexion au robot.")
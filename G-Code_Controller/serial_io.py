@@ -0,0 +1,459 @@
+"""
+Cœur d'entrée/sortie série partagé par le contrôleur et les outils de calibration.
+
+Un seul thread lit le port. Chaque ligne reçue est classée (classify_line) :
+- 'ok' / 'error' : réponse à la plus ancienne commande en attente (le firmware répond
+  dans l'ordre), qui est résolue par son Future ;
+- lignes de données (position M114, M115, M119, réglages $$, echo de M503...) :
+  rattachées à la commande en attente, et publiées ;
+- messages spontanés (echo:busy, températures auto-rapportées, état GRBL '<Idle|...>',
+  ALARM, bannière) : publiés aux abonnés, jamais pris pour une réponse.
+
+Les erreurs GRBL ('error:N') remplacent l'ok de la commande ; les erreurs Marlin
+('Error:...') précèdent l'ok de la même commande.
+
+Contrôle de flux (facultatif) : au plus `window` commandes en vol, et pour GRBL au plus
+`rx_buffer` octets en vol (comptage de caractères). Par défaut une seule commande en vol
+(envoi puis attente de l'ok, comme un envoi ligne à ligne).
+
+open_firmware ouvre le port et rend la main dès que la carte répond (bannière lue au fil
+de l'eau, puis sonde M115 / $I) au lieu d'une attente fixe de 2 s.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+import serial
+
+# Types de lignes reçues
+OK = 'ok'
+ERROR = 'error'
+RESEND = 'resend'
+BUSY = 'busy'
+TEMPERATURE = 'temperature'
+STATUS = 'status'
+POSITION = 'position'
+ENDSTOP = 'endstop'
+SETTING = 'setting'
+INFO = 'info'
+ECHO = 'echo'
+ALARM = 'alarm'
+BANNER = 'banner'
+OTHER = 'other'
+
+# Lignes rattachées à la commande en attente (réponse en plusieurs lignes avant l'ok)
+DATA_KINDS = (POSITION, ENDSTOP, SETTING, INFO, ECHO, OTHER)
+
+TEMPERATURE_PATTERN = re.compile(r'^(T\d?|B|C):\s*-?\d')
+POSITION_PATTERN = re.compile(r'^X:\s*-?\d')
+ENDSTOP_PATTERN = re.compile(r'^[xyze]\d?_(min|max|probe)\s*:', re.IGNORECASE)
+GRBL_ERROR_PATTERN = re.compile(r'^error:\d+')
+
+# Type de firmware détecté par port (dossier courant, comme robot_state.json)
+FIRMWARE_CACHE = "firmware_cache.json"
+PROBES = {'marlin': "M115", 'grbl': "$I"}
+
+
+def classify_line(line):
+    """
+    Type d'une ligne reçue du firmware (Marlin ou GRBL).
+
+    Les préfixes sont testés en début de ligne : 'echo:SD card ok' ou 'x_min: open'
+    ne sont pas des acquittements.
+    """
+    lower = line.lower()
+    if lower == 'ok' or lower.startswith('ok ') or lower.startswith('ok:'):
+        return OK  # 'ok T:21.3 /0.0' (M105) et 'ok N12 P15 B3' (ADVANCED_OK) compris
+    if lower.startswith('error') or lower.startswith('!!'):
+        return ERROR
+    if lower.startswith('resend') or lower.startswith('rs:'):
+        return RESEND
+    if lower.startswith('alarm'):
+        return ALARM
+    if lower.startswith('echo:busy') or lower.startswith('busy:'):
+        return BUSY
+    if line.startswith('<') and line.endswith('>'):
+        return STATUS
+    if TEMPERATURE_PATTERN.match(line):
+        return TEMPERATURE
+    if POSITION_PATTERN.match(line):
+        return POSITION
+    if lower.startswith('reporting endstop') or ENDSTOP_PATTERN.match(line):
+        return ENDSTOP
+    if line.startswith('$') and '=' in line:
+        return SETTING
+    if lower.startswith('echo:'):
+        return ECHO
+    if lower == 'start' or lower.startswith('grbl ') or lower.startswith('marlin'):
+        return BANNER
+    if line.startswith('[') or lower.startswith('firmware_name') or lower.startswith('cap:'):
+        return INFO
+    return OTHER
+
+
+class PendingCommand:
+    """Commande envoyée : lignes de réponse, ok / erreur et temps d'aller-retour."""
+
+    def __init__(self, line):
+        self.line = line
+        self.size = len(line) + 1   # Octets occupés dans le tampon du firmware (avec '\n')
+        self.sent_at = None
+        self.rtt = None             # Secondes entre l'envoi et l'ok / error
+        self.ok = None
+        self.error = None
+        self.lines = []             # Lignes de données reçues avant l'ok
+        self.future = Future()      # Résolu avec la commande elle-même
+
+    def complete(self, ok, error=None):
+        self.rtt = time.perf_counter() - self.sent_at
+        self.ok = ok
+        self.error = error or self.error
+        self.future.set_result(self)
+
+    @property
+    def done(self):
+        return self.future.done()
+
+    def response(self):
+        """Réponse complète telle que reçue (données puis ok / erreur)."""
+        return '\n'.join(self.lines + [OK if self.ok else (self.error or ERROR)])
+
+
+class SerialIO:
+    """
+    Args:
+        serial_conn: Port série ouvert (pyserial, avec un timeout de lecture)
+        firmware: 'marlin' ou 'grbl' (comptage de caractères si rx_buffer est donné)
+        window: Commandes en vol au maximum (None : pas de limite en lignes)
+        rx_buffer: Octets du tampon de réception (GRBL, None : pas de comptage)
+    """
+
+    def __init__(self, serial_conn, firmware='marlin', window=1, rx_buffer=None):
+        self.serial_conn = serial_conn
+        self.firmware = firmware.lower()
+        self.window = max(1, window) if window else None
+        self.rx_buffer = rx_buffer
+        self.in_flight = deque()
+        self.buffered = 0           # Octets en vol
+        self.condition = threading.Condition()
+        self.write_lock = threading.Lock()
+        self.subscribers = []       # (callback, types) ; types None : tous
+        self.running = False
+        self.thread = None
+        self.rtts = []
+        self.errors = 0
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self.read_loop, name="serial-reader", daemon=True)
+        self.thread.start()
+        return self
+
+    def subscribe(self, callback, kinds=None):
+        """
+        Abonne callback(kind, line) aux lignes qui ne sont pas des acquittements.
+
+        Args:
+            kinds: Types à recevoir (ex: (BUSY, TEMPERATURE)), None pour tous
+        """
+        self.subscribers.append((callback, frozenset(kinds) if kinds else None))
+        return callback
+
+    def unsubscribe(self, callback):
+        self.subscribers = [(cb, kinds) for cb, kinds in self.subscribers if cb is not callback]
+
+    def has_room(self, size):
+        if not self.in_flight:
+            return True  # Une ligne plus longue que le tampon passe seule
+        if self.window and len(self.in_flight) >= self.window:
+            return False
+        if self.firmware == 'grbl' and self.rx_buffer:
+            return self.buffered + size <= self.rx_buffer
+        return True
+
+    def send(self, line, timeout=None):
+        """
+        Envoie une ligne dès que le contrôle de flux le permet (bloquant sinon).
+
+        Returns:
+            PendingCommand, ou None si la place ne s'est pas libérée avant timeout
+        """
+        command = PendingCommand(line.strip())
+        with self.condition:
+            if not self.condition.wait_for(lambda: self.has_room(command.size) or not self.running, timeout):
+                return None
+            if not self.running:
+                return None
+            command.sent_at = time.perf_counter()
+            self.in_flight.append(command)
+            self.buffered += command.size
+            # Écriture sous le verrou : l'ordre d'écriture est l'ordre de in_flight
+            with self.write_lock:
+                self.serial_conn.write((command.line + '\n').encode())
+        return command
+
+    def wait(self, command, timeout=None):
+        """Attend la réponse d'une commande ; True si elle est acceptée."""
+        if command is None:
+            return False
+        try:
+            return command.future.result(timeout).ok
+        except FutureTimeout:
+            return False
+
+    def request(self, line, timeout=None):
+        """
+        Envoie une ligne et attend sa réponse.
+
+        Returns:
+            PendingCommand terminée (ok, error, lines), ou None sans réponse avant timeout
+        """
+        command = self.send(line, timeout)
+        if command is None:
+            return None
+        try:
+            return command.future.result(timeout)
+        except FutureTimeout:
+            return None
+
+    def write_realtime(self, data):
+        """Commande temps réel GRBL ('?', '!', '~', 0x18) : hors file, sans ok."""
+        with self.write_lock:
+            self.serial_conn.write(data)
+
+    def query_status(self, timeout=0.2):
+        """Interroge l'état GRBL ('?') ; retourne la ligne '<...>' ou None."""
+        reply = {}
+        event = threading.Event()
+
+        def on_status(kind, line):
+            reply['line'] = line
+            event.set()
+
+        self.subscribe(on_status, (STATUS,))
+        try:
+            self.write_realtime(b"?")
+            event.wait(timeout)
+        finally:
+            self.unsubscribe(on_status)
+        return reply.get('line')
+
+    def flush(self, timeout=None):
+        """Attend la réponse de toutes les commandes en vol ; False si timeout."""
+        with self.condition:
+            return self.condition.wait_for(lambda: not self.in_flight or not self.running, timeout)
+
+    def read_loop(self):
+        while self.running:
+            try:
+                raw = self.serial_conn.readline()
+            except Exception as e:
+                if self.running:
+                    print(f"[SERIE] Lecture série interrompue: {e}")
+                self.fail_all(str(e))
+                return
+            line = raw.decode(errors='ignore').strip()
+            if line:
+                self.handle_line(line)
+
+    def handle_line(self, line):
+        kind = classify_line(line)
+        if kind == OK:
+            self.complete_oldest(True)
+            return
+        if kind == ERROR:
+            if self.firmware == 'grbl' or GRBL_ERROR_PATTERN.match(line):
+                # GRBL : 'error:N' remplace l'ok de la commande
+                self.complete_oldest(False, line)
+            else:
+                # Marlin : l'erreur précède l'ok de la même commande
+                with self.condition:
+                    if self.in_flight:
+                        self.in_flight[0].error = line
+        elif kind == ALARM:
+            self.fail_all(line)
+        elif kind in DATA_KINDS:
+            with self.condition:
+                if self.in_flight:
+                    self.in_flight[0].lines.append(line)
+        self.publish(kind, line)
+
+    def complete_oldest(self, ok, error=None):
+        with self.condition:
+            if not self.in_flight:
+                return  # Réponse à une commande envoyée hors de ce lecteur (ex: bannière)
+            command = self.in_flight.popleft()
+            self.buffered -= command.size
+            self.condition.notify_all()
+        command.complete(ok and command.error is None, error)
+        self.rtts.append(command.rtt)
+        if not command.ok:
+            self.errors += 1
+            print(f"[ERREUR] Commande rejetée: {command.line} ({command.error})")
+
+    def publish(self, kind, line):
+        for callback, kinds in list(self.subscribers):
+            if kinds is None or kind in kinds:
+                try:
+                    callback(kind, line)
+                except Exception as e:
+                    print(f"[SERIE] Abonné en erreur sur '{line}': {e}")
+
+    def fail_all(self, reason):
+        with self.condition:
+            pending, self.in_flight = list(self.in_flight), deque()
+            self.buffered = 0
+            self.condition.notify_all()
+        for command in pending:
+            command.complete(False, reason)
+
+    def report(self):
+        """Latences aller-retour par commande (ms)."""
+        if not self.rtts:
+            return "aucune commande"
+        ordered = sorted(self.rtts)
+        p50 = ordered[len(ordered) // 2] * 1000
+        p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000
+        return (f"{len(ordered)} commandes, aller-retour p50={p50:.1f} ms p95={p95:.1f} ms "
+                f"max={ordered[-1] * 1000:.1f} ms, {self.errors} erreur(s)")
+
+    def close(self):
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join(timeout=3.0)
+        self.fail_all("port fermé")
+
+
+def firmware_from_lines(lines):
+    """'grbl' / 'marlin' d'après une bannière ou une réponse d'identification, sinon None."""
+    text = "\n".join(lines).lower()
+    if 'grbl' in text or '[ver:' in text:
+        return 'grbl'
+    if 'marlin' in text or 'firmware_name' in text or 'start' in text.split():
+        return 'marlin'
+    return None
+
+
+def load_firmware_cache(cache_file=FIRMWARE_CACHE):
+    try:
+        with open(cache_file) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_firmware_cache(port, firmware, cache_file=FIRMWARE_CACHE):
+    cache = load_firmware_cache(cache_file)
+    if cache.get(port) == firmware:
+        return
+    cache[port] = firmware
+    try:
+        tmp_file = cache_file + ".tmp"
+        with open(tmp_file, 'w') as f:
+            json.dump(cache, f)
+        os.replace(tmp_file, cache_file)
+    except OSError as e:
+        print(f"[SERIE] Cache firmware non écrit: {e}")
+
+
+def probe_firmware(io, first='marlin', deadline=None, interval=0.5):
+    """
+    Envoie M115 / $I jusqu'à une réponse et en déduit le firmware.
+
+    GRBL refuse M115 (error:N), Marlin ignore $I (echo:Unknown command, puis ok).
+    Les sondes perdues (octets reçus par le bootloader) restent sans réponse : une
+    nouvelle sonde part toutes les `interval` secondes, et la première réponse décide.
+
+    Returns:
+        'marlin', 'grbl', ou None sans réponse avant deadline
+    """
+    probe = PROBES[first]
+    pending = []
+    while deadline is None or time.monotonic() < deadline:
+        command = io.send(probe, interval)
+        if command is None:
+            return None
+        pending.append(command)
+        for command in pending:
+            try:
+                reply = command.future.result(interval if command is pending[-1] else 0)
+            except FutureTimeout:
+                continue
+            if reply.error and GRBL_ERROR_PATTERN.match(reply.error):
+                return 'grbl'
+            if reply.ok:
+                return firmware_from_lines(reply.lines) or 'marlin'
+    return None
+
+
+def open_firmware(port, baudrate, reset=True, timeout=0.2, boot_wait=2.0, ready_timeout=5.0,
+                  probe_interval=0.5, firmware=None, cache_file=FIRMWARE_CACHE):
+    """
+    Ouvre le port série et attend que le firmware réponde.
+
+    Avec reset, l'ouverture redémarre la carte (DTR) : on attend la première ligne de la
+    bannière (au plus boot_wait s) pour ne pas écrire pendant le bootloader, puis on sonde.
+    Sans reset, DTR reste bas à l'ouverture (la carte garde son état, selon le pilote)
+    et la sonde part tout de suite.
+
+    Args:
+        firmware: Type imposé ('marlin' / 'grbl'), sinon détecté (et mis en cache par port)
+        timeout: Timeout de lecture du port (latence de fermeture du lecteur)
+
+    Returns:
+        (port série ouvert, 'marlin' ou 'grbl', lignes de démarrage et d'identification)
+    """
+    started = time.monotonic()
+    serial_conn = serial.Serial(timeout=timeout, write_timeout=2)
+    serial_conn.port = port
+    serial_conn.baudrate = baudrate
+    if not reset:
+        serial_conn.dtr = False
+        serial_conn.rts = False
+    serial_conn.open()
+
+    banner = []
+    booted = threading.Event()
+
+    def on_line(kind, line):
+        banner.append(line)
+        booted.set()
+
+    io = SerialIO(serial_conn, window=None)
+    io.subscribe(on_line, (BANNER, ECHO, INFO, OTHER))
+    io.start()
+    try:
+        if reset:
+            booted.wait(boot_wait)
+        cached = load_firmware_cache(cache_file).get(port)
+        detected = probe_firmware(io, firmware or firmware_from_lines(banner) or cached or 'marlin',
+                                  started + ready_timeout, probe_interval)
+        # Réponses aux sondes en retard : lues ici plutôt que prises pour des acquittements
+        # ensuite. On attend tant qu'elles arrivent ; une sonde toujours sans réponse après
+        # deux intervalles sans progrès est perdue (octets reçus par le bootloader).
+        while io.in_flight and time.monotonic() < started + ready_timeout:
+            remaining = len(io.in_flight)
+            if io.flush(2 * probe_interval) or len(io.in_flight) == remaining:
+                break
+        if io.in_flight:
+            print(f"[SERIE] {len(io.in_flight)} sonde(s) sans réponse (perdue(s) au démarrage ?)")
+    finally:
+        io.close()
+    # Lignes arrivées pendant la fermeture du lecteur : elles ne répondent à aucune commande
+    serial_conn.reset_input_buffer()
+
+    if detected is None:
+        detected = firmware or firmware_from_lines(banner) or cached or 'marlin'
+        print(f"[SERIE] Pas de réponse de {port} après {ready_timeout:.0f}s, firmware supposé: {detected}")
+    else:
+        print(f"[SERIE] {port}: {detected} prêt en {time.monotonic() - started:.2f}s")
+    firmware = firmware or detected
+    save_firmware_cache(port, firmware, cache_file)
+    return serial_conn, firmware, banner
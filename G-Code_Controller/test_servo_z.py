@@ -6,6 +6,8 @@ Teste les commandes M280 P0 S12 et M280 P0 S168
 import serial
 import time
 
+from serial_io import open_firmware
+
 def test_servo_z(port='COM3', baudrate=115200):
     """
     Teste le servo moteur Z avec différentes commandes.
@@ -21,12 +23,8 @@ def test_servo_z(port='COM3', baudrate=115200):
     try:
         # Connexion au robot
         print(f"\n[1/6] Connexion au port {port} à {baudrate} bauds...")
-        ser = serial.Serial(port=port, baudrate=baudrate, timeout=2)
-        time.sleep(2)  # Attendre la réinitialisation
-
-        # Lire le message de démarrage
-        startup = ser.read_until(b'\n')
-        print(f"[ROBOT] {startup.decode(errors='ignore').strip()}")
+        ser, firmware, banner = open_firmware(port, baudrate)  # Attend que la carte réponde
+        print(f"[ROBOT] {banner[0] if banner else firmware}")
         print("[OK] Connexion établie\n")
 
         # Test 1 : Vérifier la version du firmware
@@ -120,8 +118,7 @@ def test_different_servo_pins():
     port = input("\nPort série (défaut: COM3): ").strip() or "COM3"
 
     try:
-        ser = serial.Serial(port=port, baudrate=115200, timeout=2)
-        time.sleep(2)
+        ser, _, _ = open_firmware(port, 115200)
 
         for pin in [0, 1, 2]:
             print(f"\n[TEST] Pin P{pin} - Montée (S12)...")
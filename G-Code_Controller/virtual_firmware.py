@@ -0,0 +1,459 @@
+#!/usr/bin/env python3
+"""
+Firmware Marlin / GRBL simulé sur un pseudo-terminal (pty), pour tester le robot sans carte.
+
+Le simulateur ouvre une paire pty : le côté esclave (/dev/pts/N) s'utilise comme un port
+série, sans aucune modification du code client :
+    ChessRobotController(port=firmware.port), serial.Serial(firmware.port), ...
+
+Comportement reproduit :
+- Ouverture du port = réinitialisation de la carte (DTR) : message de démarrage après
+  boot_delay, comme un Arduino qui redémarre. Le pty signale l'ouverture et la fermeture
+  côté client (POLLHUP tant qu'aucun client n'a ouvert le port).
+- Les mouvements (G0/G1/G28) passent par un planificateur de planner_size blocs exécutés
+  dans l'ordre ; l'ok arrive dès que le bloc est planifié (planificateur plein : l'ok attend).
+  La durée de chaque bloc vient du profil trapézoïdal (motion_timing.TrapezoidProfile),
+  réglable comme sur la carte (M201/M204/M205, $120/$121).
+- M400, G4, M3/M5 attendent la fin des mouvements planifiés ; M280 (servo) s'exécute
+  immédiatement, même si le bras est encore en mouvement, comme sur une vraie carte.
+- Réponses : ok, error:N (GRBL), echo:Unknown command (Marlin), M114 (position planifiée),
+  M115 / $I (identification), '?' GRBL (<Idle|MPos:...>), echo:busy: processing pendant les
+  longues attentes, rapports de température M155.
+- time_scale : secondes réelles par seconde simulée (1 = temps réel, 0.1 = 10x plus rapide,
+  0 = instantané). L'horloge simulée (clock) avance toujours de la durée réelle des blocs.
+- Trajectoire enregistrée (toolpath) : mouvements et actions (servo, préhension) datés en
+  temps simulé, exportables en JSONL.
+
+Usage:
+    python virtual_firmware.py --firmware marlin --time-scale 0.1 --toolpath trajet.jsonl
+    (puis port = /dev/pts/N affiché, dans robot_config.ini ou ChessRobotController(port=...))
+"""
+
+import argparse
+import json
+import math
+import os
+import re
+import select
+import threading
+import time
+import tty
+from collections import deque
+
+from motion_timing import TrapezoidProfile
+
+WORD = re.compile(r"([A-Z])\s*([-+]?(?:\d+\.?\d*|\.\d+))?")
+GRBL_REALTIME = b"?!~\x18"
+
+MARLIN_BANNER = ["start", "echo:Marlin 2.1.2 (virtuel)", "echo: Last Updated: virtual"]
+GRBL_BANNER = ["Grbl 1.1h ['$' for help]"]
+
+# Commandes acceptées sans effet sur la simulation
+MARLIN_NOOP = {"G20", "G21", "G92", "G94", "M17", "M18", "M82", "M84", "M106", "M107",
+               "M110", "M500", "M501", "M502", "M503", "M999"}
+GRBL_NOOP = {"G20", "G21", "G54", "G92", "G94", "G17", "M8", "M9"}
+GRIPPER = {"M3", "M4", "M5"}
+
+
+def parse_words(line):
+    """'G0 X10 Y-2.5 F3000' -> [('G', 0.0), ('X', 10.0), ('Y', -2.5), ('F', 3000.0)] (None sans valeur)."""
+    return [(letter, float(value) if value else None) for letter, value in WORD.findall(line.upper())]
+
+
+def strip_line(line):
+    """Retire commentaires, numéro de ligne et somme de contrôle (N12 G0 X1*57)."""
+    line = re.sub(r"\(.*?\)", "", line.split(';', 1)[0])
+    line = re.sub(r"\*\d+\s*$", "", line).strip()
+    return re.sub(r"^N\d+\s*", "", line, flags=re.IGNORECASE)
+
+
+class VirtualFirmware:
+    """
+    Args:
+        firmware: 'marlin' ou 'grbl'
+        time_scale: Secondes réelles par seconde simulée (0 = instantané)
+        xy_profile, z_profile: Profils de vitesse (TrapezoidProfile)
+        planner_size: Nombre de mouvements planifiés (BLOCK_BUFFER_SIZE Marlin, 16 sur GRBL)
+        busy_interval: Période (s simulées) des echo:busy: processing de Marlin
+        reject: Lignes refusées (Error: sur Marlin, error:20 sur GRBL), pour les tests
+        boot_delay: Délai (s réelles) entre l'ouverture du port et le message de démarrage
+    """
+
+    def __init__(self, firmware='marlin', time_scale=1.0, xy_profile=None, z_profile=None,
+                 planner_size=16, busy_interval=2.0, reject=(), boot_delay=0.1):
+        self.firmware = firmware
+        self.time_scale = time_scale
+        self.xy_profile = xy_profile or TrapezoidProfile(1000.0, 0.0 if firmware == 'grbl' else 8.0)
+        self.z_profile = z_profile or TrapezoidProfile(100.0, 0.0 if firmware == 'grbl' else 0.3)
+        self.planner_size = planner_size
+        self.busy_interval = busy_interval
+        self.reject = set(reject)
+        self.boot_delay = boot_delay
+
+        self.master, slave = os.openpty()
+        tty.setraw(slave)
+        self.port = os.ttyname(slave)
+        # Côté esclave fermé : l'ouverture par un client est visible (fin du POLLHUP)
+        os.close(slave)
+        self.opened = 0  # Nombre d'ouvertures du port (redémarrages simulés)
+        self.write_lock = threading.Lock()
+        self.condition = threading.Condition()
+        self.commands = deque()
+        self.planner = deque()
+        self.running = False
+        self.threads = []
+
+        self.position = [0.0, 0.0, 0.0]  # Position réelle (fin du dernier bloc exécuté)
+        self.planned = [0.0, 0.0, 0.0]   # Position après le dernier bloc planifié
+        self.feed = 3000.0
+        self.relative = False
+        self.servos = {}
+        self.gripper = False
+        self.clock = 0.0                 # Temps simulé écoulé (s)
+        self.toolpath = []
+        self.received = []               # Lignes reçues (après nettoyage)
+        self.temperature_interval = 0.0  # M155 S<n>
+
+    # ==================== CYCLE DE VIE ====================
+
+    def start(self):
+        self.running = True
+        for target in (self.read_loop, self.command_loop, self.planner_loop, self.report_loop):
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            self.threads.append(thread)
+        print(f"[VIRTUEL] Firmware {self.firmware} simulé sur {self.port} (échelle de temps {self.time_scale})")
+        return self
+
+    def close(self):
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+        for thread in self.threads:
+            thread.join(timeout=1.0)
+        try:
+            os.close(self.master)
+        except OSError:
+            pass
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def reply(self, line):
+        with self.write_lock:
+            try:
+                os.write(self.master, (line + "\n").encode())
+            except OSError:
+                pass
+
+    def sleep(self, simulated):
+        """Attente réelle correspondant à simulated secondes simulées."""
+        if self.time_scale > 0 and simulated > 0:
+            time.sleep(simulated * self.time_scale)
+
+    # ==================== RÉCEPTION ====================
+
+    def boot(self):
+        """Ouverture du port par un client : redémarrage de la carte, puis message de démarrage."""
+        self.opened += 1
+        time.sleep(self.boot_delay)
+        for line in (GRBL_BANNER if self.firmware == 'grbl' else MARLIN_BANNER):
+            self.reply(line)
+
+    def read_loop(self):
+        buffer = b""
+        poller = select.poll()
+        poller.register(self.master, select.POLLIN)
+        connected = False
+        while self.running:
+            try:
+                events = dict(poller.poll(50)).get(self.master, 0)
+                if events & select.POLLHUP:
+                    # Aucun client : attendre la prochaine ouverture du port
+                    connected, buffer = False, b""
+                    time.sleep(0.01)
+                    continue
+                if not connected:
+                    connected = True
+                    self.boot()
+                if not events & select.POLLIN:
+                    continue
+                data = os.read(self.master, 4096)
+            except OSError:
+                if not self.running:
+                    return
+                time.sleep(0.01)
+                continue
+            if self.firmware == 'grbl':
+                # Commandes temps réel : traitées dès réception, hors file
+                for byte in GRBL_REALTIME:
+                    if bytes([byte]) in data:
+                        data = data.replace(bytes([byte]), b"")
+                        if byte == ord('?'):
+                            self.reply(self.status_report())
+            buffer += data
+            while b"\n" in buffer:
+                raw, buffer = buffer.split(b"\n", 1)
+                with self.condition:
+                    self.commands.append(raw.decode(errors='ignore').strip())
+                    self.condition.notify_all()
+
+    def status_report(self):
+        with self.condition:
+            state = "Run" if self.planner else "Idle"
+            x, y, z = self.position
+        return f"<{state}|MPos:{x:.3f},{y:.3f},{z:.3f}|FS:{self.feed:.0f},0>"
+
+    # ==================== EXÉCUTION DES COMMANDES ====================
+
+    def command_loop(self):
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.commands or not self.running)
+                if not self.running:
+                    return
+                raw = self.commands.popleft()
+            line = strip_line(raw)
+            if line:
+                self.received.append(line)
+            if line in self.reject:
+                self.reply("error:20" if self.firmware == 'grbl' else f"Error:Commande refusée: {line}")
+                if self.firmware != 'grbl':
+                    self.reply("ok")
+                continue
+            try:
+                self.execute(line)
+            except Exception as e:
+                self.reply("error:2" if self.firmware == 'grbl' else f"Error:{e}")
+                if self.firmware != 'grbl':
+                    self.reply("ok")
+
+    def execute(self, line):
+        if not line:
+            self.reply("ok")
+            return
+        if self.firmware == 'grbl' and line.startswith('$'):
+            self.grbl_setting(line)
+            return
+        words = parse_words(line)
+        letter, number = words[0]
+        code = f"{letter}{int(number)}" if number is not None and letter in "GM" else letter
+        params = {w: v for w, v in words[1:]}
+
+        if code in ("G0", "G1") or code in "XYZF":
+            self.plan_move(dict(words) if code in "XYZF" else params, line)
+        elif code == "G28":
+            self.home(params, line)
+        elif code == "G4":
+            self.synchronize()
+            if self.firmware == 'grbl':
+                seconds = params.get('P') or 0.0
+            else:
+                seconds = (params.get('P') or 0.0) / 1000.0 + (params.get('S') or 0.0)
+            self.sleep(seconds)
+            with self.condition:
+                self.clock += seconds
+        elif code in ("G90", "G91"):
+            self.relative = code == "G91"
+        elif code == "M400" and self.firmware != 'grbl':
+            self.synchronize()
+        elif code == "M114" and self.firmware != 'grbl':
+            x, y, z = self.planned
+            self.reply(f"X:{x:.2f} Y:{y:.2f} Z:{z:.2f} E:0.00 Count X:{x:.2f} Y:{y:.2f} Z:{z:.2f}")
+        elif code == "M115" and self.firmware != 'grbl':
+            self.reply("FIRMWARE_NAME:Marlin 2.1.2 (virtuel) PROTOCOL_VERSION:1.0 "
+                       "MACHINE_TYPE:Virtual EXTRUDER_COUNT:0")
+        elif code == "M119" and self.firmware != 'grbl':
+            self.reply("Reporting endstop status")
+            for axis in "xyz":
+                self.reply(f"{axis}_min: open")
+        elif code == "M155" and self.firmware != 'grbl':
+            self.temperature_interval = params.get('S') or 0.0
+        elif code == "M280" and self.firmware != 'grbl':
+            # Servo : pas de planificateur, le mouvement démarre tout de suite
+            pin, angle = int(params.get('P') or 0), params.get('S')
+            self.servos[pin] = angle
+            self.record_action(line)
+        elif code in GRIPPER:
+            self.synchronize()
+            self.gripper = code != "M5"
+            self.record_action(line)
+        elif code in ("M201", "M204") and self.firmware != 'grbl':
+            accel = params.get('X') or params.get('S') or params.get('P') or params.get('T')
+            if accel:
+                self.xy_profile.accel = accel
+            if params.get('Z'):
+                self.z_profile.accel = params['Z']
+        elif code == "M205" and self.firmware != 'grbl':
+            if params.get('X') is not None:
+                self.xy_profile.jerk = params['X']
+            if params.get('Z') is not None:
+                self.z_profile.jerk = params['Z']
+        elif code == "M203" and self.firmware != 'grbl':
+            if params.get('X'):
+                self.xy_profile.max_speed = params['X'] * 60.0  # M203 en mm/s
+        elif code in (GRBL_NOOP if self.firmware == 'grbl' else MARLIN_NOOP):
+            pass
+        elif self.firmware == 'grbl':
+            self.reply("error:20")  # Commande non supportée
+            return
+        else:
+            self.reply(f'echo:Unknown command: "{line}"')
+        self.reply("ok")
+
+    def grbl_setting(self, line):
+        if line == "$I":
+            self.reply("[VER:1.1h.20190825:virtuel]")
+            self.reply("[OPT:V,15,128]")
+        elif line == "$$":
+            self.reply(f"$110={self.xy_profile.max_speed or 10000:.3f}")
+            self.reply(f"$120={self.xy_profile.accel:.3f}")
+            self.reply(f"$121={self.xy_profile.accel:.3f}")
+            self.reply(f"$122={self.z_profile.accel:.3f}")
+        elif line == "$H":
+            self.home({}, line)
+        elif "=" in line:
+            key, _, value = line[1:].partition("=")
+            if key in ("120", "121"):
+                self.xy_profile.accel = float(value)
+            elif key == "122":
+                self.z_profile.accel = float(value)
+            elif key in ("110", "111"):
+                self.xy_profile.max_speed = float(value)
+        self.reply("ok")
+
+    # ==================== PLANIFICATEUR ====================
+
+    def plan_move(self, params, line):
+        if params.get('F'):
+            self.feed = params['F']
+        target = list(self.planned)
+        for i, axis in enumerate("XYZ"):
+            if params.get(axis) is not None:
+                target[i] = target[i] + params[axis] if self.relative else params[axis]
+        if target != self.planned:
+            self.queue_block(target, self.feed, line)
+
+    def home(self, params, line):
+        axes = [axis for axis in "XYZ" if axis in params] or list("XYZ")
+        self.synchronize()
+        target = list(self.planned)
+        for axis in axes:
+            target["XYZ".index(axis)] = 0.0
+        self.queue_block(target, 3000.0, line)
+        self.synchronize()
+
+    def queue_block(self, target, feed, line):
+        start = self.planned
+        xy = math.hypot(target[0] - start[0], target[1] - start[1])
+        z = abs(target[2] - start[2])
+        duration = max(self.xy_profile.move_time(xy, feed), self.z_profile.move_time(z, feed))
+        with self.condition:
+            # Planificateur plein : l'ok attend qu'un bloc se libère
+            self.condition.wait_for(lambda: len(self.planner) < self.planner_size or not self.running)
+            self.planner.append({'start': list(start), 'end': list(target), 'feed': feed,
+                                 'duration': duration, 'command': line})
+            self.planned = list(target)
+            self.condition.notify_all()
+
+    def synchronize(self):
+        """Attend la fin des mouvements planifiés (M400) ; echo:busy pendant les longues attentes."""
+        period = self.busy_interval * self.time_scale if self.time_scale > 0 else None
+        with self.condition:
+            while self.planner and self.running:
+                if not self.condition.wait(period) and self.planner and self.firmware != 'grbl':
+                    self.reply("echo:busy: processing")
+
+    def planner_loop(self):
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.planner or not self.running)
+                if not self.running:
+                    return
+                block = self.planner[0]
+            self.sleep(block['duration'])
+            with self.condition:
+                self.planner.popleft()
+                self.toolpath.append({'type': 'move', 't': round(self.clock, 4),
+                                      'end_t': round(self.clock + block['duration'], 4),
+                                      'from': block['start'], 'to': block['end'],
+                                      'feed': block['feed'], 'command': block['command']})
+                self.clock += block['duration']
+                self.position = list(block['end'])
+                self.condition.notify_all()
+
+    def record_action(self, line):
+        with self.condition:
+            # Date simulée du début de l'action : les blocs restants sont encore en cours
+            self.toolpath.append({'type': 'action', 't': round(self.clock, 4),
+                                  'position': list(self.position), 'moving': bool(self.planner),
+                                  'command': line})
+
+    def report_loop(self):
+        while self.running:
+            interval = self.temperature_interval
+            if not interval:
+                time.sleep(0.05)
+                continue
+            time.sleep(max(0.01, interval * self.time_scale))
+            if self.temperature_interval:
+                self.reply("T:25.00 /0.00 B:25.00 /0.00 @:0 B@:0")
+
+    # ==================== TRAJECTOIRE ====================
+
+    def moves(self):
+        return [entry for entry in self.toolpath if entry['type'] == 'move']
+
+    def summary(self):
+        moves = self.moves()
+        distance = sum(math.dist(m['from'], m['to']) for m in moves)
+        return {'moves': len(moves), 'actions': len(self.toolpath) - len(moves),
+                'distance_mm': round(distance, 1), 'simulated_s': round(self.clock, 2)}
+
+    def save_toolpath(self, path):
+        with open(path, 'w') as f:
+            for entry in self.toolpath:
+                f.write(json.dumps(entry) + "\n")
+        print(f"[VIRTUEL] Trajectoire enregistrée dans {path} ({len(self.toolpath)} entrées)")
+
+
+def profiles_from_config(config_file, firmware='marlin'):
+    """Profils XY / Z depuis [KINEMATICS] de robot_config.ini (mêmes valeurs que le contrôleur)."""
+    import configparser
+    config = configparser.ConfigParser()
+    config.read(config_file)
+    kinematics = config['KINEMATICS'] if 'KINEMATICS' in config else {}
+    jerk_default = '0' if firmware == 'grbl' else None
+    return (TrapezoidProfile(float(kinematics.get('accel', '1000')), float(jerk_default or kinematics.get('jerk', '8'))),
+            TrapezoidProfile(float(kinematics.get('z_accel', '100')), float(jerk_default or kinematics.get('z_jerk', '0.3'))))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Firmware Marlin/GRBL simulé sur un pseudo-terminal")
+    parser.add_argument("--firmware", choices=("marlin", "grbl"), default="marlin")
+    parser.add_argument("--time-scale", type=float, default=1.0,
+                        help="Secondes réelles par seconde simulée (0.1 = 10x plus rapide, 0 = instantané)")
+    parser.add_argument("--config", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "robot_config.ini"),
+                        help="Rampes [KINEMATICS] à simuler")
+    parser.add_argument("--toolpath", help="Fichier JSONL de la trajectoire, écrit à l'arrêt")
+    args = parser.parse_args(argv)
+
+    xy_profile, z_profile = profiles_from_config(args.config, args.firmware)
+    firmware = VirtualFirmware(args.firmware, args.time_scale, xy_profile, z_profile).start()
+    print(f"[VIRTUEL] Port: {firmware.port}  (Ctrl+C pour arrêter)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    firmware.close()
+    print(f"[VIRTUEL] {firmware.summary()}")
+    if args.toolpath:
+        firmware.save_toolpath(args.toolpath)
+
+
+if __name__ == "__main__":
+    main()
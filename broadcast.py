@@ -0,0 +1,129 @@
+"""
+Diffusion des parties en direct aux spectateurs (publication / abonnement asyncio).
+
+- Chaque événement est sérialisé une seule fois puis poussé à tous les abonnés.
+- Chaque abonné a sa propre file bornée et sa propre tâche d'écriture : un spectateur
+  lent n'attend que lui-même, jamais la partie ni les autres spectateurs.
+- Un abonné qui arrive en cours de partie reçoit d'abord un instantané compact
+  (FEN + liste des coups), puis les coups suivants.
+- Si la file d'un abonné déborde, son retard est abandonné et remplacé par un
+  instantané à jour (resynchronisation) au lieu de bloquer ou de grossir sans limite.
+"""
+
+import asyncio
+
+
+class Subscriber:
+    """Un spectateur : file bornée d'octets déjà sérialisés, vidée par sa propre tâche."""
+
+    def __init__(self, writer, max_queue=64):
+        self.writer = writer
+        self.queue = asyncio.Queue(maxsize=max_queue)
+        self.resyncs = 0
+        self.sent = 0
+        self.task = asyncio.create_task(self.pump())
+
+    def offer(self, data, snapshot=None):
+        """Ajoute un message ; en cas de débordement, remplace le retard par snapshot()."""
+        try:
+            self.queue.put_nowait(data)
+        except asyncio.QueueFull:
+            if snapshot is None:
+                return
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.resyncs += 1
+            self.queue.put_nowait(snapshot())
+
+    async def pump(self):
+        try:
+            while True:
+                data = await self.queue.get()
+                if data is None or self.writer.is_closing():
+                    return
+                self.writer.write(data)
+                self.sent += 1
+                await self.writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+
+    def finish(self):
+        """Arrête la tâche après l'envoi des messages déjà en file."""
+        try:
+            self.queue.put_nowait(None)
+        except asyncio.QueueFull:
+            self.close()
+
+    def close(self):
+        self.task.cancel()
+
+
+class Channel:
+    """Canal d'une partie : abonnés et fonction d'instantané."""
+
+    def __init__(self, snapshot_line):
+        self.snapshot_line = snapshot_line  # () -> str, état courant de la partie
+        self.subscribers = {}               # clé (connexion) -> Subscriber
+        self.published = 0
+
+    def snapshot(self):
+        return (self.snapshot_line() + "\n").encode()
+
+    def publish(self, line):
+        data = (line + "\n").encode()  # Sérialisé une seule fois pour tous les abonnés
+        self.published += 1
+        for subscriber in self.subscribers.values():
+            subscriber.offer(data, self.snapshot)
+        return data
+
+
+class Broadcaster:
+    """Registre des canaux de toutes les parties."""
+
+    def __init__(self, max_queue=64):
+        self.max_queue = max_queue
+        self.channels = {}
+
+    def channel(self, key, snapshot_line):
+        if key not in self.channels:
+            self.channels[key] = Channel(snapshot_line)
+        return self.channels[key]
+
+    def publish(self, key, line):
+        """Diffuse une ligne ; retourne les octets sérialisés (réutilisables par l'appelant)."""
+        channel = self.channels.get(key)
+        if channel is None:
+            return (line + "\n").encode()
+        return channel.publish(line)
+
+    def subscribe(self, key, conn, writer):
+        """Abonne conn au canal : l'instantané est mis en file avant tout coup ultérieur."""
+        channel = self.channels[key]
+        if conn in channel.subscribers:
+            return channel.subscribers[conn]
+        subscriber = Subscriber(writer, self.max_queue)
+        subscriber.offer(channel.snapshot())
+        channel.subscribers[conn] = subscriber
+        return subscriber
+
+    def unsubscribe(self, key, conn):
+        channel = self.channels.get(key)
+        if channel:
+            subscriber = channel.subscribers.pop(conn, None)
+            if subscriber:
+                subscriber.close()
+
+    def unsubscribe_all(self, conn):
+        for key in list(self.channels):
+            self.unsubscribe(key, conn)
+
+    def close(self, key):
+        """Retire le canal d'une partie terminée ; ses abonnés reçoivent encore leur file."""
+        channel = self.channels.pop(key, None)
+        if channel:
+            for subscriber in channel.subscribers.values():
+                subscriber.finish()
+
+    def spectators(self, key):
+        channel = self.channels.get(key)
+        return len(channel.subscribers) if channel else 0
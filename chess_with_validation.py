@@ -1,30 +1,49 @@
 import pygame
 from pygame.locals import *
 import random
+import threading
 import time
 import chess
 
 from piece import Piece
 from utils import Utils
+from legal_move_index import LegalMoveIndex
+from move_journal import MoveJournal
+import move_trace
 
 class Chess(object):
-    # MODIFIED: Constructor now accepts player_color for PVP setup and robot_wait_callback
-    def __init__(self, screen, pieces_src, square_coords, square_length, mode, player_color='WHITE', robot_wait_callback=None):
+    # MODIFIED: Constructor now accepts player_color for PVP setup
+    # headless=True runs the same turn logic without any display (simulation, CI)
+    # chess_pieces: sprite sheet already loaded and shared by several boards (simul); pieces_src is then unused
+    def __init__(self, screen, pieces_src, square_coords, square_length, mode, player_color='WHITE', headless=False,
+                 chess_pieces=None):
         self.screen = screen
         self.mode = mode
         self.player_color = player_color # Store the color this instance plays as
-        self.chess_pieces = Piece(pieces_src, cols=6, rows=2)
+        self.headless = headless
+        self.chess_pieces = None if headless else (chess_pieces or Piece(pieces_src, cols=6, rows=2))
         self.board_locations = square_coords
         self.square_length = square_length
         self.turn = {"black": 0, "white": 1}
-        self.robot_wait_callback = robot_wait_callback  # Callback pour attendre le robot
 
-        self.moves = []
+        self.moves = []             # Legal chess.Move list of the selected piece
+        self.moves_mask = 0         # 64-bit mask of their target squares (highlighting)
+        self.legal_index = None     # LegalMoveIndex of the current position (built lazily)
+        self.selected_square = None # (file, rank) of the selected piece
+        self.dragging = False       # True while the selected piece follows the mouse
+        self.gesture_started = None # time.time() of the selection (move_trace 'input' span)
         self.utils = Utils()
-        self.BESTMOVE_FILE = "next_move.txt"
+        # No communication file in headless mode: simulated games must not drive the robot
+        self.BESTMOVE_FILE = None if headless else "next_move.txt"
+        self.journal = MoveJournal(self.BESTMOVE_FILE) if self.BESTMOVE_FILE else None
+        self.game_id = None
+        self.last_logged_move = None
         self.stockfish_thinking = False
         self.stockfish_failures = 0
         self.engine_instance = None
+        self.search_thread = None   # Background engine search (PVE), see start_engine_search
+        self.search_result = None   # (fen, bestmove_uci, seconds) once the search is over
+        self.on_search_done = None  # Called from the search thread (e.g. wake the display loop)
         
         if self.mode == 'pve':
             self.initialize_engine()
@@ -59,12 +78,21 @@ class Chess(object):
     def reset(self):
         """Resets the game to the starting position."""
         self.moves = []
+        self.moves_mask = 0
+        self.legal_index = None
+        self.selected_square = None
+        self.dragging = False
+        self.utils.clear_actions()
         self.stockfish_thinking = False
+        self.search_result = None # A search still running for the old game is discarded by its FEN
         self.winner = ""
         self.validation_board = chess.Board()
         self.turn = {"black": 0, "white": 1}
         self.white_captured = []
         self.black_captured = []
+        # In PVP the launcher opens the journal once for both clients (initialize_pvp_game_state)
+        if self.journal and self.mode == 'pve':
+            self.game_id = self.journal.start_game()
 
         self.piece_location = {chr(i): {j: ["", False, [k, 8-j]] for j in range(1, 9)} for k, i in enumerate(range(97, 105))}
         setup = {
@@ -81,6 +109,59 @@ class Chess(object):
             else:
                 for col in "abcdefgh": self.piece_location[col][rank][0] = pieces[0]
 
+    def set_position(self, fen):
+        """
+        Starts from an arbitrary position (match openings from an EPD file).
+        The side to move comes from the FEN; the captured lists hold the pieces missing
+        from the starting set (promotions aside).
+        """
+        self.validation_board = chess.Board(fen)
+        self.legal_index = None
+        self.clear_selection()
+        white_to_move = self.validation_board.turn == chess.WHITE
+        self.turn = {"black": 0 if white_to_move else 1, "white": 1 if white_to_move else 0}
+        for col in self.piece_location:
+            for rank in self.piece_location[col]:
+                self.piece_location[col][rank][0] = ""
+        for square, piece in self.validation_board.piece_map().items():
+            color = "white" if piece.color == chess.WHITE else "black"
+            name = chess.piece_name(piece.piece_type)
+            self.piece_location[chess.FILE_NAMES[chess.square_file(square)]][chess.square_rank(square) + 1][0] = f"{color}_{name}"
+        starting_counts = {chess.PAWN: 8, chess.KNIGHT: 2, chess.BISHOP: 2, chess.ROOK: 2, chess.QUEEN: 1}
+        self.white_captured, self.black_captured = [], []
+        for piece_type, count in starting_counts.items():
+            name = chess.piece_name(piece_type)
+            missing_black = count - len(self.validation_board.pieces(piece_type, chess.BLACK))
+            missing_white = count - len(self.validation_board.pieces(piece_type, chess.WHITE))
+            self.white_captured += [f"black_{name}"] * max(0, missing_black)
+            self.black_captured += [f"white_{name}"] * max(0, missing_white)
+        self.winner = ""
+        self.check_game_status()
+
+    def restore_moves(self, moves_uci, game_id=None):
+        """
+        Replays a saved game (crash recovery) and re-opens it in the journal under its id,
+        so the robot skips the moves it already executed.
+
+        Returns:
+            bool: True if every move was replayed
+        """
+        if self.journal:
+            self.game_id = self.journal.start_game(game_id)
+        for move_uci in moves_uci:
+            is_capture = self.get_capture_info(move_uci)
+            if not self.validate_and_apply_move(move_uci):
+                print(f"[ERROR] Could not replay saved move {move_uci}")
+                return False
+            self.log_move_to_file(move_uci, is_capture)
+        return True
+
+    def get_legal_index(self):
+        """Returns the legal-move index of the current position, building it once per position."""
+        if self.legal_index is None:
+            self.legal_index = LegalMoveIndex(self.validation_board)
+        return self.legal_index
+
     def get_capture_info(self, move_uci):
         """
         Détermine si un coup UCI est une capture.
@@ -94,7 +175,7 @@ class Chess(object):
         """
         try:
             move = chess.Move.from_uci(move_uci)
-            if move in self.validation_board.legal_moves:
+            if self.get_legal_index().is_legal(move):
                 # Vérifier si c'est une capture ou une prise en passant
                 return self.validation_board.is_capture(move) or self.validation_board.is_en_passant(move)
             return False
@@ -103,17 +184,26 @@ class Chess(object):
 
     def log_move_to_file(self, move_uci, is_capture=False):
         """
-        Logs the move to the communication file in the format 'W;e2e4;0' or 'B;e4d5;1'.
+        Appends the move to the communication journal as 'seq;W;e2e4;0' or 'seq;B;e4d5;1'.
+        seq is the ply number, so both PVP clients and the robot agree on it.
+        The journal is compacted once the game is over.
 
         Args:
             move_uci: Coup au format UCI
             is_capture: True si c'est une capture (défaut: False)
         """
+        player_char = "B" if self.validation_board.turn == chess.WHITE else "W"
+        capture_flag = "1" if is_capture else "0"
+        # Kept for the PvP transport, which forwards the same record to the opponent
+        self.last_logged_move = (player_char, move_uci, capture_flag)
+        if not self.journal:
+            return
+        seq = len(self.validation_board.move_stack)
         try:
-            player_char = "B" if self.validation_board.turn == chess.WHITE else "W"
-            capture_flag = "1" if is_capture else "0"
-            with open(self.BESTMOVE_FILE, "w") as f:
-                f.write(f"{player_char};{move_uci};{capture_flag}")
+            with move_trace.span("journal_write", move_trace.move_id(self.game_id, seq)):
+                self.journal.append(seq, player_char, move_uci, capture_flag)
+            if self.winner:
+                self.journal.compact()
         except Exception as e:
             print(f"[ERROR] Could not write to {self.BESTMOVE_FILE}: {e}")
 
@@ -135,24 +225,104 @@ class Chess(object):
         (not board_turn_is_white and human_color == 'black'):
             
             # handle_human_move retourne déjà True si un coup est joué, on propage juste la valeur
-            return self.handle_human_move(human_color, is_flipped=is_flipped)
+            move_made = self.handle_human_move(human_color, is_flipped=is_flipped)
+            if move_made and not self.winner:
+                # La recherche démarre tout de suite : elle se déroule pendant que le robot
+                # exécute le coup humain
+                self.start_engine_search()
+            return move_made
         
         # Si c'est le tour de l'IA
         else:
-            if not self.stockfish_thinking:
-                pygame.time.wait(200) # Petit délai avant que l'IA ne joue
-                # run_stockfish_move retourne maintenant True si un coup est joué
+            self.utils.clear_actions() # Les clics pendant le tour de l'IA sont ignorés
+            if self.engine_instance is None:
+                # Pas de moteur : run_stockfish_move joue un coup aléatoire
                 return self.run_stockfish_move()
+            self.start_engine_search()
+            bestmove_uci = self.take_engine_move()
+            if bestmove_uci is not None:
+                # run_stockfish_move retourne maintenant True si un coup est joué
+                return self.run_stockfish_move(bestmove_uci)
                 
         return False # Aucun coup n'a été joué dans cette frame
 
+    def start_engine_search(self):
+        """Starts the engine search for the current position in a background thread (no-op if running)."""
+        fen = self.validation_board.fen()
+        if self.search_result is not None and self.search_result[0] != fen:
+            self.search_result = None # Result of a position that no longer exists (reset)
+        if self.engine_instance is None or self.search_thread is not None or self.search_result is not None:
+            return
+        engine = self.engine_instance
+        self.stockfish_thinking = True
+        trace_id = self.next_move_id()
+
+        def search():
+            start = time.perf_counter()
+            try:
+                with move_trace.span("engine_search", trace_id):
+                    bestmove_uci = engine.get_best_move(fen)
+            except Exception as e:
+                print(f"[ERROR] Engine search failed: {e}")
+                bestmove_uci = None
+            self.search_result = (fen, bestmove_uci, time.perf_counter() - start)
+            self.search_thread = None
+            if self.on_search_done:
+                self.on_search_done()
+
+        self.search_thread = threading.Thread(target=search, daemon=True)
+        self.search_thread.start()
+
+    def take_engine_move(self):
+        """
+        Returns the move of a finished search for the current position, "" if the engine
+        found none, or None while no result is available.
+        A result for another position (game reset meanwhile) is dropped.
+        """
+        if self.search_result is None:
+            return None
+        fen, bestmove_uci, seconds = self.search_result
+        self.search_result = None
+        self.stockfish_thinking = False
+        if fen != self.validation_board.fen():
+            return None
+        print(f"[PIPE] Engine search: {seconds:.2f}s")
+        # Pas de coup trouvé : run_stockfish_move joue un coup aléatoire
+        return bestmove_uci or ""
+
+    def next_move_id(self):
+        """Trace id of the move about to be played ('<game>-<seq>', same as the robot's)."""
+        return move_trace.move_id(self.game_id, len(self.validation_board.move_stack) + 1)
+
+    def handle_event(self, event):
+        """Feeds a pygame event to the input layer (mouse button transitions only)."""
+        return self.utils.handle_event(event)
+
     # MODIFIED: This function now returns True if a move was successfully made.
     def handle_human_move(self, turn_color, is_flipped):
         """
         Manages mouse input for a human player.
+        Consumes the pending discrete actions (press/release) queued by handle_event,
+        so a click costs exactly one selection or one move attempt.
         Returns True if a valid move was made, False otherwise.
         """
-        square = self.get_selected_square(is_flipped)
+        action = self.utils.get_action()
+        while action is not None:
+            kind, pos = action
+            if kind == "press":
+                move_made = self.on_press(pos, turn_color, is_flipped)
+            else:
+                move_made = self.on_release(pos, turn_color, is_flipped)
+            if move_made:
+                # The rest of the gesture belongs to the move that was just played
+                self.utils.clear_actions()
+                return True
+            action = self.utils.get_action()
+        return False
+
+    def on_press(self, pos, turn_color, is_flipped):
+        """Left button pressed: selects an own piece (and starts a drag) or targets a square."""
+        square = self.get_square_at(pos, is_flipped)
         if not square:
             return False
 
@@ -161,73 +331,100 @@ class Chess(object):
 
         # If a valid piece for the current turn is clicked
         if piece_name and piece_color == turn_color:
-            for k in self.piece_location:
-                for r in self.piece_location[k]:
-                    self.piece_location[k][r][1] = False
-            self.piece_location[columnChar][rowNo][1] = True
-            
-            # Highlight all legal moves for the selected piece
-            legal_moves_uci = [move.uci() for move in self.validation_board.legal_moves]
-            self.moves = []
-            start_square = f"{columnChar}{rowNo}".lower()
-            for move in legal_moves_uci:
-                if move.startswith(start_square):
-                    col_idx = ord(move[2]) - 97
-                    row_idx = 8 - int(move[3])
-                    self.moves.append([col_idx, row_idx])
+            self.select_square(columnChar, rowNo)
+            self.gesture_started = time.time()
+            self.dragging = True
             return False # Selecting a piece is not a move
 
         # If a move is being attempted (a piece is already selected)
-        elif any(v[1] for val in self.piece_location.values() for v in val.values()):
-            for k_from in self.piece_location:
-                for r_from in self.piece_location[k_from]:
-                    if self.piece_location[k_from][r_from][1]:
-                        move_uci = f"{k_from}{r_from}{columnChar}{rowNo}".lower()
-                        pawn_name = f"{turn_color}_pawn"
-                        if self.piece_location[k_from][r_from][0] == pawn_name and (rowNo == 8 or rowNo == 1):
-                            move_uci += 'q'
-
-                        # Détecter si c'est une capture AVANT d'appliquer le coup
-                        is_capture = self.get_capture_info(move_uci)
-
-                        if self.validate_and_apply_move(move_uci):
-                            # In PVP, log the move to the file for the other client
-                            print(f"[{self.player_color}] Move made: {move_uci}. Logging to file.")
-                            self.log_move_to_file(move_uci, is_capture)
-
-                            # Attendre que le robot termine le coup (si activé)
-                            if self.robot_wait_callback:
-                                self.robot_wait_callback()
-
-                            return True # A move was successfully made!
-                        else:
-                            # If move is illegal, just deselect the piece
-                            self.piece_location[k_from][r_from][1] = False
-                            self.moves = []
-                        return False # An illegal move attempt is not a successful move
+        if self.selected_square:
+            return self.try_move_to(columnChar, rowNo, turn_color)
         return False
 
-    def get_selected_square(self, is_flipped):
-        """Gets board coordinates from a mouse click, accounting for board orientation."""
-        if self.utils.left_click_event():
-            mouse_pos = self.utils.get_mouse_event()
-            for i in range(8):
-                for j in range(8):
-                    rect = pygame.Rect(self.board_locations[i][j][0], self.board_locations[i][j][1], self.square_length, self.square_length)
-                    if rect.collidepoint(mouse_pos):
-                        screen_col, screen_row = i, j
-                        board_col = 7 - screen_col if is_flipped else screen_col
-                        board_row = 7 - screen_row if is_flipped else screen_row
-                        colChar = chr(97 + board_col)
-                        rowNo = 8 - board_row
-                        return [self.piece_location[colChar][rowNo][0], colChar, rowNo]
+    def on_release(self, pos, turn_color, is_flipped):
+        """Left button released: drops the dragged piece if it left its square."""
+        if not self.dragging:
+            return False
+        self.dragging = False
+
+        square = self.get_square_at(pos, is_flipped)
+        if not square or not self.selected_square:
+            return False
+        _, columnChar, rowNo = square
+        if (columnChar, rowNo) == self.selected_square:
+            return False # Simple click: the piece stays selected for a second click
+        return self.try_move_to(columnChar, rowNo, turn_color)
+
+    def select_square(self, columnChar, rowNo):
+        """Marks a square as selected and highlights the legal moves of its piece."""
+        self.clear_selection()
+        self.piece_location[columnChar][rowNo][1] = True
+        self.selected_square = (columnChar, rowNo)
+
+        # Highlight all legal moves for the selected piece (looked up in the position index)
+        from_square = chess.parse_square(f"{columnChar}{rowNo}")
+        index = self.get_legal_index()
+        self.moves = index.moves(from_square)
+        self.moves_mask = index.targets(from_square)
+
+    def clear_selection(self):
+        """Deselects every square and drops the highlighted moves."""
+        if self.selected_square:
+            k, r = self.selected_square
+            self.piece_location[k][r][1] = False
+        self.selected_square = None
+        self.dragging = False
+        self.moves = []
+        self.moves_mask = 0
+
+    def try_move_to(self, columnChar, rowNo, turn_color):
+        """Attempts to play the selected piece to the given square."""
+        k_from, r_from = self.selected_square
+        # Promotions default to a queen (find_move picks it)
+        move = self.get_legal_index().find_move(chess.parse_square(f"{k_from}{r_from}"),
+                                                chess.parse_square(f"{columnChar}{rowNo}"))
+        if move is None:
+            # Not a legal target of the selected piece: just deselect it
+            self.clear_selection()
+            return False
+        move_uci = move.uci()
+        move_trace.event("input", self.next_move_id(), start=self.gesture_started, uci=move_uci)
+
+        # Détecter si c'est une capture AVANT d'appliquer le coup
+        is_capture = self.get_capture_info(move_uci)
+
+        if self.validate_and_apply_move(move_uci):
+            # In PVP, log the move to the file for the other client
+            print(f"[{self.player_color}] Move made: {move_uci}. Logging to file.")
+            self.log_move_to_file(move_uci, is_capture)
+            return True # A move was successfully made!
+
+        # If move is illegal, just deselect the piece
+        self.clear_selection()
+        return False # An illegal move attempt is not a successful move
+
+    def get_square_at(self, mouse_pos, is_flipped):
+        """Gets board coordinates from a screen position, accounting for board orientation."""
+        for i in range(8):
+            for j in range(8):
+                rect = pygame.Rect(self.board_locations[i][j][0], self.board_locations[i][j][1], self.square_length, self.square_length)
+                if rect.collidepoint(mouse_pos):
+                    screen_col, screen_row = i, j
+                    board_col = 7 - screen_col if is_flipped else screen_col
+                    board_row = 7 - screen_row if is_flipped else screen_row
+                    colChar = chr(97 + board_col)
+                    rowNo = 8 - board_row
+                    return [self.piece_location[colChar][rowNo][0], colChar, rowNo]
         return None
 
     def draw_pieces(self, is_flipped):
         """Draws all pieces and highlights, flipping the board view if required."""
+        if self.headless:
+            return
         surface_blue = pygame.Surface((self.square_length, self.square_length), pygame.SRCALPHA)
         surface_blue.fill((28, 21, 212, 170)) # Highlight for White
-        
+        dragged_piece = None
+
         for screen_col in range(8):
             for screen_row in range(8):
                 board_col_idx = 7 - screen_col if is_flipped else screen_col
@@ -242,24 +439,35 @@ class Chess(object):
                 if is_selected:
                     self.screen.blit(surface_blue, screen_pos)
                 
-                for move in self.moves:
-                    if move[0] == board_col_idx and move[1] == board_row_idx:
-                        self.screen.blit(surface_blue, screen_pos)
-                        break
+                if self.moves_mask >> chess.square(board_col_idx, 7 - board_row_idx) & 1:
+                    self.screen.blit(surface_blue, screen_pos)
 
                 if piece_name:
-                    self.chess_pieces.draw(self.screen, piece_name, screen_pos)
+                    if is_selected and self.dragging:
+                        dragged_piece = piece_name # Drawn last, under the cursor
+                    else:
+                        self.chess_pieces.draw(self.screen, piece_name, screen_pos)
+
+        if dragged_piece:
+            mouse_x, mouse_y = self.utils.get_mouse_event()
+            half = self.square_length // 2
+            self.chess_pieces.draw(self.screen, dragged_piece, (mouse_x - half, mouse_y - half))
 
     def validate_and_apply_move(self, move_uci):
         """Validates and applies any move using the python-chess board."""
+        with move_trace.span("validate", self.next_move_id()):
+            return self._validate_and_apply_move(move_uci)
+
+    def _validate_and_apply_move(self, move_uci):
         try:
             move = chess.Move.from_uci(move_uci)
-            if move in self.validation_board.legal_moves:
+            if self.get_legal_index().is_legal(move):
                 # CORRECTION: Vérifier le roque AVANT de push le move
                 is_castling = self.validation_board.is_castling(move)
                 is_en_passant = self.validation_board.is_en_passant(move)
                 
                 self.validation_board.push(move)
+                self.legal_index = None # New position: the index is rebuilt on demand
                 self.apply_move_to_internal_board(move_uci, is_castling, is_en_passant)
                 self.check_game_status()
                 return True
@@ -315,10 +523,7 @@ class Chess(object):
             self.piece_location[to_file][to_rank][0] = promoted_map[move.promotion]
 
         self.turn["white"], self.turn["black"] = self.turn["black"], self.turn["white"]
-        self.moves = []
-        for k in self.piece_location:
-            for r in self.piece_location[k]:
-                self.piece_location[k][r][1] = False
+        self.clear_selection()
     
     def check_game_status(self):
         """Checks for game over conditions."""
@@ -327,18 +532,24 @@ class Chess(object):
         elif self.validation_board.is_game_over():
             self.winner = "Draw"
 
-    def run_stockfish_move(self):
+    def run_stockfish_move(self, bestmove_uci=None):
         """
         Gets and applies a move from the AI (PVE only).
         MODIFIED: Returns True if a move was successfully made, False otherwise.
+
+        Args:
+            bestmove_uci: Move of a background search (start_engine_search); when None
+                          the engine is queried synchronously (headless games).
+                          An empty move (or no engine) plays a random legal move.
         """
         if self.stockfish_thinking: 
             return False
             
         self.stockfish_thinking = True
         
-        fen = self.validation_board.fen()
-        bestmove_uci = self.engine_instance.get_best_move(fen)
+        if bestmove_uci is None and self.engine_instance is not None:
+            fen = self.validation_board.fen()
+            bestmove_uci = self.engine_instance.get_best_move(fen)
 
         if not bestmove_uci:
             legal_moves = list(self.validation_board.legal_moves)
@@ -355,11 +566,6 @@ class Chess(object):
         if self.validate_and_apply_move(bestmove_uci):
             print(f"Stockfish plays: {bestmove_uci} (Capture: {is_capture})")
             self.log_move_to_file(bestmove_uci, is_capture)
-
-            # Attendre que le robot termine le coup de Stockfish (si activé)
-            if self.robot_wait_callback:
-                self.robot_wait_callback()
-
             move_was_successful = True
         else:
             # Fallback si le coup de Stockfish est invalide (ne devrait pas arriver)
@@ -370,11 +576,6 @@ class Chess(object):
                 is_capture_fallback = self.get_capture_info(random_move_uci)
                 if self.validate_and_apply_move(random_move_uci):
                     self.log_move_to_file(random_move_uci, is_capture_fallback)
-
-                    # Attendre que le robot termine le coup (si activé)
-                    if self.robot_wait_callback:
-                        self.robot_wait_callback()
-
                     move_was_successful = True
         
         self.stockfish_thinking = False
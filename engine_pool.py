@@ -0,0 +1,75 @@
+"""
+Pool de moteurs partagé entre plusieurs parties (serveur de parties, simultanée).
+
+Chaque thread de travail possède son propre joueur (moteur UCI ou joueur aléatoire) :
+un processus moteur n'est jamais utilisé par deux recherches à la fois.
+submit() retourne un concurrent.futures.Future ; best_move() est sa version asyncio.
+"""
+
+import asyncio
+import queue
+import threading
+from concurrent.futures import Future
+
+from headless_runner import EnginePlayer, RandomPlayer
+
+
+class EnginePool:
+    """
+    Args:
+        size: Nombre de moteurs (recherches simultanées)
+        engine_path: Chemin d'un moteur UCI ; None = joueurs aléatoires (tests, charge)
+        time_limit: Temps de réflexion par coup (s)
+        uci_options: Options UCI appliquées à chaque moteur
+    """
+
+    def __init__(self, size=2, engine_path=None, time_limit=0.1, uci_options=None):
+        self.size = size
+        self.jobs = queue.Queue()
+        self.players = []
+        self.threads = []
+        self.searches = 0
+        for i in range(size):
+            if engine_path:
+                player = EnginePlayer(engine_path, time_limit, uci_options)
+            else:
+                player = RandomPlayer()
+            self.players.append(player)
+            thread = threading.Thread(target=self.worker, args=(player,), name=f"engine-{i}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+        print(f"[POOL] {size} moteur(s) {'UCI' if engine_path else 'aléatoire(s)'} prêts")
+
+    def worker(self, player):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                return
+            fen, future = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(player.get_best_move(fen))
+            except Exception as e:
+                future.set_exception(e)
+            self.searches += 1
+
+    def submit(self, fen):
+        """Met une recherche en file et retourne un Future du coup UCI (ou None)."""
+        future = Future()
+        self.jobs.put((fen, future))
+        return future
+
+    async def best_move(self, fen):
+        return await asyncio.wrap_future(self.submit(fen))
+
+    def pending(self):
+        return self.jobs.qsize()
+
+    def close(self):
+        for _ in self.threads:
+            self.jobs.put(None)
+        for thread in self.threads:
+            thread.join(timeout=2.0)
+        for player in self.players:
+            player.quit()
@@ -0,0 +1,155 @@
+import cProfile
+import csv
+import io
+import json
+import pstats
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import pygame
+
+
+class FrameProfiler:
+    """
+    Instrumentation du temps d'image.
+
+    - phase(nom) : mesure une section (draw_pieces, play_turn_pve, ...)
+    - begin_frame / end_frame : temps de travail de chaque image (hors attente)
+    - draw_overlay : percentiles et moyennes par phase à l'écran (F3 dans Game)
+    - dump_trace : trace glissante en CSV ou JSON (F4)
+    - start_cprofile : session cProfile de N secondes (F5)
+    """
+
+    PERCENTILES = (50, 95, 99)
+
+    def __init__(self, history=300, trace_size=3000):
+        self.frame_times = deque(maxlen=history)  # ms
+        self.phase_times = {}                     # nom -> deque de ms par image
+        self.history = history
+        self.trace = deque(maxlen=trace_size)     # lignes {t, frame_ms, phase: ms...}
+        self.current = {}
+        self.frame_start = None
+        self.overlay_visible = False
+
+        self.profiler = None
+        self.profile_until = 0.0
+        self.font = None
+
+    # ==================== MESURES ====================
+
+    def begin_frame(self):
+        self.frame_start = time.perf_counter()
+        self.current = {}
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.current[name] = self.current.get(name, 0.0) + (time.perf_counter() - start) * 1000
+
+    def end_frame(self):
+        if self.frame_start is None:
+            return
+        frame_ms = (time.perf_counter() - self.frame_start) * 1000
+        self.frame_start = None
+        self.frame_times.append(frame_ms)
+        for name, ms in self.current.items():
+            if name not in self.phase_times:
+                self.phase_times[name] = deque(maxlen=self.history)
+            self.phase_times[name].append(ms)
+        row = {'t': round(time.time(), 3), 'frame_ms': round(frame_ms, 3)}
+        row.update({name: round(ms, 3) for name, ms in self.current.items()})
+        self.trace.append(row)
+        self.poll_cprofile()
+
+    @staticmethod
+    def percentile(values, p):
+        if not values:
+            return 0.0
+        ordered = sorted(values)
+        index = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def summary(self):
+        """Retourne les percentiles du temps d'image et la moyenne/max de chaque phase."""
+        frames = list(self.frame_times)
+        result = {'frame': {f"p{p}": self.percentile(frames, p) for p in self.PERCENTILES}}
+        for name, values in self.phase_times.items():
+            values = list(values)
+            result[name] = {'avg': sum(values) / len(values), 'max': max(values)}
+        return result
+
+    # ==================== AFFICHAGE ====================
+
+    def toggle_overlay(self):
+        self.overlay_visible = not self.overlay_visible
+
+    def draw_overlay(self, screen):
+        if not self.overlay_visible:
+            return
+        if self.font is None:
+            self.font = pygame.font.Font(None, 20)
+
+        summary = self.summary()
+        frame = summary.pop('frame')
+        lines = ["Frame ms  " + "  ".join(f"p{p}={frame[f'p{p}']:.1f}" for p in self.PERCENTILES)]
+        for name, stats in sorted(summary.items()):
+            lines.append(f"{name:<24} avg={stats['avg']:.2f}  max={stats['max']:.1f}")
+        if self.profiler:
+            lines.append(f"cProfile: {max(0.0, self.profile_until - time.time()):.0f}s")
+
+        line_h = 16
+        panel = pygame.Surface((330, line_h * len(lines) + 8), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 190))
+        for i, line in enumerate(lines):
+            panel.blit(self.font.render(line, True, (0, 255, 0)), (6, 4 + i * line_h))
+        screen.blit(panel, (5, screen.get_height() - panel.get_height() - 5))
+
+    # ==================== EXPORTS ====================
+
+    def dump_trace(self, path=None):
+        """Écrit la trace glissante (CSV ou JSON selon l'extension) et retourne le chemin."""
+        path = path or time.strftime("frame_trace_%Y%m%d_%H%M%S.csv")
+        rows = list(self.trace)
+        try:
+            if path.endswith('.json'):
+                with open(path, 'w') as f:
+                    json.dump(rows, f)
+            else:
+                columns = ['t', 'frame_ms'] + sorted({k for row in rows for k in row} - {'t', 'frame_ms'})
+                with open(path, 'w', newline='') as f:
+                    writer = csv.DictWriter(f, fieldnames=columns, restval='')
+                    writer.writeheader()
+                    writer.writerows(rows)
+            print(f"[PERF] Trace de {len(rows)} images écrite dans {path}")
+        except OSError as e:
+            print(f"[PERF] Impossible d'écrire la trace: {e}")
+        return path
+
+    def start_cprofile(self, seconds=10):
+        """Démarre une session cProfile ; les stats sont écrites à la fin."""
+        if self.profiler:
+            return
+        self.profiler = cProfile.Profile()
+        self.profile_until = time.time() + seconds
+        self.profiler.enable()
+        print(f"[PERF] cProfile démarré pour {seconds}s")
+
+    def poll_cprofile(self):
+        if self.profiler and time.time() >= self.profile_until:
+            self.stop_cprofile()
+
+    def stop_cprofile(self):
+        if not self.profiler:
+            return
+        self.profiler.disable()
+        path = time.strftime("profile_%Y%m%d_%H%M%S.prof")
+        self.profiler.dump_stats(path)
+        out = io.StringIO()
+        pstats.Stats(self.profiler, stream=out).sort_stats('cumulative').print_stats(15)
+        print(out.getvalue())
+        print(f"[PERF] Profil écrit dans {path} (snakeviz/pstats)")
+        self.profiler = None
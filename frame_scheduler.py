@@ -0,0 +1,88 @@
+import time
+import pygame
+
+# Événement posté par les threads (moteur, robot, adversaire PvP) pour réveiller la boucle
+WAKE_EVENT = pygame.USEREVENT + 1
+
+# Événements qui signalent une interaction de l'utilisateur
+INTERACTION_EVENTS = (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP, pygame.MOUSEMOTION,
+                      pygame.KEYDOWN, pygame.KEYUP)
+
+
+class FrameScheduler:
+    """
+    Cadence d'affichage adaptative.
+
+    - Pleine cadence (active_fps) pendant une interaction (clic, glisser, survol)
+      ou tant que l'appelant demande de rester actif (animation, tour de l'IA...).
+    - Au repos, la boucle se bloque sur pygame.event.wait avec un timeout :
+      quelques images par seconde et ~0% de CPU.
+    - Les autres threads réveillent la boucle immédiatement avec wake().
+    """
+
+    def __init__(self, active_fps=30, idle_timeout=0.25, active_window=0.5):
+        self.clock = pygame.time.Clock()
+        self.active_fps = active_fps
+        self.idle_timeout = idle_timeout      # secondes entre deux images au repos
+        self.active_window = active_window    # durée de pleine cadence après une interaction
+        self.last_activity = 0.0
+        self.keep_active = False              # forcé par l'appelant à chaque image
+
+        # Mesure de la charge CPU du processus (rapportée à la fermeture)
+        self.frames = 0
+        self.idle_frames = 0
+        self.cpu_start = time.process_time()
+        self.wall_start = time.perf_counter()
+
+    def mark_active(self):
+        """Repasse en pleine cadence pour active_window secondes."""
+        self.last_activity = time.monotonic()
+
+    def is_active(self):
+        return self.keep_active or (time.monotonic() - self.last_activity) < self.active_window
+
+    def wait_events(self, idle_timeout=None):
+        """
+        Attend la prochaine image et retourne les événements à traiter.
+
+        Args:
+            idle_timeout: Timeout au repos (secondes), remplace la valeur par défaut
+                          (ex: plus court en PvP pour surveiller l'adversaire)
+        """
+        if self.is_active():
+            self.clock.tick(self.active_fps)
+            events = pygame.event.get()
+        else:
+            timeout = self.idle_timeout if idle_timeout is None else idle_timeout
+            first = pygame.event.wait(int(timeout * 1000))
+            events = [] if first.type == pygame.NOEVENT else [first]
+            events.extend(pygame.event.get())
+            self.clock.tick()
+            self.idle_frames += 1
+
+        self.frames += 1
+        for event in events:
+            if event.type in INTERACTION_EVENTS:
+                self.mark_active()
+        # WAKE_EVENT ne sert qu'à débloquer l'attente
+        return [event for event in events if event.type != WAKE_EVENT]
+
+    @staticmethod
+    def wake():
+        """Réveille la boucle principale (appelable depuis n'importe quel thread)."""
+        try:
+            pygame.event.post(pygame.event.Event(WAKE_EVENT))
+        except pygame.error:
+            pass  # Affichage déjà fermé
+
+    def cpu_usage(self):
+        """Retourne la charge CPU moyenne du processus en % depuis la création."""
+        wall = time.perf_counter() - self.wall_start
+        if wall <= 0:
+            return 0.0
+        return (time.process_time() - self.cpu_start) / wall * 100
+
+    def report(self):
+        wall = time.perf_counter() - self.wall_start
+        print(f"[PERF] {self.frames} images en {wall:.1f}s "
+              f"({self.idle_frames} au repos) - CPU moyen: {self.cpu_usage():.1f}%")
@@ -0,0 +1,430 @@
+#!/usr/bin/env python3
+"""
+Serveur de parties asyncio : de nombreuses parties simultanées dans un seul processus.
+
+Chaque partie utilise la logique de validation de Chess (mode headless) et une pendule.
+Un camp peut être tenu par un client distant, par un moteur du pool partagé, et la
+partie peut piloter le robot (un seul robot physique : une partie à la fois).
+
+Protocole (une ligne texte par commande, localhost) :
+    NEW [base_s] [increment_s]     -> OK GAME <id>
+    JOIN <id> <white|black>        -> OK JOINED <id> <color>
+    ENGINE <id> <white|black>      -> OK ENGINE <id> <color>
+    ROBOT <id>                     -> OK ROBOT <id>
+    MOVE <id> <uci>                -> OK MOVE <id> <seq>
+    STATE <id>                     -> STATE <id> <result|*> <wtime> <btime> <fen>
+    WATCH <id> / UNWATCH <id>      -> OK WATCH <id> / OK UNWATCH <id>
+    LIST                           -> GAMES <id> <id> ...
+    QUIT
+Les erreurs sont renvoyées en 'ERR <raison>'. Les événements sont poussés aux
+clients assis à la partie et aux spectateurs (broadcast.py) :
+    MOVE <id> <seq> <uci> <capture> <wtime> <btime>
+    END <id> <result> <reason>
+Une partie terminée (END) est retirée du serveur.
+Un spectateur reçoit d'abord un instantané, puis les événements :
+    SNAPSHOT <id> <seq> <result|*> <uci,uci,...|-> <fen>
+
+Usage:
+    python game_server.py --port 50600 --pool-size 4 [--engine-path /usr/bin/stockfish]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import inspect
+import itertools
+import os
+import random
+import sys
+import time
+
+import chess
+
+from broadcast import Broadcaster
+from engine_pool import EnginePool
+from headless_runner import create_headless_chess, resolve_engine_path
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 50600
+COLORS = {"white": chess.WHITE, "black": chess.BLACK}
+RESULTS = {"White": "1-0", "Black": "0-1", "Draw": "1/2-1/2"}
+
+
+class GameClock:
+    """Pendule à incrément ; base_time = 0 désactive la pendule."""
+
+    def __init__(self, base_time=0.0, increment=0.0):
+        self.enabled = base_time > 0
+        self.increment = increment
+        self.remaining = {chess.WHITE: base_time, chess.BLACK: base_time}
+        self.running = None
+        self.started_at = 0.0
+
+    def start(self, color):
+        self.running = color
+        self.started_at = time.monotonic()
+
+    def time_left(self, color):
+        left = self.remaining[color]
+        if color == self.running:
+            left -= time.monotonic() - self.started_at
+        return left
+
+    def flagged(self):
+        return self.enabled and self.running is not None and self.time_left(self.running) <= 0
+
+    def switch(self):
+        """Arrête la pendule du camp qui vient de jouer et lance celle de l'adversaire."""
+        if self.running is None:
+            return
+        self.remaining[self.running] = self.time_left(self.running) + self.increment
+        self.start(not self.running)
+
+    def stop(self):
+        if self.running is not None:
+            self.remaining[self.running] = self.time_left(self.running)
+        self.running = None
+
+
+class ServerGame:
+    """Une partie hébergée : plateau validé par Chess, pendule, occupants des deux camps."""
+
+    def __init__(self, game_id, base_time=0.0, increment=0.0):
+        self.game_id = game_id
+        self.chess = create_headless_chess()
+        self.clock = GameClock(base_time, increment)
+        self.seats = {chess.WHITE: None, chess.BLACK: None}  # ClientConnection, "engine" ou None
+        self.robot = None
+        self.result = None
+        self.end_reason = ""
+        self.created_at = time.monotonic()
+
+    @property
+    def board(self):
+        return self.chess.validation_board
+
+    def clients(self):
+        return {seat for seat in self.seats.values() if isinstance(seat, ClientConnection)}
+
+    def apply_move(self, move_uci):
+        """
+        Valide et joue un coup pour le camp au trait.
+
+        Returns:
+            (capture, erreur) : erreur vaut None si le coup a été joué
+        """
+        if self.result:
+            return False, "game over"
+        if self.clock.flagged():
+            self.finish("0-1" if self.board.turn == chess.WHITE else "1-0", "time")
+            return False, "flag"
+        if self.clock.running is None and self.clock.enabled:
+            self.clock.start(self.board.turn)
+
+        is_capture = self.chess.get_capture_info(move_uci)
+        if not self.chess.validate_and_apply_move(move_uci):
+            return False, "illegal"
+        self.clock.switch()
+        if self.chess.winner:
+            self.finish(RESULTS[self.chess.winner], "checkmate" if self.board.is_checkmate() else "draw")
+        return is_capture, None
+
+    def finish(self, result, reason):
+        self.result = result
+        self.end_reason = reason
+        self.clock.stop()
+
+    def times(self):
+        return self.clock.time_left(chess.WHITE), self.clock.time_left(chess.BLACK)
+
+    def snapshot_line(self):
+        """Instantané compact pour un spectateur qui arrive en cours de partie."""
+        moves = ",".join(move.uci() for move in self.board.move_stack) or "-"
+        return (f"SNAPSHOT {self.game_id} {len(self.board.move_stack)} {self.result or '*'} "
+                f"{moves} {self.board.fen()}")
+
+
+class ClientConnection:
+    """Connexion d'un client : l'écriture des événements ne bloque jamais la partie."""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.peer = writer.get_extra_info("peername")
+
+    def send(self, line):
+        self.send_bytes((line + "\n").encode())
+
+    def send_bytes(self, data):
+        if not self.writer.is_closing():
+            self.writer.write(data)
+
+
+class GameServer:
+    """Héberge les parties et route les commandes des clients."""
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, engine_pool=None, robot=None, spectator_queue=64):
+        self.host = host
+        self.port = port
+        self.engine_pool = engine_pool
+        self.robot = robot
+        self.broadcaster = Broadcaster(spectator_queue)
+        self.robot_lock = asyncio.Lock()
+        self.games = {}
+        self.ids = itertools.count(1)
+        self.tasks = set()
+        self.server = None
+        self.moves_played = 0
+
+    # ==================== RÉSEAU ====================
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle_client, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        print(f"[SERVER] En écoute sur {self.host}:{self.port}")
+        return self
+
+    async def serve_forever(self):
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def close(self):
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+        for task in list(self.tasks):
+            task.cancel()
+
+    async def handle_client(self, reader, writer):
+        conn = ClientConnection(reader, writer)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                parts = line.decode(errors="ignore").split()
+                if not parts:
+                    continue
+                if parts[0].upper() == "QUIT":
+                    break
+                conn.send(await self.dispatch(conn, parts[0].upper(), parts[1:]))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.leave(conn)
+            writer.close()
+
+    def leave(self, conn):
+        self.broadcaster.unsubscribe_all(conn)
+        for game in self.games.values():
+            for color, seat in game.seats.items():
+                if seat is conn:
+                    game.seats[color] = None
+
+    # ==================== COMMANDES ====================
+
+    async def dispatch(self, conn, command, args):
+        handler = getattr(self, f"cmd_{command.lower()}", None)
+        if handler is None:
+            return f"ERR unknown command {command}"
+        try:
+            inspect.signature(handler).bind(conn, *args)
+        except TypeError:
+            return f"ERR bad arguments for {command}"
+        try:
+            return handler(conn, *args)
+        except (KeyError, ValueError) as e:
+            return f"ERR {e}"
+        except Exception as e:
+            # Erreur du serveur, pas du client : journalisée, la connexion reste ouverte
+            print(f"[SERVER] Erreur interne ({command} {' '.join(args)}): {e!r}")
+            return "ERR internal error"
+
+    def get_game(self, game_id):
+        game = self.games.get(game_id)
+        if game is None:
+            raise KeyError(f"unknown game {game_id}")
+        return game
+
+    def get_color(self, name):
+        if name.lower() not in COLORS:
+            raise ValueError(f"bad color {name}")
+        return COLORS[name.lower()]
+
+    def cmd_new(self, conn, base_time="0", increment="0"):
+        game = self.create_game(float(base_time), float(increment))
+        return f"OK GAME {game.game_id}"
+
+    def cmd_join(self, conn, game_id, color_name):
+        game = self.get_game(game_id)
+        color = self.get_color(color_name)
+        if game.seats[color] is not None:
+            return f"ERR seat taken {color_name}"
+        game.seats[color] = conn
+        return f"OK JOINED {game_id} {color_name.lower()}"
+
+    def cmd_engine(self, conn, game_id, color_name):
+        if self.engine_pool is None:
+            return "ERR no engine pool"
+        game = self.get_game(game_id)
+        color = self.get_color(color_name)
+        if game.seats[color] is not None:
+            return f"ERR seat taken {color_name}"
+        game.seats[color] = "engine"
+        self.schedule_engine(game)
+        return f"OK ENGINE {game_id} {color_name.lower()}"
+
+    def cmd_robot(self, conn, game_id):
+        if self.robot is None:
+            return "ERR no robot"
+        for other in self.games.values():
+            other.robot = None
+        self.get_game(game_id).robot = self.robot
+        return f"OK ROBOT {game_id}"
+
+    def cmd_move(self, conn, game_id, move_uci):
+        game = self.get_game(game_id)
+        if game.seats[game.board.turn] is not conn:
+            return "ERR not your turn"
+        seq, error = self.play_move(game, move_uci)
+        if error:
+            return f"ERR {error}"
+        return f"OK MOVE {game_id} {seq}"
+
+    def cmd_state(self, conn, game_id):
+        game = self.get_game(game_id)
+        wtime, btime = game.times()
+        return f"STATE {game_id} {game.result or '*'} {wtime:.1f} {btime:.1f} {game.board.fen()}"
+
+    def cmd_watch(self, conn, game_id):
+        self.get_game(game_id)
+        self.broadcaster.subscribe(game_id, conn, conn.writer)
+        return f"OK WATCH {game_id}"
+
+    def cmd_unwatch(self, conn, game_id):
+        self.broadcaster.unsubscribe(game_id, conn)
+        return f"OK UNWATCH {game_id}"
+
+    def cmd_list(self, conn):
+        return "GAMES " + " ".join(self.games)
+
+    # ==================== PARTIES ====================
+
+    def create_game(self, base_time=0.0, increment=0.0):
+        game = ServerGame(str(next(self.ids)), base_time, increment)
+        self.games[game.game_id] = game
+        self.broadcaster.channel(game.game_id, game.snapshot_line)
+        return game
+
+    def play_move(self, game, move_uci):
+        """Joue un coup et notifie les clients, le robot et le moteur. Retourne (seq, erreur)."""
+        is_capture, error = game.apply_move(move_uci)
+        if error:
+            if game.result:
+                self.broadcast_end(game)
+            return None, error
+        self.moves_played += 1
+        seq = len(game.board.move_stack)
+        wtime, btime = game.times()
+        self.publish(game, f"MOVE {game.game_id} {seq} {move_uci} {int(is_capture)} {wtime:.1f} {btime:.1f}")
+        if game.robot is not None:
+            self.spawn(self.run_robot(game, move_uci, is_capture))
+        if game.result:
+            self.broadcast_end(game)
+        else:
+            self.schedule_engine(game)
+        return seq, None
+
+    def broadcast_end(self, game):
+        """Annonce la fin de partie puis retire la partie (et son canal) du serveur."""
+        self.publish(game, f"END {game.game_id} {game.result} {game.end_reason}")
+        self.games.pop(game.game_id, None)
+        self.broadcaster.close(game.game_id)
+
+    def publish(self, game, line):
+        """Sérialise l'événement une fois : spectateurs (files bornées) puis joueurs assis."""
+        data = self.broadcaster.publish(game.game_id, line)
+        for client in game.clients():
+            client.send_bytes(data)
+
+    def schedule_engine(self, game):
+        if not game.result and game.seats[game.board.turn] == "engine":
+            self.spawn(self.engine_turn(game))
+
+    async def engine_turn(self, game):
+        fen = game.board.fen()
+        move_uci = await self.engine_pool.best_move(fen)
+        if game.result or game.board.fen() != fen:
+            return  # Partie terminée ou position changée pendant la recherche
+        if not move_uci:
+            legal_moves = list(game.board.legal_moves)
+            if not legal_moves:
+                return
+            move_uci = random.choice(legal_moves).uci()
+        self.play_move(game, move_uci)
+
+    async def run_robot(self, game, move_uci, is_capture):
+        # Le contrôleur série est bloquant : exécution hors de la boucle, un coup à la fois
+        async with self.robot_lock:
+            loop = asyncio.get_running_loop()
+            try:
+                await loop.run_in_executor(None, game.robot.execute_move, move_uci, is_capture)
+            except Exception as e:
+                print(f"[SERVER] Erreur robot ({game.game_id}, {move_uci}): {e}")
+
+    def spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        return task
+
+
+def create_robot(port):
+    """Connecte le contrôleur G-code du robot (dossier G-Code_Controller)."""
+    robot_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'G-Code_Controller')
+    if robot_path not in sys.path:
+        sys.path.insert(0, robot_path)
+    from robot_chess_controller import ChessRobotController
+
+    robot = ChessRobotController(port=port)
+    if not robot.connect():
+        print("[SERVER] Robot non connecté, parties sans robot")
+        return None
+    return robot
+
+
+async def run_server(args):
+    engine_path = args.engine_path
+    if args.engine and not engine_path:
+        engine_path = resolve_engine_path(args.engine)
+    pool = EnginePool(args.pool_size, engine_path, args.engine_time)
+    robot = create_robot(args.robot_port) if args.robot_port else None
+    server = GameServer(args.host, args.port, pool, robot)
+    await server.start()
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
+        pool.close()
+        if robot:
+            robot.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serveur de parties d'échecs (asyncio)")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--pool-size', type=int, default=2, help="Nombre de moteurs partagés")
+    parser.add_argument('--engine', help="Identifiant du moteur (EngineManager)")
+    parser.add_argument('--engine-path', help="Chemin direct vers un moteur UCI (aléatoire sinon)")
+    parser.add_argument('--engine-time', type=float, default=0.1, help="Temps par coup du moteur (s)")
+    parser.add_argument('--robot-port', help="Port série du robot (ex: /dev/ttyUSB0)")
+    args = parser.parse_args(argv)
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(run_server(args))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+"""
+Instantané de la partie en cours pour reprise après un crash (borne PvE).
+
+Fichier JSONL en ajout seul :
+    {"type": "game", "game_id": ..., "mode": ..., "player_color": ..., "bot": {...}, "started_at": ...}
+    {"type": "move", "seq": 1, "uci": "e2e4", "clocks": {"WHITE": 3.2, "BLACK": 0.0}}
+    {"type": "end", "result": "White"}
+
+- Une ligne par coup : l'écriture ne coûte que quelques dizaines d'octets.
+- L'en-tête d'une nouvelle partie remplace le fichier de façon atomique.
+- Au démarrage, load() relit le fichier ; la partie est rejouée avec Chess.restore_moves
+  (plateau, pièces capturées) en quelques millisecondes.
+- Une dernière ligne tronquée (crash pendant l'écriture) est ignorée.
+
+L'état physique du robot est sauvegardé de son côté : plateau dans robot_state.json
+(ChessRobotController.save_state), zone de capture dans capture_zone.jsonl.
+"""
+
+import json
+import os
+import time
+
+
+class GameSnapshot:
+
+    def __init__(self, path="game_snapshot.jsonl"):
+        self.path = path
+        self.recorded = 0  # Nombre de coups déjà écrits
+        self.needs_newline = False  # Dernière ligne tronquée : la terminer avant d'ajouter
+
+    def start(self, game_id, mode, player_color, bot=None):
+        """Commence l'instantané d'une nouvelle partie (remplace le précédent)."""
+        header = {"type": "game", "game_id": game_id, "mode": mode, "player_color": player_color,
+                  "bot": bot or {}, "started_at": time.time()}
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                f.write(json.dumps(header) + "\n")
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"[SNAPSHOT] Impossible d'écrire {self.path}: {e}")
+        self.recorded = 0
+        self.needs_newline = False
+
+    def record_moves(self, move_stack, clocks):
+        """Ajoute les coups de move_stack qui ne sont pas encore dans l'instantané."""
+        if len(move_stack) <= self.recorded:
+            return
+        lines = []
+        for seq in range(self.recorded + 1, len(move_stack) + 1):
+            record = {"type": "move", "seq": seq, "uci": move_stack[seq - 1].uci()}
+            if seq == len(move_stack):
+                record["clocks"] = {color: round(t, 2) for color, t in clocks.items()}
+            lines.append(json.dumps(record))
+        self.append(lines)
+        self.recorded = len(move_stack)
+
+    def finish(self, result):
+        """Marque la partie comme terminée : elle ne sera pas reprise."""
+        self.append([json.dumps({"type": "end", "result": result})])
+
+    def append(self, lines):
+        prefix = "\n" if self.needs_newline else ""
+        try:
+            with open(self.path, "a") as f:
+                f.write(prefix + "\n".join(lines) + "\n")
+            self.needs_newline = False
+        except OSError as e:
+            print(f"[SNAPSHOT] Impossible d'écrire {self.path}: {e}")
+
+    def load(self):
+        """
+        Relit l'instantané.
+
+        Returns:
+            dict {'header', 'moves', 'clocks', 'finished'} ou None si aucun instantané
+        """
+        try:
+            with open(self.path, "r") as f:
+                content = f.read()
+        except OSError:
+            return None
+        self.needs_newline = bool(content) and not content.endswith("\n")
+        lines = content.splitlines()
+
+        state = None
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # Ligne tronquée par un crash
+            if record.get("type") == "game":
+                state = {"header": record, "moves": [], "clocks": {}, "finished": False}
+            elif state is None:
+                continue
+            elif record.get("type") == "move" and record.get("seq") == len(state["moves"]) + 1:
+                state["moves"].append(record["uci"])
+                state["clocks"] = record.get("clocks", state["clocks"])
+            elif record.get("type") == "end":
+                state["finished"] = True
+        if state:
+            self.recorded = len(state["moves"])
+        return state
+
+    def resumable(self, mode, player_color):
+        """Retourne l'état à reprendre (partie non terminée, même mode et même couleur) ou None."""
+        state = self.load()
+        if not state or state["finished"] or not state["moves"]:
+            return None
+        header = state["header"]
+        if header.get("mode") != mode or header.get("player_color") != player_color:
+            return None
+        return state
@@ -1,9 +1,9 @@
 import os
 import sys
+import time
 import pygame
 import chess
 from pygame.locals import *
-from threading import Event
 
 try:
     from chess_with_validation import Chess
@@ -11,6 +11,11 @@ try:
     from settings_menu import SettingsMenu
     from settings import StockfishSettings
     from bot_selection_menu import BotSelectionMenu
+    from frame_scheduler import FrameScheduler
+    from frame_profiler import FrameProfiler
+    from move_transport import create_transport
+    from move_journal import read_journal, journal_game_id
+    from game_snapshot import GameSnapshot
 except ImportError as e:
     print(f"[ERROR] A required module is missing: {e}")
     print("Please ensure all game files (chess_with_validation.py, utils.py, etc.) are in the same directory.")
@@ -18,21 +23,32 @@ except ImportError as e:
 
 
 class Game:
-    def __init__(self, mode='pve', player_color='WHITE', enable_robot=False):
+    ROBOT_TIMEOUT = 60.0 # Seconds without progress before the robot is no longer waited for (no prediction)
+
+    def __init__(self, mode='pve', player_color='WHITE', enable_robot=False, transport='file'):
         self.mode = mode
         self.player_color = player_color.upper()
         self.running = True
         self.enable_robot = enable_robot
         self.robot_controller = None
         self.robot_thread = None
-        self.robot_move_complete_event = Event()
+        self.robot_wait_since = None  # Last progress of the robot while it is behind (monotonic)
+        self.robot_last_seq = 0
+        self.robot_timed_out = False
 
         screen_width = 640
         screen_height = 750
         self.resources = "res"
         pygame.init()
         self.screen = pygame.display.set_mode([screen_width, screen_height])
-        self.clock = pygame.time.Clock()
+        # Full frame rate only while something changes, event.wait otherwise
+        self.scheduler = FrameScheduler(active_fps=30)
+        # F3: overlay, F4: dump the frame trace, F5: 10 s cProfile session
+        self.profiler = FrameProfiler()
+        # PVE crash recovery: the game in progress is snapshotted move by move
+        self.snapshot = GameSnapshot() if self.mode == 'pve' else None
+        self.clocks = {'WHITE': 0.0, 'BLACK': 0.0} # Thinking time used by each side (s)
+        self.turn_started = time.monotonic()
 
         if self.mode == 'pvp':
             window_title = f"Chess 1v1 - {self.player_color.title()} Player"
@@ -52,16 +68,13 @@ class Game:
 
         if self.mode == 'pvp':
             self.move_file = "next_move.txt"
-            self.last_read_move = self.read_last_move()
-            self.is_my_turn = (self.player_color == 'WHITE' and not self.last_read_move)
+            self.is_my_turn = (self.player_color == 'WHITE' and not read_journal(self.move_file))
+            # Opponent moves arrive through the transport (socket push, or next_move.txt watcher)
+            self.transport = create_transport(self.player_color, transport, self.move_file,
+                                              on_receive=FrameScheduler.wake)
         
         self.menu_showed = self.mode == 'pvp'
-
-    def read_last_move(self):
-        if not os.path.exists(self.move_file): return ""
-        try:
-            with open(self.move_file, "r") as f: return f.read().strip()
-        except IOError: return ""
+        self.menu_click = None # Position of the last click on the pre-game menu
 
     def init_robot(self):
         """Initialise et démarre le robot pour exécuter les coups physiquement."""
@@ -78,10 +91,8 @@ class Game:
             print("INITIALISATION DU ROBOT")
             print("="*60)
 
-            # Demander le port série (ou utiliser une config par défaut)
-            # Pour l'instant, on utilise COM3 par défaut
-            # TODO: Ajouter une config ou un menu de sélection
-            self.robot_controller = ChessRobotController(port='COM3', baudrate=115200)
+            # Port série et vitesse : section [SERIAL] de robot_config.ini
+            self.robot_controller = ChessRobotController()
 
             if self.robot_controller.connect():
                 print("[ROBOT] Connexion réussie !")
@@ -91,8 +102,7 @@ class Game:
                 print("[ROBOT] Démarrage de la surveillance de next_move.txt...")
                 self.robot_thread = self.robot_controller.start_monitoring_next_move(
                     filename="next_move.txt",
-                    callback=self.on_robot_move_complete,
-                    event=self.robot_move_complete_event
+                    callback=self.on_robot_move_complete
                 )
                 print("[ROBOT] Robot prêt à jouer ! ✓")
             else:
@@ -111,31 +121,54 @@ class Game:
         """Callback appelé quand le robot termine un coup."""
         color_name = "Blanc" if parsed_move['is_white'] else "Noir"
         print(f"[CALLBACK] {color_name} - {parsed_move['move']} terminé")
+        # Appelé depuis le thread du robot : réveiller la boucle d'affichage
+        FrameScheduler.wake()
 
-    def wait_for_robot_move(self, timeout=30):
+    def robot_busy(self):
         """
-        Attend que le robot termine le coup en cours.
-
-        Args:
-            timeout: Temps d'attente maximum en secondes (défaut: 30s)
-
-        Returns:
-            True si le robot a terminé, False si timeout
+        True while the robot has not executed every move of the game yet (non-blocking).
+        Progress is read from the robot's journal cursor. While a move runs, the robot's
+        watchdog knows its predicted duration: a move that overruns its adaptive timeout
+        means a stalled arm. Otherwise a robot that makes no progress for ROBOT_TIMEOUT
+        seconds is no longer waited for.
         """
         if not self.enable_robot or not self.robot_controller:
-            return True  # Pas de robot, on continue
-
-        print("[SYNC] Attente que le robot termine le coup...")
-        result = self.robot_move_complete_event.wait(timeout=timeout)
-
-        if result:
-            print("[SYNC] Robot a terminé le coup ✓")
-            # Réinitialiser l'event pour le prochain coup
-            self.robot_move_complete_event.clear()
-        else:
-            print(f"[ERREUR] Timeout: le robot n'a pas terminé en {timeout}s")
-
-        return result
+            return False
+        robot = self.robot_controller
+        plies = len(self.chess.validation_board.move_stack)
+        behind = plies > 0 and (robot.journal_seq < plies or
+                                (self.chess.game_id is not None and robot.journal_game != self.chess.game_id))
+        if not behind:
+            self.robot_wait_since = None
+            self.robot_timed_out = False
+            return False
+        now = time.monotonic()
+        if self.robot_wait_since is None or robot.journal_seq != self.robot_last_seq:
+            self.robot_wait_since = now
+            self.robot_last_seq = robot.journal_seq
+            self.robot_timed_out = False
+        elif not self.robot_timed_out:
+            watchdog = robot.watchdog
+            if watchdog.running:
+                if watchdog.stalled():
+                    print(f"[ERREUR] Bras bloqué ? {watchdog.label} prévu en {watchdog.predicted:.1f}s, "
+                          f"toujours en cours après {watchdog.elapsed():.1f}s, le jeu reprend")
+                    self.robot_timed_out = True
+            elif now - self.robot_wait_since > self.ROBOT_TIMEOUT:
+                print(f"[ERREUR] Timeout: le robot n'a pas terminé en {self.ROBOT_TIMEOUT:.0f}s, le jeu reprend")
+                self.robot_timed_out = True
+        return not self.robot_timed_out
+
+    def draw_robot_progress(self):
+        """Progress bar of the move being executed, from the robot's predicted duration."""
+        watchdog = self.robot_controller.watchdog
+        progress = watchdog.progress()
+        if progress is None:
+            return
+        width, height = 200, 6
+        x = (self.screen.get_width() - width) // 2
+        pygame.draw.rect(self.screen, (80, 80, 80), (x, 38, width, height))
+        pygame.draw.rect(self.screen, (255, 255, 0), (x, 38, int(width * progress), height))
 
     def stop_robot(self):
         """Arrête proprement le robot."""
@@ -165,22 +198,50 @@ class Game:
 
         pieces_src = os.path.join(self.resources, "pieces.png")
 
-        # Passer le callback d'attente robot si le robot est activé
-        robot_wait_callback = self.wait_for_robot_move if self.enable_robot else None
-        self.chess = Chess(self.screen, pieces_src, self.board_locations, square_length, self.mode, self.player_color, robot_wait_callback)
+        # A saved bot must be re-applied before the engine is initialized by Chess
+        saved_game = self.snapshot.resumable(self.mode, self.player_color) if self.snapshot else None
+        if saved_game:
+            self.apply_saved_bot(saved_game['header'].get('bot'))
+
+        # Robot synchronization is non-blocking (robot_busy), so Chess gets no wait callback
+        self.chess = Chess(self.screen, pieces_src, self.board_locations, square_length, self.mode, self.player_color)
+        # The background engine search wakes the display loop when it is done
+        self.chess.on_search_done = FrameScheduler.wake
+        if self.mode == 'pvp':
+            self.chess.game_id = journal_game_id(self.move_file)
+        if self.snapshot and not (saved_game and self.resume_game(saved_game)):
+            self.start_snapshot()
 
         # Initialiser le robot si activé
         if self.enable_robot:
             self.init_robot()
 
         while self.running:
-            self.clock.tick(30)
-            for event in pygame.event.get():
+            winner = self.chess.get_winner()
+            self.scheduler.keep_active = self.needs_full_frame_rate(winner)
+            events = self.scheduler.wait_events(self.idle_timeout(winner))
+            self.profiler.begin_frame()
+            for event in events:
                 if event.type == pygame.QUIT or (event.type == KEYDOWN and event.key == K_ESCAPE):
                     self.running = False
+                if event.type == KEYDOWN and event.key == K_F3:
+                    self.profiler.toggle_overlay()
+                elif event.type == KEYDOWN and event.key == K_F4:
+                    self.profiler.dump_trace()
+                elif event.type == KEYDOWN and event.key == K_F5:
+                    self.profiler.start_cprofile(seconds=10)
                 if event.type == KEYDOWN and event.key == K_SPACE and self.mode == 'pve':
                     self.chess.reset()
+                    self.start_snapshot()
                     self.menu_showed = False
+                if not self.menu_showed:
+                    if event.type == MOUSEBUTTONDOWN and event.button == 1:
+                        self.menu_click = event.pos
+                    elif event.type == KEYDOWN and event.key == K_RETURN:
+                        self.menu_showed = True
+                else:
+                    # Board input is event-driven: one click = one action
+                    self.chess.handle_event(event)
 
             winner = self.chess.get_winner()
 
@@ -191,22 +252,105 @@ class Game:
             else:
                 self.game()
 
+            self.profiler.draw_overlay(self.screen)
             pygame.display.flip()
+            self.profiler.end_frame()
+        self.profiler.stop_cprofile()
+        self.scheduler.report()
+        if self.mode == 'pvp':
+            self.transport.close()
         pygame.quit()
 
+    # ==================== SNAPSHOT / REPRISE ====================
+
+    def current_bot(self):
+        """Engine and Elo of the selected bot, stored in the snapshot header."""
+        try:
+            from universal_settings import UniversalEngineSettings
+            settings = UniversalEngineSettings()
+            engine_id = settings.get_selected_engine()
+            return {'engine': engine_id, 'elo': settings.get_elo_for_engine(engine_id)}
+        except Exception:
+            return {}
+
+    def apply_saved_bot(self, bot):
+        """Re-selects the saved engine and Elo so the resumed game plays against the same bot."""
+        if not bot or bot == self.current_bot():
+            return
+        try:
+            from engine_manager import EngineManager
+            from universal_settings import UniversalEngineSettings
+            settings = UniversalEngineSettings()
+            if bot['engine'] != settings.get_selected_engine():
+                path = EngineManager().get_engine_path(bot['engine'])
+                if not path or not os.path.isfile(path):
+                    print(f"[SNAPSHOT] Moteur {bot['engine']} non installé, bot non restauré")
+                    return
+                settings.select_engine(bot['engine'])
+            settings.set_elo_for_engine(bot['elo'], bot['engine'])
+            settings.save_settings()
+            print(f"[SNAPSHOT] Bot restauré: {bot['engine']} ({bot['elo']} ELO)")
+        except Exception as e:
+            print(f"[SNAPSHOT] Impossible de restaurer le bot: {e}")
+
+    def start_snapshot(self):
+        self.clocks = {'WHITE': 0.0, 'BLACK': 0.0}
+        self.turn_started = time.monotonic()
+        if self.snapshot:
+            self.snapshot.start(self.chess.game_id, self.mode, self.player_color, self.current_bot())
+
+    def resume_game(self, saved_game):
+        """Replays the saved game; returns False (fresh game) if it cannot be restored."""
+        start = time.perf_counter()
+        if not self.chess.restore_moves(saved_game['moves'], saved_game['header'].get('game_id')):
+            self.chess.reset()
+            return False
+        self.clocks.update(saved_game['clocks'])
+        self.turn_started = time.monotonic()
+        self.menu_showed = True
+        print(f"[SNAPSHOT] Partie reprise: {len(saved_game['moves'])} coups "
+              f"en {(time.perf_counter() - start) * 1000:.1f} ms")
+        return True
+
+    def save_snapshot(self):
+        """Appends the new moves and the clocks; marks the game as over when it ends."""
+        if not self.snapshot:
+            return
+        move_stack = self.chess.validation_board.move_stack
+        if len(move_stack) > self.snapshot.recorded:
+            now = time.monotonic()
+            # The side that just moved is the one not to move
+            mover = 'BLACK' if self.chess.validation_board.turn == chess.WHITE else 'WHITE'
+            self.clocks[mover] += now - self.turn_started
+            self.turn_started = now
+            self.snapshot.record_moves(move_stack, self.clocks)
+            if self.chess.winner:
+                self.snapshot.finish(self.chess.winner)
+
+    def needs_full_frame_rate(self, winner):
+        """True while the screen changes without user input (drag, AI turn to trigger)."""
+        if not self.menu_showed or winner:
+            return False
+        # The engine search and the robot wake the loop themselves (FrameScheduler.wake)
+        return self.chess.dragging
+
+    def idle_timeout(self, winner):
+        """Idle frame period in seconds (None = scheduler default)."""
+        if winner:
+            return 1.0 # Static winner screen
+        if self.mode == 'pvp' and self.menu_showed and not self.is_my_turn and not self.transport.push:
+            return 0.1 # Poll the opponent's move at 10 Hz instead of 30
+        if self.enable_robot and self.robot_controller and self.robot_controller.watchdog.running:
+            return 0.1 # Robot progress bar
+        return None
+
     def check_for_opponent_move(self):
-        current_move_in_file = self.read_last_move()
-        if current_move_in_file and current_move_in_file != self.last_read_move:
-            self.last_read_move = current_move_in_file
-            try:
-                player, move_uci, capture_flag = current_move_in_file.split(';')
-                opponent_color = 'BLACK' if self.player_color == 'WHITE' else 'WHITE'
-                if player == opponent_color[0]:
-                    print(f"[{self.player_color}] Detected opponent's move: {move_uci}")
-                    if self.chess.validate_and_apply_move(move_uci):
-                        self.is_my_turn = True
-            except ValueError:
-                print(f"[{self.player_color}] WARNING: Malformed move in file: '{current_move_in_file}'")
+        opponent_color = 'BLACK' if self.player_color == 'WHITE' else 'WHITE'
+        for player, move_uci, capture_flag in self.transport.poll():
+            if player == opponent_color[0]:
+                print(f"[{self.player_color}] Detected opponent's move: {move_uci}")
+                if self.chess.validate_and_apply_move(move_uci):
+                    self.is_my_turn = True
 
     def draw_captured_pieces(self):
         """Affiche les pièces capturées sur le côté du plateau."""
@@ -272,18 +416,30 @@ class Game:
         turn_font = pygame.font.SysFont("sans-serif", 24)
         status_text = ""
         
-        # Variable pour savoir si on doit attendre le robot après cette frame
-        move_made_this_frame = False
-
-        if self.mode == 'pvp':
-            if not self.is_my_turn: self.check_for_opponent_move()
+        # Tant que le robot exécute un coup, le plateau physique ne doit pas être touché :
+        # les clics sont ignorés et le coup du moteur (déjà calculé en parallèle) attend
+        robot_busy = self.robot_busy()
+
+        if robot_busy:
+            self.chess.utils.clear_actions()
+            status_text = "Robot is moving..."
+            watchdog = self.robot_controller.watchdog
+            if watchdog.running:
+                remaining = max(0.0, watchdog.predicted - watchdog.elapsed())
+                status_text = f"Robot is moving... ~{remaining:.0f}s"
+        elif self.mode == 'pvp':
+            if not self.is_my_turn:
+                self.chess.utils.clear_actions() # Ignore clicks while the opponent plays
+                with self.profiler.phase("check_for_opponent_move"):
+                    self.check_for_opponent_move()
             status_text = "Your Turn" if self.is_my_turn else "Waiting for Opponent..."
             if self.is_my_turn:
                 # handle_human_move retourne True si un coup est joué
-                if self.chess.handle_human_move(self.player_color.lower(), is_flipped):
-                    self.last_read_move = self.read_last_move()
+                with self.profiler.phase("handle_human_move"):
+                    move_made = self.chess.handle_human_move(self.player_color.lower(), is_flipped)
+                if move_made:
+                    self.transport.send_move(*self.chess.last_logged_move)
                     self.is_my_turn = False
-                    move_made_this_frame = True
         else: # PVE Mode
             human_is_white = (self.player_color == 'WHITE')
             board_turn_is_white = (self.chess.validation_board.turn == chess.WHITE)
@@ -292,37 +448,24 @@ class Game:
             status_text = "Your Turn" if is_human_turn else "Stockfish is thinking..."
             
             # play_turn_pve retourne True si un coup a été joué (par le joueur ou l'IA)
-            if self.chess.play_turn_pve():
-                move_made_this_frame = True
-
-        # --- NOUVEAU BLOC DE SYNCHRONISATION AVEC LE ROBOT ---
-        if self.enable_robot and move_made_this_frame:
-            # 1. Préparer le signal pour la prochaine attente
-            self.robot_move_complete_event.clear()
-
-            # 2. Afficher un message d'attente à l'écran
-            wait_text = "Robot is moving..."
-            wait_surf = turn_font.render(wait_text, True, (255, 255, 0)) # Jaune
-            
-            # Dessiner le reste de l'écran pour que tout soit à jour
-            self.chess.draw_pieces(is_flipped)
-            self.draw_captured_pieces()
-            self.screen.blit(wait_surf, ((self.screen.get_width() - wait_surf.get_width()) // 2, 15))
-            pygame.display.flip() # Forcer la mise à jour de l'écran avec le message
-
-            # 3. Mettre le jeu en pause et attendre le signal du robot
-            print("[GAME] Un coup a été joué. Mise en pause du jeu en attente du robot...")
-            # Le .wait() bloque l'exécution jusqu'à ce que l'event soit .set() par le robot
-            self.robot_move_complete_event.wait(timeout=60.0) # Timeout de 60s par sécurité
-            print("[GAME] Signal du robot reçu. Le jeu reprend.")
-
-        # Affichage normal du statut (sera écrasé par le message d'attente si nécessaire)
-        text_surface = turn_font.render(status_text, True, (255, 255, 255))
+            # Après un coup humain, la recherche du moteur démarre en arrière-plan
+            # pendant que le robot exécute ce coup
+            with self.profiler.phase("play_turn_pve"):
+                if self.chess.play_turn_pve():
+                    self.save_snapshot()
+
+        # Affichage du statut (jaune pendant que le robot bouge)
+        status_color = (255, 255, 0) if robot_busy else (255, 255, 255)
+        text_surface = turn_font.render(status_text, True, status_color)
         self.screen.blit(text_surface, ((self.screen.get_width() - text_surface.get_width()) // 2, 15))
+        if robot_busy:
+            self.draw_robot_progress()
         
         # Redessiner le tout au cas où l'écran n'a pas été mis à jour pendant l'attente
-        self.chess.draw_pieces(is_flipped)
-        self.draw_captured_pieces()
+        with self.profiler.phase("draw_pieces"):
+            self.chess.draw_pieces(is_flipped)
+        with self.profiler.phase("draw_captured_pieces"):
+            self.draw_captured_pieces()
 
     # --- UI UPDATED: This function has been redesigned ---
     def pve_menu(self):
@@ -380,9 +523,9 @@ class Game:
         self.screen.blit(settings_btn_surf, settings_btn_surf.get_rect(center=settings_btn_rect.center))
 
         # --- Event Handling ---
-        util = Utils()
-        if util.left_click_event():
-            mouse_coords = util.get_mouse_event()
+        # Clicks are collected from MOUSEBUTTONDOWN events in start_game (RETURN as well)
+        if self.menu_click:
+            mouse_coords, self.menu_click = self.menu_click, None
             if play_btn_rect.collidepoint(mouse_coords):
                 self.menu_showed = True
             elif settings_btn_rect.collidepoint(mouse_coords):
@@ -391,9 +534,6 @@ class Game:
                 action = bot_menu.run()
                 if action == "play":
                     self.menu_showed = True
-                
-        elif pygame.key.get_pressed()[K_RETURN]:
-            self.menu_showed = True
 
     def declare_winner(self, winner):
         self.screen.fill((255, 255, 255))
@@ -412,10 +552,13 @@ class Game:
 if __name__ == "__main__":
     game_mode = 'pve'
     player_color = 'WHITE'
+    transport = 'file'
     if len(sys.argv) > 2:
         game_mode = sys.argv[1].lower()
         player_color = sys.argv[2].upper()
+    if len(sys.argv) > 3:
+        transport = sys.argv[3].lower() # 'socket' or 'file'
     
-    print(f"Starting game instance with Mode: {game_mode}, Color: {player_color}")
-    game = Game(mode=game_mode, player_color=player_color)
+    print(f"Starting game instance with Mode: {game_mode}, Color: {player_color}, Transport: {transport}")
+    game = Game(mode=game_mode, player_color=player_color, transport=transport)
     game.start_game()
\ No newline at end of file
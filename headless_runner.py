@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Exécution de parties sans affichage (simulation, robot simulé, CI).
+
+Les parties utilisent la même logique de tour que le jeu (classe Chess en
+mode headless) : run_stockfish_move, validate_and_apply_move, check_game_status...
+Seul le joueur branché sur engine_instance change à chaque demi-coup.
+
+Usage:
+    python headless_runner.py --games 1000
+    python headless_runner.py --games 20 --white engine --black random --engine-time 0.05
+"""
+
+import argparse
+import contextlib
+import os
+import random
+import sys
+import time
+
+import chess
+import chess.engine
+
+from chess_with_validation import Chess
+
+
+class RandomPlayer:
+    """Joueur aléatoire (même interface que UniversalEngine.get_best_move)."""
+
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed)
+
+    def get_best_move(self, fen):
+        moves = list(chess.Board(fen).legal_moves)
+        return self.rng.choice(moves).uci() if moves else None
+
+    def quit(self):
+        pass
+
+
+class EnginePlayer:
+    """Moteur UCI piloté directement (sans écrire bestmove.txt)."""
+
+    def __init__(self, engine_path, time_limit=0.05, uci_options=None):
+        self.engine = chess.engine.SimpleEngine.popen_uci(engine_path)
+        if uci_options:
+            self.engine.configure({k: v for k, v in uci_options.items() if k in self.engine.options})
+        self.limit = chess.engine.Limit(time=time_limit)
+
+    def get_best_move(self, fen):
+        result = self.engine.play(chess.Board(fen), self.limit)
+        return result.move.uci() if result.move else None
+
+    def quit(self):
+        try:
+            self.engine.quit()
+        except Exception:
+            pass
+
+
+def resolve_engine_path(engine_id=None):
+    """Retourne le chemin d'un moteur installé via EngineManager (moteur sélectionné par défaut)."""
+    from engine_manager import EngineManager
+    from universal_settings import UniversalEngineSettings
+
+    engine_id = engine_id or UniversalEngineSettings().get_selected_engine()
+    path = EngineManager().get_engine_path(engine_id)
+    if not path or not os.path.isfile(path):
+        raise RuntimeError(f"Moteur '{engine_id}' non installé")
+    return path
+
+
+def create_headless_chess():
+    """Crée une instance Chess sans écran, sans moteur et sans fichier de communication."""
+    return Chess(None, None, None, None, mode='headless', headless=True)
+
+
+def play_game(game, white, black, max_plies=300, opening_moves=None, start_fen=None):
+    """
+    Joue une partie complète avec la logique de tour de Chess.
+
+    Args:
+        game: Instance Chess headless (réinitialisée ici)
+        white, black: Joueurs exposant get_best_move(fen)
+        max_plies: Nombre max de demi-coups avant d'arbitrer la nulle
+        opening_moves: Coups UCI d'ouverture joués avant de laisser la main aux joueurs
+        start_fen: Position de départ (défaut: position initiale)
+
+    Returns:
+        dict avec 'result' ('1-0', '0-1', '1/2-1/2'), 'moves' (UCI) et 'plies'
+    """
+    game.reset()
+    if start_fen:
+        game.set_position(start_fen)
+    if opening_moves:
+        # Les coups d'ouverture sont rejoués pour garder la représentation interne cohérente
+        for move_uci in opening_moves:
+            game.validate_and_apply_move(move_uci)
+
+    while not game.winner and len(game.validation_board.move_stack) < max_plies:
+        game.engine_instance = white if game.validation_board.turn == chess.WHITE else black
+        if not game.run_stockfish_move():
+            break
+
+    if game.winner == "White":
+        result = "1-0"
+    elif game.winner == "Black":
+        result = "0-1"
+    else:
+        result = "1/2-1/2"
+    return {
+        'result': result,
+        'moves': [move.uci() for move in game.validation_board.move_stack],
+        'plies': len(game.validation_board.move_stack),
+    }
+
+
+def create_player(kind, args, seed):
+    if kind == 'engine':
+        return EnginePlayer(args.engine_path or resolve_engine_path(args.engine), args.engine_time)
+    return RandomPlayer(seed)
+
+
+def run_batch(n_games, white, black, max_plies=300, verbose=False):
+    """Joue n_games parties et retourne (résultats, durée en secondes)."""
+    game = create_headless_chess()
+    results = []
+    sink = None if verbose else open(os.devnull, 'w')
+    start = time.perf_counter()
+    try:
+        for _ in range(n_games):
+            # Les traces des coups ralentiraient fortement les longues séries
+            with contextlib.redirect_stdout(sink) if sink else contextlib.nullcontext():
+                results.append(play_game(game, white, black, max_plies))
+    finally:
+        if sink:
+            sink.close()
+    return results, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parties d'échecs sans affichage")
+    parser.add_argument('--games', type=int, default=100, help="Nombre de parties")
+    parser.add_argument('--white', choices=['random', 'engine'], default='random')
+    parser.add_argument('--black', choices=['random', 'engine'], default='random')
+    parser.add_argument('--engine', help="Identifiant du moteur (EngineManager), moteur sélectionné par défaut")
+    parser.add_argument('--engine-path', help="Chemin direct vers un moteur UCI")
+    parser.add_argument('--engine-time', type=float, default=0.05, help="Temps par coup du moteur (s)")
+    parser.add_argument('--max-plies', type=int, default=300)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--verbose', action='store_true', help="Afficher les traces des coups")
+    args = parser.parse_args(argv)
+
+    white = create_player(args.white, args, args.seed)
+    black = create_player(args.black, args, None if args.seed is None else args.seed + 1)
+    try:
+        results, elapsed = run_batch(args.games, white, black, args.max_plies, args.verbose)
+    finally:
+        white.quit()
+        black.quit()
+
+    plies = sum(r['plies'] for r in results)
+    scores = {'1-0': 0, '0-1': 0, '1/2-1/2': 0}
+    for r in results:
+        scores[r['result']] += 1
+
+    print("=" * 50)
+    print(f"Parties: {len(results)} en {elapsed:.2f}s")
+    print(f"Débit: {len(results) / elapsed:.1f} parties/s, {plies / elapsed:.0f} demi-coups/s")
+    print(f"Résultats: 1-0: {scores['1-0']}  0-1: {scores['0-1']}  1/2: {scores['1/2-1/2']}")
+    print("=" * 50)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
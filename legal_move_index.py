@@ -0,0 +1,50 @@
+import chess
+
+
+class LegalMoveIndex:
+    """
+    Index des coups légaux d'une position, construit une seule fois par position.
+
+    - moves_from[case_depart]   -> liste des chess.Move légaux depuis cette case
+    - targets_from[case_depart] -> masque 64 bits des cases d'arrivée
+    - target_mask               -> masque 64 bits de toutes les cases atteignables
+    """
+
+    def __init__(self, board: chess.Board):
+        self.moves_from = {}
+        self.targets_from = {}
+        self.target_mask = 0
+
+        # Une seule génération des coups légaux pour toute la position
+        for move in board.legal_moves:
+            bit = chess.BB_SQUARES[move.to_square]
+            self.moves_from.setdefault(move.from_square, []).append(move)
+            self.targets_from[move.from_square] = self.targets_from.get(move.from_square, 0) | bit
+            self.target_mask |= bit
+
+    def moves(self, from_square: int) -> list:
+        """Retourne les coups légaux partant d'une case."""
+        return self.moves_from.get(from_square, [])
+
+    def targets(self, from_square: int) -> int:
+        """Retourne le masque des cases d'arrivée depuis une case."""
+        return self.targets_from.get(from_square, 0)
+
+    def find_move(self, from_square: int, to_square: int, promotion=chess.QUEEN):
+        """
+        Retourne le coup légal from_square -> to_square, ou None.
+        Pour une promotion, la pièce demandée (dame par défaut) est choisie.
+        """
+        if not self.targets(from_square) & chess.BB_SQUARES[to_square]:
+            return None
+        for move in self.moves(from_square):
+            if move.to_square == to_square and (move.promotion is None or move.promotion == promotion):
+                return move
+        return None
+
+    def is_legal(self, move: chess.Move) -> bool:
+        """Vérifie la légalité d'un coup sans régénérer les coups de la position."""
+        return move in self.moves(move.from_square)
+
+    def __len__(self):
+        return sum(len(moves) for moves in self.moves_from.values())
@@ -3,6 +3,7 @@ import subprocess
 import sys
 import os
 from game_with_stockfish import Game
+from move_journal import MoveJournal
 
 # --- Constants for the menu ---
 SCREEN_WIDTH = 640
@@ -123,13 +124,12 @@ def choose_color_modal(screen):
 
 
 def initialize_pvp_game_state():
-    """Creates or clears the communication file for a new 1v1 game."""
+    """Opens a new game in the communication journal for a 1v1 game."""
     filename = "next_move.txt"
     try:
-        # Start with an empty file. The white client will see this and know it's its turn.
-        with open(filename, "w") as f:
-            f.write("")
-        print(f"'{filename}' has been cleared for the new 1v1 game.")
+        # A new game header with no moves yet: the white client will see this and know it's its turn.
+        game_id = MoveJournal(filename).start_game()
+        print(f"'{filename}': new 1v1 game {game_id} opened.")
         return True
     except IOError as e:
         print(f"[CRITICAL ERROR] Could not initialize the game state file: {e}")
@@ -166,10 +166,11 @@ if __name__ == "__main__":
         try:
             # 3. Launch the two clients, passing 'pvp' mode and the player color as arguments
             print("Launching White player window...")
-            subprocess.Popen([python_executable, script_to_run, 'pvp', 'WHITE'])
+            # Moves are pushed over a localhost socket (each client falls back to the file if needed)
+            subprocess.Popen([python_executable, script_to_run, 'pvp', 'WHITE', 'socket'])
             
             print("Launching Black player window...")
-            subprocess.Popen([python_executable, script_to_run, 'pvp', 'BLACK'])
+            subprocess.Popen([python_executable, script_to_run, 'pvp', 'BLACK', 'socket'])
 
         except Exception as e:
             print(f"[CRITICAL ERROR] Failed to launch game clients: {e}")
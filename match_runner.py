@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Matchs moteur contre moteur en parallèle, pour vérifier les Elo annoncés des bots.
+
+- Joueurs : personas de bot_data.BOT_CATEGORIES ("Magnus"), moteur EngineManager
+  avec un Elo ("stockfish@1800"), moteur à pleine force ("stockfish") ou "random".
+  Les options UCI viennent de UniversalEngineSettings.set_elo_for_engine, comme en jeu.
+- Les parties tournent dans un ProcessPoolExecutor (un processus par cœur) ; chaque
+  moteur est lancé avec Threads=1 et un seul des deux réfléchit à la fois, donc
+  --jobs N occupe N cœurs sans surcharge. Les moteurs sont réutilisés d'une partie
+  à l'autre dans chaque processus.
+- Ouvertures tirées au hasard d'un fichier EPD ou PGN ; chaque ouverture est jouée
+  deux fois, couleurs inversées.
+- Sortie : fichier PGN et, pour chaque paire, écart d'Elo mesuré avec intervalle à 95%
+  comparé à l'écart annoncé.
+
+Usage:
+    python match_runner.py Emir Antonio --games 200 --openings openings.epd
+    python match_runner.py stockfish@1500 stockfish@1800 Magnus --games 100 --jobs 8 --pgn match.pgn
+"""
+
+import argparse
+import contextlib
+import itertools
+import math
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import chess
+import chess.pgn
+
+from bot_data import BOT_CATEGORIES
+from headless_runner import EnginePlayer, RandomPlayer, create_headless_chess, play_game, resolve_engine_path
+
+
+# ==================== JOUEURS ====================
+
+def find_bot(name):
+    for category in BOT_CATEGORIES:
+        for bot in category["bots"]:
+            if bot["name"].lower() == name.lower():
+                return bot
+    return None
+
+
+def resolve_player(spec, default_engine=None):
+    """
+    Traduit un nom de joueur en description sérialisable (envoyée aux processus).
+
+    Returns:
+        dict {'name', 'engine_id', 'path', 'elo', 'options'} ; engine_id None = aléatoire
+    """
+    if spec == "random":
+        return {"name": spec, "engine_id": None, "path": None, "elo": None, "options": {}}
+
+    bot = find_bot(spec)
+    if bot:
+        engine_id, elo = default_engine, bot["elo"]
+    else:
+        engine_id, _, elo = spec.partition("@")
+        elo = int(elo) if elo else None
+
+    from universal_settings import UniversalEngineSettings
+    settings = UniversalEngineSettings()
+    engine_id = engine_id or settings.get_selected_engine()
+    if elo is not None:
+        # Modifié en mémoire seulement : engine_settings.json n'est pas réécrit
+        settings.set_elo_for_engine(elo, engine_id)
+    options = {}
+    for key, value in settings.get_uci_config(engine_id).items():
+        if value in ("true", "false"):
+            value = value == "true"  # get_uci_config sérialise les booléens en texte
+        options[key] = value
+    options["Threads"] = 1
+    return {"name": spec, "engine_id": engine_id, "path": resolve_engine_path(engine_id),
+            "elo": elo if elo is not None else settings.get_elo_for_engine(engine_id), "options": options}
+
+
+# État propre à chaque processus du pool
+_players = {}
+_game = None
+
+
+def get_player(player, engine_time, seed):
+    if player["engine_id"] is None:
+        return RandomPlayer(seed)
+    if player["name"] not in _players:
+        _players[player["name"]] = EnginePlayer(player["path"], engine_time, player["options"])
+    return _players[player["name"]]
+
+
+def play_match_game(task):
+    """Joue une partie dans un processus du pool (task: dict sérialisable)."""
+    global _game
+    if _game is None:
+        _game = create_headless_chess()
+    white = get_player(task["white"], task["engine_time"], task["seed"])
+    black = get_player(task["black"], task["engine_time"], task["seed"] + 1)
+    start = time.perf_counter()
+    # Les traces de chaque coup ralentiraient les longues séries
+    with open(os.devnull, "w") as sink, contextlib.redirect_stdout(sink):
+        result = play_game(_game, white, black, task["max_plies"], task["opening_moves"], task["start_fen"])
+    result.update(index=task["index"], white=task["white"]["name"], black=task["black"]["name"],
+                  start_fen=task["start_fen"], seconds=time.perf_counter() - start)
+    return result
+
+
+# ==================== OUVERTURES ====================
+
+def load_openings(path):
+    """Retourne une liste de (fen de départ ou None, coups UCI) depuis un fichier EPD ou PGN."""
+    openings = []
+    if path.lower().endswith(".pgn"):
+        with open(path) as f:
+            while True:
+                game = chess.pgn.read_game(f)
+                if game is None:
+                    break
+                board = game.board()
+                fen = None if board.fen() == chess.STARTING_FEN else board.fen()
+                openings.append((fen, [move.uci() for move in game.mainline_moves()]))
+    else:
+        with open(path) as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    board, _ = chess.Board.from_epd(line)
+                    openings.append((board.fen(), []))
+    return openings
+
+
+def randomize_opening(opening, plies, rng):
+    """Ajoute quelques demi-coups aléatoires pour diversifier les parties."""
+    fen, moves = opening
+    board = chess.Board(fen) if fen else chess.Board()
+    for move in moves:
+        board.push_uci(move)
+    moves = list(moves)
+    for _ in range(plies):
+        legal = list(board.legal_moves)
+        if not legal or board.is_game_over():
+            break
+        move = rng.choice(legal)
+        board.push(move)
+        moves.append(move.uci())
+    return fen, moves
+
+
+def build_tasks(players, games_per_pair, openings, random_plies, engine_time, max_plies, seed):
+    rng = random.Random(seed)
+    tasks = []
+    for a, b in itertools.combinations(players, 2):
+        for pair_index in range((games_per_pair + 1) // 2):
+            opening = randomize_opening(rng.choice(openings), random_plies, rng)
+            # Même ouverture, couleurs inversées : l'avantage du trait s'annule
+            for white, black in ((a, b), (b, a)):
+                tasks.append({"index": len(tasks), "white": white, "black": black, "start_fen": opening[0],
+                              "opening_moves": opening[1], "engine_time": engine_time, "max_plies": max_plies,
+                              "seed": rng.randrange(1 << 30)})
+    return tasks
+
+
+# ==================== RÉSULTATS ====================
+
+def elo_from_score(score):
+    score = min(max(score, 1e-6), 1 - 1e-6)
+    return -400 * math.log10(1 / score - 1)
+
+
+def elo_estimate(wins, draws, losses):
+    """
+    Écart d'Elo et intervalle de confiance à 95% (erreur type du score par partie).
+
+    Returns:
+        (elo, elo_bas, elo_haut)
+    """
+    n = wins + draws + losses
+    score = (wins + 0.5 * draws) / n
+    variance = (wins * (1 - score) ** 2 + draws * (0.5 - score) ** 2 + losses * score ** 2) / n
+    margin = 1.96 * math.sqrt(variance / n)
+    return elo_from_score(score), elo_from_score(score - margin), elo_from_score(score + margin)
+
+
+def write_pgn(results, path, event):
+    with open(path, "w") as f:
+        for r in sorted(results, key=lambda r: r["index"]):
+            board = chess.Board(r["start_fen"]) if r["start_fen"] else chess.Board()
+            for move in r["moves"]:
+                board.push_uci(move)
+            game = chess.pgn.Game.from_board(board)
+            game.headers.update(Event=event, Round=str(r["index"] + 1), White=r["white"], Black=r["black"],
+                                Result=r["result"])
+            print(game, file=f, end="\n\n")
+
+
+def report(players, results):
+    print("=" * 70)
+    print(f"{'Joueur A':<16}{'Joueur B':<16}{'+':>5}{'=':>5}{'-':>5}{'Elo A-B':>10}{'IC 95%':>18}{'annoncé':>10}")
+    for a, b in itertools.combinations(players, 2):
+        wins = draws = losses = 0
+        for r in results:
+            if {r["white"], r["black"]} != {a["name"], b["name"]}:
+                continue
+            if r["result"] == "1/2-1/2":
+                draws += 1
+            elif (r["result"] == "1-0") == (r["white"] == a["name"]):
+                wins += 1
+            else:
+                losses += 1
+        if not wins + draws + losses:
+            continue
+        elo, low, high = elo_estimate(wins, draws, losses)
+        claimed = f"{a['elo'] - b['elo']:+d}" if a["elo"] is not None and b["elo"] is not None else "-"
+        print(f"{a['name']:<16}{b['name']:<16}{wins:>5}{draws:>5}{losses:>5}{elo:>+10.0f}"
+              f"{f'[{low:+.0f}, {high:+.0f}]':>18}{claimed:>10}")
+    print("=" * 70)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Matchs moteur contre moteur en parallèle")
+    parser.add_argument('players', nargs='+', help="Bots (Magnus), moteurs (stockfish@1800) ou random")
+    parser.add_argument('--games', type=int, default=100, help="Parties par paire de joueurs")
+    parser.add_argument('--openings', help="Fichier d'ouvertures EPD ou PGN (position initiale sinon)")
+    parser.add_argument('--random-plies', type=int, default=0, help="Demi-coups aléatoires après l'ouverture")
+    parser.add_argument('--engine', help="Moteur des bots (EngineManager), moteur sélectionné par défaut")
+    parser.add_argument('--engine-time', type=float, default=0.1, help="Temps par coup (s)")
+    parser.add_argument('--max-plies', type=int, default=300)
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(), help="Parties simultanées (1 cœur chacune)")
+    parser.add_argument('--pgn', default="match.pgn", help="Fichier PGN de sortie")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if len(args.players) < 2:
+        parser.error("au moins deux joueurs")
+    players = [resolve_player(spec, args.engine) for spec in args.players]
+    openings = load_openings(args.openings) if args.openings else [(None, [])]
+    if not args.openings and not args.random_plies:
+        print("[MATCH] Pas de fichier d'ouvertures : toutes les parties partent de la position initiale")
+    tasks = build_tasks(players, args.games, openings, args.random_plies, args.engine_time, args.max_plies,
+                        args.seed)
+
+    print(f"[MATCH] {len(tasks)} parties sur {args.jobs} processus")
+    results = []
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+        futures = [executor.submit(play_match_game, task) for task in tasks]
+        for done, future in enumerate(as_completed(futures), 1):
+            results.append(future.result())
+            if done % max(1, len(tasks) // 20) == 0 or done == len(tasks):
+                print(f"[MATCH] {done}/{len(tasks)} parties ({time.perf_counter() - start:.0f}s)")
+
+    write_pgn(results, args.pgn, event=" vs ".join(args.players))
+    elapsed = time.perf_counter() - start
+    print(f"[MATCH] {len(results)} parties en {elapsed:.1f}s, PGN: {args.pgn}")
+    report(players, results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+"""
+Journal des coups en ajout seul (next_move.txt).
+
+Format (une ligne par enregistrement) :
+    #game;<id>                      en-tête d'une nouvelle partie
+    <seq>;<joueur>;<coup>;<capture>  ex: 1;W;e2e4;0  (seq = numéro du demi-coup)
+
+- Les écrivains ajoutent des lignes (jamais de réécriture pendant une partie).
+- Les lecteurs mémorisent leur position (offset) et ne lisent que les nouveaux octets.
+  Ils dédupliquent par (partie, seq) : deux coups identiques successifs ne sont plus perdus,
+  et un lecteur lent rattrape tous les coups manqués.
+- compact() en fin de partie ne garde que la partie en cours (remplacement atomique) ;
+  les lecteurs détectent le nouveau fichier et relisent sans rejouer les coups déjà vus.
+"""
+
+import os
+import uuid
+from dataclasses import dataclass
+
+HEADER_PREFIX = "#game;"
+
+
+@dataclass
+class JournalEntry:
+    game_id: str
+    seq: int
+    player: str
+    move: str
+    capture: str
+
+    def to_line(self):
+        return f"{self.seq};{self.player};{self.move};{self.capture}"
+
+
+class MoveJournal:
+    """Écrivain du journal."""
+
+    def __init__(self, path="next_move.txt"):
+        self.path = path
+
+    def start_game(self, game_id=None):
+        """Ajoute l'en-tête d'une nouvelle partie (les parties précédentes sont compactées) et retourne son identifiant."""
+        game_id = game_id or uuid.uuid4().hex[:8]
+        self._append(f"{HEADER_PREFIX}{game_id}")
+        self.compact()
+        return game_id
+
+    def append(self, seq, player, move_uci, capture_flag):
+        self._append(f"{seq};{player};{move_uci};{capture_flag}")
+
+    def _append(self, line):
+        # O_APPEND : les petites écritures de deux processus ne s'entrelacent pas
+        with open(self.path, "a") as f:
+            f.write(line + "\n")
+
+    def compact(self):
+        """Ne conserve que la dernière partie du journal (remplacement atomique)."""
+        try:
+            with open(self.path, "r") as f:
+                lines = f.read().splitlines()
+        except OSError:
+            return
+        start = 0
+        for i, line in enumerate(lines):
+            if line.startswith(HEADER_PREFIX):
+                start = i
+        if start == 0:
+            return  # Rien à compacter
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            f.write("\n".join(lines[start:]) + "\n")
+        os.replace(tmp_path, self.path)
+
+
+class JournalReader:
+    """
+    Lecteur incrémental : seul ce qui a été ajouté depuis la dernière lecture est lu.
+
+    Args:
+        path: Chemin du journal
+        skip_existing: Ignorer le contenu déjà présent à la création (un lecteur qui
+                       démarre ne rejoue pas les coups passés)
+    """
+
+    def __init__(self, path="next_move.txt", skip_existing=True):
+        self.path = path
+        self.offset = 0
+        self.file_id = None
+        self.partial = b""
+        self.game_id = None
+        self.last_seq = 0
+        if skip_existing:
+            self.read_new()
+
+    def read_new(self):
+        """Retourne la liste des nouvelles JournalEntry (éventuellement vide)."""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return []
+
+        file_id = (stat.st_dev, stat.st_ino)
+        if file_id != self.file_id or stat.st_size < self.offset:
+            # Nouveau fichier (compaction) ou fichier tronqué : relecture depuis le début,
+            # la déduplication par seq évite de rejouer les coups déjà vus
+            self.file_id = file_id
+            self.offset = 0
+            self.partial = b""
+        if stat.st_size == self.offset:
+            return []
+
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(self.offset)
+                data = f.read()
+        except OSError:
+            return []
+        self.offset += len(data)
+
+        data = self.partial + data
+        lines = data.split(b"\n")
+        self.partial = lines.pop()  # Ligne incomplète : attend la suite de l'écriture
+
+        entries = []
+        for raw in lines:
+            entry = self.parse_line(raw.decode(errors="ignore").strip())
+            if entry:
+                entries.append(entry)
+        return entries
+
+    def parse_line(self, line):
+        if not line:
+            return None
+        if line.startswith(HEADER_PREFIX):
+            game_id = line[len(HEADER_PREFIX):]
+            if game_id != self.game_id:
+                self.game_id = game_id
+                self.last_seq = 0
+            return None
+        if line.startswith("#"):
+            return None
+
+        parts = line.split(";")
+        if len(parts) != 4 or not parts[0].isdigit():
+            print(f"[JOURNAL] Ligne ignorée: '{line}'")
+            return None
+        seq = int(parts[0])
+        if seq <= self.last_seq:
+            return None  # Déjà lu (relecture après compaction)
+        self.last_seq = seq
+        return JournalEntry(self.game_id, seq, parts[1], parts[2], parts[3])
+
+
+def read_journal(path="next_move.txt"):
+    """Retourne les coups de la dernière partie du journal."""
+    entries = []
+    reader = JournalReader(path, skip_existing=False)
+    for entry in reader.read_new():
+        if entries and entry.game_id != entries[-1].game_id:
+            entries = []
+        entries.append(entry)
+    return entries
+
+
+def journal_game_id(path="next_move.txt"):
+    """Retourne l'identifiant de la dernière partie du journal (None si aucune)."""
+    reader = JournalReader(path, skip_existing=False)
+    reader.read_new()
+    return reader.game_id
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Traces du cycle de vie d'un coup, du clic jusqu'au robot.
+
+Chaque étape enregistre un span {move_id, stage, start, end, dur_ms, pid} dans un
+fichier JSON-lines partagé par tous les processus (jeu, robot). L'identifiant de coup
+est '<partie>-<seq>' : le jeu et le robot le calculent chacun à partir du journal
+(next_move.txt), il traverse donc la frontière fichier sans rien ajouter au format.
+
+Activation : variable d'environnement CHESS_TRACE
+    CHESS_TRACE=1                 -> move_trace.jsonl
+    CHESS_TRACE=/tmp/trace.jsonl  -> fichier choisi
+Désactivé, span() ne coûte qu'un test.
+
+Rapport :
+    python move_trace.py report [move_trace.jsonl]
+"""
+
+import argparse
+import contextvars
+import json
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+DEFAULT_PATH = "move_trace.jsonl"
+
+# Coup en cours dans ce thread (ex: robot pendant execute_move -> commandes G-code)
+current_move = contextvars.ContextVar("current_move", default=None)
+
+
+def move_id(game_id, seq):
+    return f"{game_id or 'local'}-{seq}"
+
+
+class Tracer:
+    """Écrit les spans d'un processus dans le fichier de traces (no-op si path est None)."""
+
+    def __init__(self, path=None):
+        self.path = path
+        self.enabled = path is not None
+        self.lock = threading.Lock()
+        self.file = None
+
+    def write(self, record):
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        with self.lock:
+            try:
+                if self.file is None:
+                    self.file = open(self.path, "a", buffering=1)
+                self.file.write(line)
+            except OSError as e:
+                print(f"[TRACE] Écriture impossible ({e}), traces désactivées")
+                self.enabled = False
+
+    @contextmanager
+    def span(self, stage, move=None, **attrs):
+        """Mesure une étape ; move=None utilise le coup courant du thread."""
+        if not self.enabled:
+            yield
+            return
+        start = time.time()
+        try:
+            yield
+        finally:
+            end = time.time()
+            self.record(stage, move, start, end, attrs)
+
+    def event(self, stage, move=None, start=None, **attrs):
+        """Étape instantanée (réception, fin...) ou, avec start, étape commencée plus tôt."""
+        if self.enabled:
+            end = time.time()
+            self.record(stage, move, start or end, end, attrs)
+
+    def record(self, stage, move, start, end, attrs):
+        record = {"move_id": move or current_move.get(), "stage": stage, "start": round(start, 6),
+                  "end": round(end, 6), "dur_ms": round((end - start) * 1000, 3), "pid": os.getpid()}
+        if attrs:
+            record["attrs"] = attrs
+        self.write(record)
+
+    @contextmanager
+    def move(self, move):
+        """Définit le coup courant pour les spans imbriqués (sans move explicite)."""
+        token = current_move.set(move)
+        try:
+            yield
+        finally:
+            current_move.reset(token)
+
+
+def trace_path_from_env():
+    """Chemin du fichier de traces selon CHESS_TRACE, ou None si désactivé."""
+    value = os.environ.get("CHESS_TRACE", "")
+    if not value or value == "0":
+        return None
+    return DEFAULT_PATH if value == "1" else value
+
+
+def tracer_from_env():
+    return Tracer(trace_path_from_env())
+
+
+tracer = tracer_from_env()
+span = tracer.span
+event = tracer.event
+
+
+# ==================== RAPPORT ====================
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+
+def load(path):
+    records = []
+    with open(path) as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+    return records
+
+
+def report(path):
+    records = load(path)
+    if not records:
+        print(f"Aucune trace dans {path}")
+        return
+
+    by_stage = defaultdict(list)
+    by_move = defaultdict(list)
+    for r in records:
+        by_stage[r["stage"]].append(r["dur_ms"])
+        if r.get("move_id"):
+            by_move[r["move_id"]].append(r)
+
+    print(f"{len(records)} spans, {len(by_move)} coups")
+    print(f"\n{'Étape':<28}{'n':>6}{'p50':>10}{'p95':>10}{'max':>10}{'total':>11}  (ms)")
+    for stage, values in sorted(by_stage.items(), key=lambda kv: -sum(kv[1])):
+        print(f"{stage:<28}{len(values):>6}{percentile(values, 50):>10.2f}{percentile(values, 95):>10.2f}"
+              f"{max(values):>10.2f}{sum(values):>11.1f}")
+
+    # Attentes entre deux étapes consécutives d'un même coup (file, thread, autre processus)
+    gaps = defaultdict(list)
+    totals = []
+    for spans in by_move.values():
+        spans.sort(key=lambda r: r["start"])
+        totals.append((spans[-1]["end"] - spans[0]["start"]) * 1000)
+        # Les spans imbriqués (G-code dans execute_move) ne comptent pas comme une attente
+        last_end, last_stage = spans[0]["end"], spans[0]["stage"]
+        for r in spans[1:]:
+            if r["start"] >= last_end:
+                gaps[f"{last_stage} -> {r['stage']}"].append((r["start"] - last_end) * 1000)
+            if r["end"] >= last_end:
+                last_end, last_stage = r["end"], r["stage"]
+
+    if gaps:
+        print(f"\n{'Attente entre étapes':<44}{'n':>6}{'p50':>10}{'p95':>10}{'max':>10}  (ms)")
+        for name, values in sorted(gaps.items(), key=lambda kv: -sum(kv[1]))[:15]:
+            print(f"{name:<44}{len(values):>6}{percentile(values, 50):>10.2f}{percentile(values, 95):>10.2f}"
+                  f"{max(values):>10.2f}")
+
+    print(f"\nDe bout en bout par coup: p50={percentile(totals, 50):.1f} ms  p95={percentile(totals, 95):.1f} ms  "
+          f"max={max(totals):.1f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Traces du cycle de vie des coups")
+    sub = parser.add_subparsers(dest="command")
+    report_parser = sub.add_parser("report", help="Latences par étape et percentiles")
+    report_parser.add_argument("path", nargs="?", default=trace_path_from_env() or DEFAULT_PATH)
+    args = parser.parse_args(argv)
+    if args.command != "report":
+        parser.print_help()
+        return 1
+    if not os.path.exists(args.path):
+        print(f"Fichier de traces introuvable: {args.path}")
+        return 1
+    report(args.path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,271 @@
+"""
+Transport des coups entre les deux clients PvP.
+
+- SocketMoveTransport : TCP localhost, trames JSON délimitées par '\\n',
+  livraison poussée, accusés de réception, reconnexion et renvoi des coups non acquittés.
+  Le client BLANC écoute, le client NOIR se connecte.
+- FileMoveTransport : repli historique, lecture incrémentale du journal next_move.txt.
+
+Les deux exposent la même interface : send_move(), poll(), close().
+"""
+
+import json
+import queue
+import socket
+import threading
+import time
+import uuid
+
+from file_watcher import create_watcher
+from move_journal import JournalReader
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 50557
+
+
+class FileMoveTransport:
+    """
+    Repli : les coups adverses sont lus dans le journal next_move.txt (écrit par Chess.log_move_to_file).
+
+    Avec on_receive, un thread surveille le journal (inotify ou interrogation adaptative)
+    et réveille l'appelant dès qu'il est modifié ; sans, l'appelant interroge poll() régulièrement.
+    """
+
+    def __init__(self, player_color, move_file="next_move.txt", on_receive=None):
+        self.player_color = player_color
+        self.move_file = move_file
+        # Lecture incrémentale du journal à partir de sa fin actuelle
+        self.reader = JournalReader(move_file)
+        self.on_receive = on_receive
+        self.push = on_receive is not None
+        self.stopped = threading.Event()
+        self.watcher = None
+        if self.push:
+            self.watcher = create_watcher(move_file)
+            threading.Thread(target=self.watch, daemon=True).start()
+
+    def watch(self):
+        while not self.stopped.is_set():
+            if self.watcher.wait(0.5) and not self.stopped.is_set():
+                self.on_receive()
+
+    def send_move(self, player, move_uci, capture_flag):
+        # Le journal contient déjà ce coup (écrit par Chess) : on avance simplement la lecture
+        self.reader.read_new()
+
+    def poll(self):
+        """Retourne la liste des nouveaux coups (player, move_uci, capture_flag)."""
+        return [(entry.player, entry.move, entry.capture) for entry in self.reader.read_new()]
+
+    def close(self):
+        self.stopped.set()
+        if self.watcher:
+            self.watcher.close()
+
+
+class SocketMoveTransport:
+    """
+    Transport TCP local avec protocole à trames JSON :
+        {"type": "move", "session": "3f2a9c1e", "seq": 3, "player": "W", "move": "e2e4", "capture": "0",
+         "sent_at": 1700000000.0}
+        {"type": "ack", "seq": 3}
+    Les numéros de séquence sont propres à chaque émetteur et à sa session (une par
+    instance) ; les doublons (renvoi après reconnexion) sont acquittés mais ignorés.
+    Un adversaire redémarré ouvre une nouvelle session et repart à seq 1.
+
+    Tant qu'aucune connexion n'est établie (adversaire replié sur le fichier,
+    port occupé...), poll() relit aussi le fichier de repli.
+    """
+
+    push = True
+
+    def __init__(self, player_color, host=DEFAULT_HOST, port=DEFAULT_PORT, on_receive=None,
+                 retry_delay=0.5, fallback=None):
+        self.player_color = player_color
+        self.host = host
+        self.port = port
+        self.on_receive = on_receive          # Appelé depuis le thread réseau (ex: réveil de l'affichage)
+        self.retry_delay = retry_delay
+        self.is_server = (player_color == 'WHITE')
+        self.fallback = fallback              # FileMoveTransport utilisé hors connexion
+
+        self.inbox = queue.Queue()
+        self.pending = {}                     # seq -> trame envoyée non acquittée
+        self.session = uuid.uuid4().hex[:8]   # Session de cet émetteur
+        self.next_seq = 1
+        self.peer_session = None              # Session de l'adversaire (dédoublonnage)
+        self.last_received_seq = 0
+        self.latencies = []                   # latence de propagation (ms) des coups reçus
+        self.ack_rtts = []                    # aller-retour coup -> ack (ms) des coups envoyés
+
+        self.lock = threading.Lock()
+        self.conn = None
+        self.stopped = threading.Event()
+        self.listener = None
+        if self.is_server:
+            # Bind immédiat : une erreur ici permet à l'appelant de se replier sur le fichier
+            self.listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self.listener.bind((host, port))
+            self.listener.listen(1)
+            self.listener.settimeout(0.5)
+
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    # ==================== CONNEXION ====================
+
+    def connect_once(self):
+        """Établit une connexion (accept côté serveur, connect côté client) ou retourne None."""
+        try:
+            if self.is_server:
+                conn, _ = self.listener.accept()
+            else:
+                conn = socket.create_connection((self.host, self.port), timeout=1)
+        except (socket.timeout, OSError):
+            return None
+        conn.settimeout(None)
+        conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return conn
+
+    def run(self):
+        """Boucle du thread réseau : connexion, renvoi des coups en attente, lecture."""
+        while not self.stopped.is_set():
+            conn = self.connect_once()
+            if conn is None:
+                if not self.is_server:
+                    self.stopped.wait(self.retry_delay)
+                continue
+
+            print(f"[{self.player_color}] [NET] Connecté à l'adversaire")
+            with self.lock:
+                self.conn = conn
+                # Reconnexion : tout ce qui n'a pas été acquitté est renvoyé
+                for seq in sorted(self.pending):
+                    self.send_frame(self.pending[seq])
+
+            self.read_loop(conn)
+
+            with self.lock:
+                self.conn = None
+            try:
+                conn.close()
+            except OSError:
+                pass
+            if not self.stopped.is_set():
+                print(f"[{self.player_color}] [NET] Connexion perdue, reconnexion...")
+
+    def read_loop(self, conn):
+        buffer = b""
+        while not self.stopped.is_set():
+            try:
+                data = conn.recv(4096)
+            except OSError:
+                return
+            if not data:
+                return
+            buffer += data
+            while b"\n" in buffer:
+                line, buffer = buffer.split(b"\n", 1)
+                if line.strip():
+                    self.handle_frame(line)
+
+    def handle_frame(self, line):
+        try:
+            frame = json.loads(line.decode())
+        except (ValueError, UnicodeDecodeError):
+            print(f"[{self.player_color}] [NET] Trame invalide ignorée: {line[:80]!r}")
+            return
+
+        if frame.get("type") == "ack":
+            with self.lock:
+                sent = self.pending.pop(frame.get("seq"), None)
+            if sent:
+                self.ack_rtts.append((time.time() - sent["sent_at"]) * 1000)
+            return
+
+        if frame.get("type") == "move":
+            seq = frame.get("seq", 0)
+            with self.lock:
+                self.send_frame({"type": "ack", "seq": seq})
+            if frame.get("session") != self.peer_session:
+                # Adversaire redémarré : nouvelle numérotation
+                self.peer_session = frame.get("session")
+                self.last_received_seq = 0
+            if seq <= self.last_received_seq:
+                return  # Doublon après reconnexion
+            self.last_received_seq = seq
+            latency_ms = (time.time() - frame.get("sent_at", time.time())) * 1000
+            self.latencies.append(latency_ms)
+            print(f"[{self.player_color}] [NET] Coup reçu {frame['move']} (seq {seq}, {latency_ms:.2f} ms)")
+            if self.fallback:
+                # Le fichier contient déjà ce coup : ne pas le relire en cas de déconnexion
+                self.fallback.send_move(frame["player"], frame["move"], frame.get("capture", "0"))
+            self.inbox.put((frame["player"], frame["move"], frame.get("capture", "0")))
+            if self.on_receive:
+                self.on_receive()
+
+    def send_frame(self, frame):
+        """Envoie une trame (appelé avec self.lock). Les erreurs sont rattrapées à la reconnexion."""
+        if not self.conn:
+            return
+        try:
+            self.conn.sendall((json.dumps(frame) + "\n").encode())
+        except OSError:
+            pass
+
+    # ==================== INTERFACE ====================
+
+    def send_move(self, player, move_uci, capture_flag):
+        with self.lock:
+            frame = {"type": "move", "session": self.session, "seq": self.next_seq, "player": player, "move": move_uci,
+                     "capture": capture_flag, "sent_at": time.time()}
+            self.pending[self.next_seq] = frame
+            self.next_seq += 1
+            self.send_frame(frame)
+        if self.fallback:
+            self.fallback.send_move(player, move_uci, capture_flag)
+
+    def poll(self):
+        moves = []
+        while True:
+            try:
+                moves.append(self.inbox.get_nowait())
+            except queue.Empty:
+                break
+        if not moves and self.conn is None and self.fallback:
+            moves = self.fallback.poll()
+        return moves
+
+    def latency_report(self):
+        def stats(values):
+            if not values:
+                return "n/a"
+            ordered = sorted(values)
+            return f"moy={sum(ordered) / len(ordered):.2f} ms, max={ordered[-1]:.2f} ms ({len(ordered)} coups)"
+        return f"propagation: {stats(self.latencies)} | ack: {stats(self.ack_rtts)}"
+
+    def close(self):
+        self.stopped.set()
+        with self.lock:
+            if self.conn:
+                try:
+                    self.conn.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+        if self.listener:
+            self.listener.close()
+        if self.fallback:
+            self.fallback.close()
+        print(f"[{self.player_color}] [NET] Latence {self.latency_report()}")
+
+
+def create_transport(player_color, kind="socket", move_file="next_move.txt", port=DEFAULT_PORT, on_receive=None):
+    """Crée le transport demandé, avec repli sur le fichier si le socket est indisponible."""
+    if kind == "socket":
+        try:
+            return SocketMoveTransport(player_color, port=port, on_receive=on_receive,
+                                       fallback=FileMoveTransport(player_color, move_file, on_receive))
+        except OSError as e:
+            print(f"[{player_color}] [NET] Socket indisponible ({e}), repli sur {move_file}")
+    return FileMoveTransport(player_color, move_file, on_receive)
@@ -2,7 +2,8 @@ import os
 import pygame
 
 class Piece(pygame.sprite.Sprite):
-    def __init__(self, filename, cols, rows):
+    def __init__(self, filename, cols, rows, cell_size=None):
+        """cell_size: taille des cases en pixels (planche redimensionnée, ex: simultanée)."""
         pygame.sprite.Sprite.__init__(self)
         self.pieces = {
             "white_pawn":   5,
@@ -19,6 +20,8 @@ class Piece(pygame.sprite.Sprite):
             "black_queen":  7
         }
         self.spritesheet = pygame.image.load(filename).convert_alpha()
+        if cell_size:
+            self.spritesheet = pygame.transform.smoothscale(self.spritesheet, (cols * cell_size, rows * cell_size))
 
         self.cols = cols
         self.rows = rows
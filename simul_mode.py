@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Simultanée : un joueur affronte le moteur sur N plateaux dans une seule fenêtre.
+
+- Chaque plateau a son propre état Chess ; tous partagent un EnginePool.
+- La réponse du moteur est calculée en arrière-plan dès que le joueur a joué sur un plateau.
+- SimulScheduler n'envoie au pool qu'autant de recherches qu'il y a de moteurs et choisit
+  toujours le plateau que le joueur atteindra en premier (ordre de la tournée : 1, 2, ... N, 1...).
+- Aucun plateau n'écrit dans next_move.txt : le robot ne sert qu'une partie à la fois.
+
+Usage:
+    python simul_mode.py --boards 6
+    python simul_mode.py --boards 4 --color BLACK --pool-size 2 --engine-time 0.5
+"""
+
+import argparse
+import math
+import os
+import queue
+import sys
+
+import chess
+import pygame
+from pygame.locals import *
+
+from chess_with_validation import Chess
+from engine_pool import EnginePool
+from frame_scheduler import FrameScheduler
+from headless_runner import resolve_engine_path
+from piece import Piece
+
+
+class SimulScheduler:
+    """
+    Ordonnanceur des réponses du moteur.
+
+    Args:
+        pool: EnginePool partagé
+        n_boards: Nombre de plateaux de la tournée
+        max_in_flight: Recherches envoyées au pool en même temps (défaut: une par moteur)
+    """
+
+    def __init__(self, pool, n_boards, max_in_flight=None):
+        self.pool = pool
+        self.n_boards = n_boards
+        self.max_in_flight = max_in_flight or pool.size
+        self.position = 0           # Plateau où le joueur vient de jouer
+        self.pending = {}           # plateau -> FEN pas encore envoyée au pool
+        self.in_flight = {}         # plateau -> Future
+        self.done = queue.Queue()   # (plateau, fen, coup) remplis par les threads du pool
+        self.on_done = None         # Appelé depuis le pool (ex: réveiller la boucle d'affichage)
+
+    def distance(self, index):
+        """Nombre de plateaux que le joueur visite avant d'arriver à index."""
+        return (index - self.position - 1) % self.n_boards
+
+    def move_to(self, index):
+        self.position = index
+
+    def request(self, index, fen):
+        """Demande la réponse du moteur pour un plateau (remplace une demande non envoyée)."""
+        self.pending[index] = fen
+        self.dispatch()
+
+    def dispatch(self):
+        # Les priorités changent à chaque déplacement du joueur : les demandes restent ici
+        # et ne partent au pool que lorsqu'un moteur est libre
+        while self.pending and len(self.in_flight) < self.max_in_flight:
+            index = min(self.pending, key=self.distance)
+            fen = self.pending.pop(index)
+            future = self.pool.submit(fen)
+            self.in_flight[index] = future
+            future.add_done_callback(lambda f, index=index, fen=fen: self.finished(index, fen, f))
+
+    def finished(self, index, fen, future):
+        try:
+            move = future.result()
+        except Exception as e:
+            print(f"[SIMUL] Recherche du plateau {index + 1} échouée: {e}")
+            move = None
+        self.done.put((index, fen, move))
+        if self.on_done:
+            self.on_done()
+
+    def results(self):
+        """Réponses terminées depuis le dernier appel ; relance les demandes en attente."""
+        results = []
+        while True:
+            try:
+                index, fen, move = self.done.get_nowait()
+            except queue.Empty:
+                break
+            self.in_flight.pop(index, None)
+            results.append((index, fen, move))
+        self.dispatch()
+        return results
+
+    def busy(self, index):
+        return index in self.pending or index in self.in_flight
+
+
+class SimulGame:
+    MARGIN = 12
+    HEADER = 40
+
+    def __init__(self, n_boards, pool, player_color='WHITE', window_size=(1280, 820)):
+        self.player_color = player_color.upper()
+        self.is_flipped = self.player_color == 'BLACK'
+        self.human_turn = chess.WHITE if self.player_color == 'WHITE' else chess.BLACK
+        self.pool = pool
+        self.running = True
+        self.resources = "res"
+
+        pygame.init()
+        self.screen = pygame.display.set_mode(window_size)
+        pygame.display.set_caption(f"Simultanée - {n_boards} plateaux")
+        self.scheduler = FrameScheduler(active_fps=30)
+        self.engine = SimulScheduler(pool, n_boards)
+        self.engine.on_done = FrameScheduler.wake
+        self.font = pygame.font.SysFont("sans-serif", 24)
+        self.small_font = pygame.font.SysFont("sans-serif", 20)
+
+        self.layout(n_boards, window_size)
+        self.boards = [self.create_board(i) for i in range(n_boards)]
+        self.pressed_board = None  # Plateau qui a reçu le dernier clic (fin du glisser)
+
+        # Noirs : le moteur ouvre sur tous les plateaux
+        if self.human_turn == chess.BLACK:
+            for i, board in enumerate(self.boards):
+                self.engine.request(i, board.validation_board.fen())
+
+    def layout(self, n_boards, window_size):
+        """Grille la plus carrée possible ; cases en pixels entiers."""
+        width, height = window_size
+        self.cols = math.ceil(math.sqrt(n_boards))
+        self.rows = math.ceil(n_boards / self.cols)
+        board_px = min((width - self.MARGIN * (self.cols + 1)) // self.cols,
+                       (height - self.HEADER - self.MARGIN * (self.rows + 1)) // self.rows)
+        self.square_length = board_px // 8
+        self.board_px = self.square_length * 8
+
+        try:
+            board_img = pygame.image.load(os.path.join(self.resources, "board.png")).convert()
+            self.board_img = pygame.transform.smoothscale(board_img, (self.board_px, self.board_px))
+        except pygame.error:
+            self.board_img = pygame.Surface((self.board_px, self.board_px))
+            for r in range(8):
+                for c in range(8):
+                    color = (240, 217, 181) if (r + c) % 2 == 0 else (181, 136, 99)
+                    pygame.draw.rect(self.board_img, color, (c * self.square_length, r * self.square_length,
+                                                             self.square_length, self.square_length))
+        # Une seule planche de pièces redimensionnée, partagée par tous les plateaux
+        self.pieces_src = os.path.join(self.resources, "pieces.png")
+        self.pieces = Piece(self.pieces_src, cols=6, rows=2, cell_size=self.square_length)
+
+    def board_origin(self, index):
+        col, row = index % self.cols, index // self.cols
+        return (self.MARGIN + col * (self.board_px + self.MARGIN),
+                self.HEADER + self.MARGIN + row * (self.board_px + self.MARGIN))
+
+    def create_board(self, index):
+        x, y = self.board_origin(index)
+        locations = [[[x + c * self.square_length, y + r * self.square_length] for r in range(8)] for c in range(8)]
+        board = Chess(self.screen, self.pieces_src, locations, self.square_length, 'simul', self.player_color,
+                      chess_pieces=self.pieces)
+        board.journal = None  # Les plateaux de la simultanée ne pilotent pas le robot
+        return board
+
+    def board_at(self, pos):
+        for i in range(len(self.boards)):
+            if pygame.Rect(*self.board_origin(i), self.board_px, self.board_px).collidepoint(pos):
+                return i
+        return None
+
+    def is_human_turn(self, board):
+        return not board.winner and board.validation_board.turn == self.human_turn
+
+    def next_board(self):
+        """Plateau que le joueur doit jouer ensuite (le plus proche dans la tournée), ou None."""
+        waiting = [i for i, board in enumerate(self.boards) if self.is_human_turn(board)]
+        return min(waiting, key=self.engine.distance) if waiting else None
+
+    # ==================== BOUCLE ====================
+
+    def handle_event(self, event):
+        if event.type == QUIT or (event.type == KEYDOWN and event.key == K_ESCAPE):
+            self.running = False
+        elif event.type == MOUSEBUTTONDOWN and event.button == 1:
+            self.pressed_board = self.board_at(event.pos)
+            if self.pressed_board is not None:
+                self.boards[self.pressed_board].handle_event(event)
+        elif event.type == MOUSEBUTTONUP and event.button == 1 and self.pressed_board is not None:
+            # Le relâchement appartient au plateau du clic, même hors de son cadre
+            self.boards[self.pressed_board].handle_event(event)
+
+    def play_turns(self):
+        for index, fen, move in self.engine.results():
+            board = self.boards[index]
+            if board.winner or board.validation_board.fen() != fen:
+                continue
+            # Coup vide : run_stockfish_move joue un coup aléatoire
+            board.run_stockfish_move(move or "")
+
+        for i, board in enumerate(self.boards):
+            if not self.is_human_turn(board) or self.engine.busy(i):
+                board.utils.clear_actions()
+                continue
+            if board.handle_human_move(self.player_color.lower(), self.is_flipped):
+                self.engine.move_to(i)
+                if not board.winner:
+                    self.engine.request(i, board.validation_board.fen())
+
+    def draw(self):
+        self.screen.fill((0, 0, 0))
+        next_board = self.next_board()
+        for i, board in enumerate(self.boards):
+            x, y = self.board_origin(i)
+            self.screen.blit(self.board_img, (x, y))
+            board.draw_pieces(self.is_flipped)
+            if i == next_board:
+                color = (255, 215, 0)    # Prochain plateau de la tournée
+            elif self.is_human_turn(board):
+                color = (60, 200, 60)    # À jouer
+            else:
+                color = (90, 90, 90)     # Moteur ou partie terminée
+            pygame.draw.rect(self.screen, color, (x - 4, y - 4, self.board_px + 8, self.board_px + 8), 3)
+            label = f"{i + 1}" + (f" - {board.winner}" if board.winner else "")
+            text = self.small_font.render(label, True, (255, 255, 255), (0, 0, 0))
+            self.screen.blit(text, (x + 4, y + 4))
+
+        to_play = sum(1 for board in self.boards if self.is_human_turn(board))
+        finished = [board.winner for board in self.boards if board.winner]
+        human = self.player_color.title()
+        score = sum(1.0 if w == human else 0.5 if w == "Draw" else 0.0 for w in finished)
+        status = (f"À jouer: {to_play}/{len(self.boards)}   Moteur: {len(self.engine.in_flight)} en cours, "
+                  f"{len(self.engine.pending)} en attente   Score: {score:g}/{len(finished)}")
+        text = self.font.render(status, True, (255, 255, 255))
+        self.screen.blit(text, ((self.screen.get_width() - text.get_width()) // 2, 12))
+
+    def run(self):
+        while self.running:
+            self.scheduler.keep_active = any(board.dragging for board in self.boards)
+            for event in self.scheduler.wait_events():
+                self.handle_event(event)
+            self.play_turns()
+            self.draw()
+            pygame.display.flip()
+        self.scheduler.report()
+        pygame.quit()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simultanée contre le moteur (plusieurs plateaux)")
+    parser.add_argument('--boards', type=int, default=4, help="Nombre de plateaux")
+    parser.add_argument('--color', default='WHITE', choices=['WHITE', 'BLACK'], help="Couleur du joueur")
+    parser.add_argument('--pool-size', type=int, default=2, help="Nombre de moteurs partagés")
+    parser.add_argument('--engine', help="Identifiant du moteur (EngineManager, moteur sélectionné par défaut)")
+    parser.add_argument('--engine-path', help="Chemin direct vers un moteur UCI")
+    parser.add_argument('--engine-time', type=float, default=0.5, help="Temps par coup du moteur (s)")
+    args = parser.parse_args(argv)
+
+    engine_path = args.engine_path
+    if not engine_path:
+        try:
+            engine_path = resolve_engine_path(args.engine)
+        except Exception as e:
+            print(f"[SIMUL] {e} : le moteur joue des coups aléatoires")
+    pool = EnginePool(args.pool_size, engine_path, args.engine_time)
+    try:
+        SimulGame(args.boards, pool, args.color).run()
+    finally:
+        pool.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Tests de la remise en place du plateau : affectation, cycles cassés par un tampon, ordre optimisé
+"""
+
+import os
+import sys
+
+# Add G-Code_Controller directory to path to import modules
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "G-Code_Controller"))
+
+from board_reset import plan_reset, route_length, starting_position
+from robot_chess_controller import ChessRobotController
+
+
+def make_robot(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # robot_state.json, capture_zone.jsonl
+    robot = ChessRobotController()
+    robot.send_command = lambda command, wait_ok=True: True
+    robot.dwell = lambda seconds: None
+    return robot
+
+
+def replay(robot, order):
+    """Rejoue le plan sur l'occupation des cases : jamais de dépose sur une case occupée."""
+    occupied = set(robot.board_state) | {('slot', slot) for slot in
+                                         ((w, i) for w, i, _ in robot.capture_zone.occupied())}
+    for transfer in order:
+        source = transfer.source[1] if transfer.source[0] == 'square' else transfer.source
+        target = transfer.target[1] if transfer.target[0] == 'square' else transfer.target
+        assert target not in occupied, f"{transfer}: destination occupée"
+        occupied.remove(source)
+        occupied.add(target)
+
+
+def test_swapped_pieces_use_a_buffer_slot(tmp_path, monkeypatch):
+    robot = make_robot(tmp_path, monkeypatch)
+    board = robot.board_state
+    board['d1'], board['e1'] = board['e1'], board['d1']  # Dame et roi échangés : cycle
+
+    plan = plan_reset(robot)
+    assert len(plan.order) == 3 and any(t.target[0] == 'slot' for t in plan.order)
+    replay(robot, plan.order)
+
+    robot.reset_board()
+    assert robot.board_state == starting_position()
+    assert robot.capture_zone.count(True) == 0  # Tampon libéré
+
+
+def test_reset_after_game_is_shorter_than_square_order(tmp_path, monkeypatch):
+    robot = make_robot(tmp_path, monkeypatch)
+    for move, capture in [('e2e4', 0), ('d7d5', 0), ('e4d5', 1), ('d8d5', 1), ('b1c3', 0),
+                          ('d5a2', 1), ('a1a2', 1), ('g8f6', 0), ('f1b5', 0), ('c7c6', 0)]:
+        robot.execute_move(move, bool(capture))
+
+    plan = plan_reset(robot)
+    assert len(plan.order) == len(plan.naive) == 9 and not plan.missing
+    replay(robot, plan.order)
+    replay(robot, plan.naive)
+    assert route_length(plan.order, plan.start) < route_length(plan.naive, plan.start)
+
+    stats = robot.reset_board()
+    assert stats['duration'] <= stats['naive_duration']
+    assert robot.board_state == starting_position()
+    assert not robot.captured_pieces
+    assert robot.tool_position[:2] == plan.order[-1].target_xy
+
+
+def test_failed_reset_keeps_the_recorded_state(tmp_path, monkeypatch):
+    robot = make_robot(tmp_path, monkeypatch)
+    board = robot.board_state
+    board['d1'], board['e1'] = board['e1'], board['d1']
+    before = {square: dict(piece) for square, piece in board.items()}
+
+    robot.send_command = lambda command, wait_ok=True: False  # Commande refusée en cours de plan
+    assert not robot.reset_board()['done']
+    assert robot.board_state == before
+    assert robot.capture_zone.occupied() == [] and robot.tool_position is None
+
+
+def test_new_game_after_reset_keeps_parked_pieces(tmp_path, monkeypatch):
+    robot = make_robot(tmp_path, monkeypatch)
+    robot.board_state['d4'] = {'color': 'white', 'type': 'queen'}  # Dame de promotion en trop
+
+    assert robot.reset_board()['done']
+    assert robot.board_state == starting_position()
+    parked = robot.capture_zone.occupied()
+    assert [piece['type'] for _, _, piece in parked] == ['queen']
+
+    robot.start_new_game("g2", board_reset=True)
+    assert robot.capture_zone.occupied() == parked and robot.journal_game == "g2"
+    robot.start_new_game("g3")  # Plateau remis en place à la main
+    assert robot.capture_zone.occupied() == []
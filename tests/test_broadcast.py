@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Tests de la diffusion aux spectateurs (instantané, files bornées)
+"""
+
+import asyncio
+import os
+import sys
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from broadcast import Broadcaster
+
+
+class FakeWriter:
+    """Writer asyncio minimal ; stalled=True simule un spectateur qui ne lit plus."""
+
+    def __init__(self, stalled=False):
+        self.data = []
+        self.stalled = stalled
+
+    def write(self, data):
+        self.data.append(data)
+
+    async def drain(self):
+        if self.stalled:
+            await asyncio.Event().wait()
+
+    def is_closing(self):
+        return False
+
+
+async def fan_out():
+    moves = []
+    broadcaster = Broadcaster(max_queue=8)
+    broadcaster.channel("1", lambda: f"SNAPSHOT 1 {len(moves)}")
+
+    moves.append("e2e4")
+    broadcaster.publish("1", "MOVE 1 1 e2e4")
+    fast, slow = FakeWriter(), FakeWriter(stalled=True)
+    fast_sub = broadcaster.subscribe("1", "fast", fast)
+    slow_sub = broadcaster.subscribe("1", "slow", slow)
+
+    for seq in range(2, 101):
+        moves.append("x")
+        data = broadcaster.publish("1", f"MOVE 1 {seq} x")
+        await asyncio.sleep(0)
+
+    await asyncio.sleep(0.01)
+    # Arrivée tardive : instantané puis coups suivants, sérialisés une seule fois
+    assert fast.data[0] == b"SNAPSHOT 1 1\n"
+    assert fast.data[-1] is data
+    assert len(fast.data) == 100
+    # Le spectateur bloqué n'a pas ralenti la diffusion et sa file reste bornée
+    assert slow_sub.resyncs > 0
+    assert slow_sub.queue.qsize() <= 8
+    assert fast_sub.resyncs == 0
+
+    broadcaster.unsubscribe_all("slow")
+    assert broadcaster.spectators("1") == 1
+
+
+def test_fan_out_snapshot_and_slow_consumer():
+    asyncio.run(fan_out())
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Tests de la zone de capture : emplacement libre le plus proche, libération, journal et compaction
+"""
+
+import json
+import math
+import os
+import sys
+
+# Add G-Code_Controller directory to path to import modules
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "G-Code_Controller"))
+
+from capture_allocator import CaptureAllocator
+
+
+def slot_position(is_white, index):
+    # Deux rangées de 8 emplacements espacés de 10 mm
+    return (index % 8 * 10.0, 0.0 if is_white else 100.0) if index < 16 else (200.0, 200.0)
+
+
+def test_nearest_free_slot_and_release(tmp_path):
+    zone = CaptureAllocator(slot_position, str(tmp_path / "zone.jsonl"))
+    assert zone.allocate(True, {'type': 'pawn', 'color': 'white'}, near=(52.0, 0.0)) == 5
+    assert zone.allocate(True, {'type': 'knight', 'color': 'white'}, near=(52.0, 0.0)) == 13
+    assert zone.allocate(False, near=(0.0, 100.0)) == 0
+    assert zone.count(True) == 2 and zone.count(False) == 1
+
+    assert zone.release(True, 5) == {'type': 'pawn', 'color': 'white'}
+    assert zone.release(True, 5) is None
+    assert zone.allocate(True, near=(49.0, 0.0)) == 5
+
+    for _ in range(14):
+        zone.allocate(False)
+    assert zone.free_slots(False) == [15] and zone.allocate(False) == 15
+    assert zone.allocate(False) == 16  # Zone pleine : hors zone, comme l'ancien compteur
+
+
+def test_journal_replay_compaction_and_truncated_line(tmp_path):
+    path = tmp_path / "zone.jsonl"
+    zone = CaptureAllocator(slot_position, str(path), compact_every=8)
+    for i in range(6):
+        zone.allocate(i % 2 == 0, {'type': 'pawn', 'color': 'white' if i % 2 == 0 else 'black'})
+    zone.release(True, 1)
+    zone.release(False, 0)
+    zone.allocate(True, {'type': 'rook', 'color': 'white'}, near=(11.0, 0.0))
+    # 9 enregistrements > 8 : le journal est réduit à un instantané
+    assert len(path.read_text().splitlines()) == 1
+
+    with open(path, "a") as f:
+        f.write('{"op": "take", "white": false, "ind')  # Crash pendant l'écriture
+    replay = CaptureAllocator(slot_position, str(path), compact_every=8)
+    assert replay.load()
+    assert replay.slots == zone.slots
+    assert replay.slots[(True, 1)] == {'type': 'rook', 'color': 'white'}
+
+    replay.clear()
+    assert CaptureAllocator(slot_position, str(path)).load() and not replay.slots
+    assert json.loads(path.read_text().splitlines()[-1]) == {"op": "clear"}
+
+
+def test_controller_captures_use_nearest_slot_without_rewriting_state(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "robot_state.json").write_text(json.dumps({"white_count": 2, "black_count": 0}))
+    from gcode_program import capture_slot_position
+    from robot_chess_controller import ChessRobotController
+
+    robot = ChessRobotController()
+    assert robot.white_capture_count == 2  # Ancien format : compteurs importés
+    robot.send_command = lambda command, wait_ok=True: True
+    robot.dwell = lambda seconds: None
+
+    state_before = (tmp_path / "robot_state.json").stat().st_mtime_ns
+    robot.board_state['d5'] = {'type': 'pawn', 'color': 'black'}
+    robot.execute_move('e2d5', is_capture=True)
+    assert (tmp_path / "robot_state.json").stat().st_mtime_ns == state_before
+
+    (piece,) = [p for p in robot.captured_pieces if p['color'] == 'black']
+    target = robot.uci_to_coordinates('d5')
+    assert piece['storage_pos'] == min((capture_slot_position(robot, False, i) for i in range(16)),
+                                       key=lambda position: math.dist(target, position))
+    assert ChessRobotController().black_capture_count == 1  # Relu depuis capture_zone.jsonl
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Tests du tour de l'IA en mode PVE : recherche en arrière-plan pendant l'exécution du coup
+humain, coup aléatoire quand le moteur ne trouve rien ou qu'il n'y a pas de moteur
+"""
+
+import os
+import sys
+import threading
+
+import chess
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from headless_runner import create_headless_chess
+
+
+class GatedEngine:
+    """Moteur dont chaque recherche attend le feu vert du test."""
+
+    def __init__(self, move="e7e5"):
+        self.move = move
+        self.searched = []
+        self.release = threading.Event()
+
+    def get_best_move(self, fen):
+        self.searched.append(fen)
+        self.release.wait(5)
+        return self.move
+
+
+def pve_game(engine):
+    game = create_headless_chess()
+    game.mode = 'pve'
+    game.player_color = 'WHITE'
+    game.engine_instance = engine
+    return game
+
+
+def wait_search(game):
+    thread = game.search_thread
+    if thread is not None:
+        thread.join(5)
+
+
+def test_search_runs_while_the_human_move_is_executed():
+    engine = GatedEngine()
+    game = pve_game(engine)
+    assert game.validate_and_apply_move("e2e4")
+    game.start_engine_search()      # Lancé par play_turn_pve juste après le coup humain
+    game.start_engine_search()      # Recherche déjà en cours : pas de seconde recherche
+    assert game.stockfish_thinking and game.take_engine_move() is None
+    assert not game.play_turn_pve()  # Résultat pas encore prêt : l'IA attend sans jouer
+
+    engine.release.set()
+    wait_search(game)
+    assert game.play_turn_pve()
+    assert game.validation_board.move_stack[-1].uci() == "e7e5"
+    assert engine.searched == [chess.Board("rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq - 0 1").fen()]
+    assert not game.stockfish_thinking
+
+
+def test_no_engine_move_falls_back_to_a_random_move():
+    engine = GatedEngine(move=None)
+    engine.release.set()
+    game = pve_game(engine)
+    game.validate_and_apply_move("e2e4")
+    for _ in range(50):
+        if game.play_turn_pve():
+            break
+        wait_search(game)
+    assert len(game.validation_board.move_stack) == 2
+
+    # Sans moteur, le coup aléatoire est joué dès la première frame
+    game = pve_game(None)
+    game.validate_and_apply_move("d2d4")
+    assert game.play_turn_pve()
+    assert len(game.validation_board.move_stack) == 2
+
+
+def test_result_of_a_reset_game_is_dropped():
+    engine = GatedEngine()
+    game = pve_game(engine)
+    game.validate_and_apply_move("e2e4")
+    game.start_engine_search()
+    game.reset()
+    engine.release.set()
+    wait_search(game)
+    assert game.take_engine_move() is None
+    assert game.validation_board.move_stack == []
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Tests de la surveillance du journal (inotify et repli par interrogation)
+"""
+
+import os
+import sys
+import threading
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from file_watcher import PollingWatcher, create_watcher
+
+
+def append_move(path):
+    with open(path, "a") as f:
+        f.write("1;W;e2e4;0\n")
+
+
+def check_wakes_on_append_and_replace(watcher, path):
+    assert not watcher.wait(0.05)
+
+    threading.Timer(0.05, append_move, args=(path,)).start()
+    assert watcher.wait(2.0)
+
+    # Remplacement atomique (compaction du journal)
+    with open(path + ".tmp", "w") as f:
+        f.write("#game;g2\n")
+    os.replace(path + ".tmp", path)
+    assert watcher.wait(2.0)
+    watcher.close()
+
+
+def test_default_watcher(tmp_path):
+    path = str(tmp_path / "next_move.txt")
+    open(path, "w").close()
+    check_wakes_on_append_and_replace(create_watcher(path), path)
+
+
+def test_polling_watcher(tmp_path):
+    path = str(tmp_path / "next_move.txt")
+    open(path, "w").close()
+    check_wakes_on_append_and_replace(PollingWatcher(path), path)
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Tests du profileur d'images : temps par phase, trace glissante (CSV / JSON), session cProfile
+"""
+
+import csv
+import json
+import os
+import sys
+import time
+
+import pygame
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from frame_profiler import FrameProfiler
+
+
+def run_frames(profiler, count):
+    for _ in range(count):
+        profiler.begin_frame()
+        with profiler.phase("draw_pieces"):
+            time.sleep(0.002)
+        with profiler.phase("play_turn_pve"):
+            pass
+        with profiler.phase("draw_pieces"):  # Deux sections de même nom s'additionnent
+            time.sleep(0.002)
+        profiler.end_frame()
+
+
+def test_phases_and_trace_dump(tmp_path):
+    profiler = FrameProfiler(history=5, trace_size=8)
+    run_frames(profiler, 10)
+    assert len(profiler.frame_times) == 5 and len(profiler.trace) == 8
+
+    summary = profiler.summary()
+    assert set(summary) == {"frame", "draw_pieces", "play_turn_pve"}
+    assert summary["draw_pieces"]["avg"] >= 4.0
+    assert summary["frame"]["p50"] >= summary["draw_pieces"]["avg"] > summary["play_turn_pve"]["max"]
+
+    path = profiler.dump_trace(str(tmp_path / "trace.csv"))
+    with open(path, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 8
+    assert list(rows[0]) == ["t", "frame_ms", "draw_pieces", "play_turn_pve"]
+    assert all(float(row["frame_ms"]) >= float(row["draw_pieces"]) for row in rows)
+
+    path = profiler.dump_trace(str(tmp_path / "trace.json"))
+    with open(path) as f:
+        rows = json.load(f)
+    assert len(rows) == 8 and rows[-1]["draw_pieces"] >= 4.0
+
+
+def test_overlay_draws_without_a_window():
+    pygame.font.init()
+    try:
+        profiler = FrameProfiler()
+        run_frames(profiler, 3)
+        screen = pygame.Surface((480, 480))
+        screen.fill((255, 255, 255))
+        profiler.draw_overlay(screen)               # Masqué par défaut : rien n'est dessiné
+        assert screen.get_at((10, 470))[:3] == (255, 255, 255)
+        profiler.toggle_overlay()
+        profiler.draw_overlay(screen)               # Panneau en bas à gauche de l'écran
+        assert max(screen.get_at((10, 470))[:3]) < 128
+    finally:
+        pygame.font.quit()
+
+
+def test_cprofile_session_stops_after_its_duration(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # profile_*.prof
+    profiler = FrameProfiler()
+    profiler.start_cprofile(seconds=0.05)
+    first = profiler.profiler
+    profiler.start_cprofile(seconds=10)             # Session déjà en cours : ignoré
+    assert profiler.profiler is first
+
+    run_frames(profiler, 2)
+    time.sleep(0.06)
+    run_frames(profiler, 1)                         # end_frame arrête la session échue
+    assert profiler.profiler is None
+    assert len(list(tmp_path.glob("profile_*.prof"))) == 1
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Tests de la cadence d'affichage adaptative : attente au repos, réveil par WAKE_EVENT,
+pleine cadence pendant une interaction ou quand le jeu la demande
+"""
+
+import os
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from frame_scheduler import WAKE_EVENT, FrameScheduler
+from game_with_stockfish import Game
+
+
+def setup_module():
+    pygame.display.init()
+
+
+def teardown_module():
+    pygame.display.quit()
+
+
+def timed_wait(scheduler, idle_timeout):
+    started = time.perf_counter()
+    events = scheduler.wait_events(idle_timeout)
+    return events, time.perf_counter() - started
+
+
+def test_idle_frames_wait_for_the_timeout():
+    pygame.event.clear()
+    scheduler = FrameScheduler(active_fps=30, idle_timeout=5.0)
+    events, elapsed = timed_wait(scheduler, idle_timeout=0.1)   # Remplace la valeur par défaut
+    assert events == []
+    assert 0.08 <= elapsed < 1.0
+    assert scheduler.frames == scheduler.idle_frames == 1
+
+
+def test_wake_event_unblocks_the_idle_wait():
+    pygame.event.clear()
+    scheduler = FrameScheduler()
+    threading.Timer(0.05, FrameScheduler.wake).start()
+    events, elapsed = timed_wait(scheduler, idle_timeout=5.0)
+    assert elapsed < 1.0
+    assert all(event.type != WAKE_EVENT for event in events)  # Sert seulement à débloquer l'attente
+    assert not scheduler.is_active()                          # Un réveil n'est pas une interaction
+
+
+def test_interaction_and_keep_active_switch_to_full_frame_rate():
+    pygame.event.clear()
+    scheduler = FrameScheduler(active_fps=30, idle_timeout=5.0, active_window=0.5)
+    pygame.event.post(pygame.event.Event(pygame.MOUSEMOTION, pos=(10, 10), rel=(1, 1), buttons=(0, 0, 0)))
+    events, _ = timed_wait(scheduler, idle_timeout=None)
+    assert [event.type for event in events] == [pygame.MOUSEMOTION]
+    assert scheduler.is_active()
+
+    # Pleine cadence : tick à 30 images/s, pas d'attente de 5 s
+    events, elapsed = timed_wait(scheduler, idle_timeout=None)
+    assert elapsed < 0.5 and scheduler.idle_frames == 1
+
+    scheduler.last_activity = 0.0
+    scheduler.keep_active = True
+    events, elapsed = timed_wait(scheduler, idle_timeout=None)
+    assert elapsed < 0.5 and scheduler.idle_frames == 1
+
+
+def test_game_hooks_choose_the_frame_rate():
+    game = Game.__new__(Game)
+    game.menu_showed = True
+    game.mode = 'pve'
+    game.enable_robot = False
+    game.robot_controller = None
+    game.chess = SimpleNamespace(dragging=False)
+    assert not game.needs_full_frame_rate(None) and game.idle_timeout(None) is None
+
+    game.chess.dragging = True            # Pièce sous le curseur : pleine cadence
+    assert game.needs_full_frame_rate(None)
+    assert not game.needs_full_frame_rate("White") and game.idle_timeout("White") == 1.0
+
+    # PvP sans notification poussée : l'adversaire est surveillé à 10 Hz
+    game.mode = 'pvp'
+    game.is_my_turn = False
+    game.transport = SimpleNamespace(push=False)
+    assert game.idle_timeout(None) == 0.1
+    game.transport.push = True
+    assert game.idle_timeout(None) is None
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Tests du serveur de parties asyncio (protocole ligne, validation, pool de moteurs)
+"""
+
+import asyncio
+import os
+import sys
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine_pool import EnginePool
+from game_server import GameServer
+
+
+async def open_client(port, events):
+    """Retourne (writer, request) ; les événements MOVE/END poussés sont rangés dans events."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+
+    async def request(line):
+        writer.write((line + "\n").encode())
+        await writer.drain()
+        while True:
+            reply = (await asyncio.wait_for(reader.readline(), 5)).decode().strip()
+            if reply.split()[0] in ("MOVE", "END"):
+                events.append(reply)
+            else:
+                return reply
+
+    return writer, request
+
+
+async def fools_mate():
+    server = await GameServer(port=0).start()
+    try:
+        events = []
+        white_writer, white = await open_client(server.port, events)
+        black_writer, black = await open_client(server.port, [])
+        game_id = (await white("NEW 60 1")).split()[-1]
+        assert await white(f"JOIN {game_id} white") == f"OK JOINED {game_id} white"
+        assert (await black(f"JOIN {game_id} white")).startswith("ERR seat taken")
+        assert await black(f"JOIN {game_id} black") == f"OK JOINED {game_id} black"
+
+        assert await black(f"MOVE {game_id} e7e5") == "ERR not your turn"
+        for request, move in ((white, "f2f3"), (black, "e7e5"), (white, "g2g4"), (black, "d8h4")):
+            assert (await request(f"MOVE {game_id} {move}")).startswith("OK MOVE")
+        # Partie terminée : retirée du serveur
+        assert "unknown game" in await white(f"MOVE {game_id} a2a3")
+        # Le blanc a reçu les coups des deux camps puis la fin de partie
+        assert [e.split()[3] for e in events if e.startswith("MOVE")] == ["f2f3", "e7e5", "g2g4", "d8h4"]
+        assert events[-1] == f"END {game_id} 0-1 checkmate"
+        assert "unknown game" in await black(f"STATE {game_id}")
+        assert await black("LIST") == "GAMES"
+        for writer in (white_writer, black_writer):
+            writer.close()
+    finally:
+        await server.close()
+
+
+async def engine_game():
+    pool = EnginePool(2)
+    server = await GameServer(port=0, engine_pool=pool).start()
+    try:
+        events = []
+        writer, request = await open_client(server.port, events)
+        game_id = (await request("NEW")).split()[-1]
+        await request(f"JOIN {game_id} white")
+        assert await request(f"ENGINE {game_id} black") == f"OK ENGINE {game_id} black"
+        assert await request(f"MOVE {game_id} e2e4") == f"OK MOVE {game_id} 1"
+        # La réponse du moteur est poussée comme événement
+        for _ in range(50):
+            state = await request(f"STATE {game_id}")
+            if " w " in state:
+                break
+            await asyncio.sleep(0.02)
+        assert " w " in state
+        assert events[1].split()[:3] == ["MOVE", game_id, "2"]
+        writer.close()
+    finally:
+        await server.close()
+        pool.close()
+
+
+async def bad_requests():
+    server = await GameServer(port=0).start()
+    try:
+        writer, request = await open_client(server.port, [])
+        assert await request("NEW 60 1 5") == "ERR bad arguments for NEW"
+        assert await request("STATE") == "ERR bad arguments for STATE"
+        # Une erreur dans la commande elle-même n'est pas imputée au client
+        server.cmd_list = lambda conn: len(None)
+        assert await request("LIST") == "ERR internal error"
+        assert (await request("NEW")).startswith("OK GAME")
+        writer.close()
+    finally:
+        await server.close()
+
+
+def test_two_clients_play_to_checkmate():
+    asyncio.run(fools_mate())
+
+
+def test_engine_seat_answers_moves():
+    asyncio.run(engine_game())
+
+
+def test_bad_arguments_and_internal_errors():
+    asyncio.run(bad_requests())
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Tests de l'instantané de partie et de la reprise après un crash
+"""
+
+import os
+import sys
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_snapshot import GameSnapshot
+from headless_runner import create_headless_chess
+
+MOVES = ["e2e4", "d7d5", "e4d5", "d8d5", "b1c3", "d5a5", "d2d4", "c7c6"]
+
+
+def test_snapshot_restores_board_and_captures(tmp_path):
+    path = str(tmp_path / "game_snapshot.jsonl")
+    game = create_headless_chess()
+    snapshot = GameSnapshot(path)
+    snapshot.start("g1", "pve", "WHITE", {"engine": "stockfish_latest", "elo": 1500})
+    for i, move in enumerate(MOVES):
+        game.validate_and_apply_move(move)
+        snapshot.record_moves(game.validation_board.move_stack, {"WHITE": i, "BLACK": 0.0})
+
+    # Crash pendant l'écriture du coup suivant : ligne tronquée
+    with open(path, "a") as f:
+        f.write('{"type": "move", "seq": 9, "uc')
+
+    restored_snapshot = GameSnapshot(path)
+    state = restored_snapshot.resumable("pve", "WHITE")
+    assert state["moves"] == MOVES
+    assert state["clocks"] == {"WHITE": 7, "BLACK": 0.0}
+    assert state["header"]["bot"]["elo"] == 1500
+    assert restored_snapshot.resumable("pve", "BLACK") is None
+
+    restored = create_headless_chess()
+    assert restored.restore_moves(state["moves"], state["header"]["game_id"])
+    assert restored.validation_board.fen() == game.validation_board.fen()
+    assert restored.piece_location == game.piece_location
+    assert restored.black_captured == game.black_captured == ["white_pawn"]
+    assert restored.white_captured == game.white_captured == ["black_pawn"]
+
+    # Les coups suivants s'ajoutent après la ligne tronquée, puis la partie se termine
+    restored.validate_and_apply_move("g1f3")
+    restored_snapshot.record_moves(restored.validation_board.move_stack, {"WHITE": 8, "BLACK": 1})
+    restored_snapshot.finish("Draw")
+    state = GameSnapshot(path).load()
+    assert state["moves"][-1] == "g1f3" and state["finished"]
+    assert GameSnapshot(path).resumable("pve", "WHITE") is None
+
+
+def test_resume_reselects_the_saved_engine(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # selected_engine.txt, engine_settings.json
+    import engine_manager
+    from game_with_stockfish import Game
+
+    installed = {"stockfish_16": str(tmp_path / "stockfish")}
+    (tmp_path / "stockfish").write_text("")
+    monkeypatch.setattr(engine_manager.EngineManager, "get_engine_path",
+                        lambda self, engine_id: installed.get(engine_id))
+    (tmp_path / "selected_engine.txt").write_text("stockfish_latest")
+
+    game = Game.__new__(Game)
+    game.apply_saved_bot({"engine": "stockfish_16", "elo": 1800})
+    assert game.current_bot() == {"engine": "stockfish_16", "elo": 1800}
+
+    # Moteur sauvegardé absent : le moteur sélectionné ne change pas
+    game.apply_saved_bot({"engine": "komodo", "elo": 2000})
+    assert (tmp_path / "selected_engine.txt").read_text() == "stockfish_16"
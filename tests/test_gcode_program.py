@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Tests des programmes G-code précompilés (cache par type de coup, rechargement de la configuration)
+"""
+
+import os
+import shutil
+import sys
+
+# Add G-Code_Controller directory to path to import modules
+CONTROLLER_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "G-Code_Controller")
+sys.path.insert(0, CONTROLLER_DIR)
+
+from gcode_program import CAPTURE, CASTLING, EN_PASSANT, MOVE, capture_slot_position
+from robot_chess_controller import ChessRobotController
+
+
+def make_robot(tmp_path, monkeypatch):
+    # robot_state.json est lu et écrit dans le dossier courant
+    monkeypatch.chdir(tmp_path)
+    config_file = tmp_path / "robot_config.ini"
+    shutil.copy(os.path.join(CONTROLLER_DIR, "robot_config.ini"), config_file)
+    return ChessRobotController(config_file=str(config_file)), config_file
+
+
+def test_programs_are_cached_per_move_and_slot(tmp_path, monkeypatch):
+    robot, _ = make_robot(tmp_path, monkeypatch)
+    compiler = robot.compiler
+
+    move = compiler.compile('e2', 'e4')
+    assert compiler.compile('e2', 'e4') is move
+    assert compiler.cache_info().hits == 1
+    # Prise et dépose : XY, descente, prise, remontée, XY, descente, dépose, Z_SAFE
+    assert [step.kind for step in move.steps] == ['xy', 'z', 'action', 'z', 'xy', 'z', 'action', 'z']
+    assert move.lines[0].startswith("G0 X") and move.duration > 0
+
+    capture = compiler.compile('e4', 'd5', CAPTURE, (False, 3))
+    assert len(capture.steps) == 2 * len(move.steps)
+    assert (capture.steps[4].x, capture.steps[4].y) == capture_slot_position(robot, False, 3)
+    assert compiler.compile('e4', 'd5', CAPTURE, (False, 4)) is not capture
+
+    en_passant = compiler.compile('e5', 'd6', EN_PASSANT, (False, 0))
+    assert (en_passant.steps[0].x, en_passant.steps[0].y) == robot.uci_to_coordinates('d5')
+    assert len(compiler.compile('e1', 'g1', CASTLING).steps) == 2 * len(move.steps)
+
+    diff = move.diff(compiler.compile('e2', 'e3'))
+    assert any(line.startswith('+G0') for line in diff)
+
+
+def test_config_change_recompiles(tmp_path, monkeypatch):
+    robot, config_file = make_robot(tmp_path, monkeypatch)
+    before = robot.compiler.compile('a1', 'a2', MOVE)
+
+    text = config_file.read_text().replace(f"square_size = {robot.SQUARE_SIZE:g}", "square_size = 40.0")
+    config_file.write_text(text)
+    after = robot.compiler.compile('a1', 'a2', MOVE)
+    assert robot.SQUARE_SIZE == 40.0 and robot.compiler.reloads == 1
+    assert after is not before and after.lines != before.lines
+
+
+def test_execute_move_streams_program_from_tool_position(tmp_path, monkeypatch):
+    robot, _ = make_robot(tmp_path, monkeypatch)
+    sent = []
+    robot.send_command = lambda command, wait_ok=True: sent.append(command) or True
+    robot.dwell = lambda seconds: None
+    robot.tool_position = (*robot.uci_to_coordinates('e2'), robot.Z_SAFE)
+
+    robot.execute_move('e2e4')
+    program = robot.compiler.compile('e2', 'e4')
+    # Déjà au-dessus de e2 : le premier XY du programme est supprimé
+    assert [line for line in sent if line in program.lines] == program.lines[1:]
+    assert robot.tool_position == (*robot.uci_to_coordinates('e4'), robot.Z_SAFE)
+    assert 'e4' in robot.board_state and 'e2' not in robot.board_state
+
+
+def test_only_a_pawn_can_capture_en_passant(tmp_path, monkeypatch):
+    robot, _ = make_robot(tmp_path, monkeypatch)
+    # Cavalier g1 -> f3 : diagonale vers une case vide, fou en f1 sur le rang de départ
+    assert robot.is_en_passant('g1f3') is None
+    assert robot.move_kind('g1f3', False) == MOVE
+
+    board = robot.board_state
+    board['e5'] = board.pop('e2')
+    board['d5'] = board.pop('d7')   # d7d5 vient d'être joué
+    assert robot.is_en_passant('e5d6') == 'd5'
+    assert robot.move_kind('e5d6', True) == EN_PASSANT
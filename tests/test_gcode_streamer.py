@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Tests de l'envoi de G-code en flux (crédit d'ok Marlin, comptage de caractères GRBL)
+"""
+
+import os
+import queue
+import sys
+import threading
+import time
+
+# Add G-Code_Controller directory to path to import modules
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "G-Code_Controller"))
+
+from gcode_streamer import GCodeStreamer
+
+
+class FakeFirmware:
+    """Port série simulé : exécute une ligne toutes les `step` secondes et répond ok."""
+
+    def __init__(self, step=0.002, reject=()):
+        self.step = step
+        self.reject = reject
+        self.received = queue.Queue()
+        self.replies = queue.Queue()
+        self.pending_bytes = 0
+        self.pending_lines = 0
+        self.max_bytes = 0
+        self.max_lines = 0
+        self.lock = threading.Lock()
+        threading.Thread(target=self.run, daemon=True).start()
+
+    def write(self, data):
+        with self.lock:
+            self.pending_bytes += len(data)
+            self.pending_lines += 1
+            self.max_bytes = max(self.max_bytes, self.pending_bytes)
+            self.max_lines = max(self.max_lines, self.pending_lines)
+        self.received.put(data.decode().strip())
+
+    def run(self):
+        while True:
+            line = self.received.get()
+            time.sleep(self.step)
+            with self.lock:
+                self.pending_bytes -= len(line) + 1
+                self.pending_lines -= 1
+            self.replies.put(b"error:20\n" if line in self.reject else b"ok\n")
+
+    def readline(self):
+        try:
+            return self.replies.get(timeout=0.05)
+        except queue.Empty:
+            return b""
+
+
+def stream(streamer, lines):
+    commands = [streamer.send(line) for line in lines]
+    assert streamer.flush(timeout=5.0)
+    return commands
+
+
+def test_marlin_keeps_window_full_without_overflow():
+    firmware = FakeFirmware()
+    streamer = GCodeStreamer(firmware, 'marlin', window=4).start()
+    commands = stream(streamer, [f"G0 X{i} Y{i}" for i in range(40)])
+    streamer.close()
+    assert firmware.max_lines == 4
+    assert all(c.ok and c.rtt is not None for c in commands)
+    assert len(streamer.rtts) == 40
+
+
+def test_grbl_counts_characters_and_reports_errors():
+    firmware = FakeFirmware(reject=("G0 X5.00 Y5.00",))
+    streamer = GCodeStreamer(firmware, 'grbl', rx_buffer=64).start()
+    commands = stream(streamer, [f"G0 X{i}.00 Y{i}.00" for i in range(20)])
+    streamer.close()
+    assert firmware.max_bytes <= 64 and firmware.max_lines > 1
+    assert [c.ok for c in commands].count(False) == 1
+    assert commands[5].error == "error:20"
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Tests du mode sans affichage : parties complètes avec la logique de tour de Chess
+"""
+
+import os
+import sys
+
+import chess
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from headless_runner import RandomPlayer, create_headless_chess, play_game
+
+NAMES = {chess.PAWN: "pawn", chess.KNIGHT: "knight", chess.BISHOP: "bishop",
+         chess.ROOK: "rook", chess.QUEEN: "queen", chess.KING: "king"}
+
+
+def internal_board_matches(game):
+    """Compare la représentation interne (piece_location) au plateau python-chess"""
+    for square in chess.SQUARES:
+        piece = game.validation_board.piece_at(square)
+        expected = ""
+        if piece:
+            expected = f"{'white' if piece.color else 'black'}_{NAMES[piece.piece_type]}"
+        file_char, rank = chess.square_name(square)[0], int(chess.square_name(square)[1])
+        if game.piece_location[file_char][rank][0] != expected:
+            return False
+    return True
+
+
+def test_random_games_stay_consistent():
+    """Des parties aléatoires se terminent et gardent le plateau interne synchronisé"""
+    game = create_headless_chess()
+    assert game.BESTMOVE_FILE is None
+
+    for seed in range(3):
+        result = play_game(game, RandomPlayer(seed), RandomPlayer(seed + 100), max_plies=200)
+        assert result['result'] in ('1-0', '0-1', '1/2-1/2')
+        assert result['plies'] == len(result['moves']) <= 200
+        assert internal_board_matches(game)
+
+
+def test_set_position_takes_turn_and_captures_from_the_fen():
+    """Une position de départ arbitraire donne le trait et les pièces prises"""
+    game = create_headless_chess()
+    game.validate_and_apply_move("e2e4")
+    game.validate_and_apply_move("d7d5")
+    game.validate_and_apply_move("e4d5")   # Prise laissée par la partie précédente
+
+    # Noirs au trait ; les noirs n'ont plus de dame, les blancs plus d'un cavalier ni de pion
+    game.set_position("rnb1kbnr/pppppppp/8/8/8/8/PPPP1PPP/R1BQKBNR b KQkq - 0 1")
+    assert game.turn == {"black": 1, "white": 0}
+    assert game.white_captured == ["black_queen"]
+    assert sorted(game.black_captured) == ["white_knight", "white_pawn"]
+    assert internal_board_matches(game) and not game.winner
+
+    game.validate_and_apply_move("e7e5")
+    assert game.turn == {"black": 0, "white": 1}
+
+
+if __name__ == "__main__":
+    test_random_games_stay_consistent()
+    print("SUCCES: parties sans affichage")
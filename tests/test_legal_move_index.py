@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Tests de l'index des coups légaux (sélection et validation des coups)
+"""
+
+import os
+import sys
+
+import chess
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from legal_move_index import LegalMoveIndex
+
+
+def test_index_matches_legal_moves():
+    """L'index contient exactement les coups légaux de la position"""
+    board = chess.Board("r3k2r/pPppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1")
+    index = LegalMoveIndex(board)
+
+    assert len(index) == board.legal_moves.count()
+    for move in board.legal_moves:
+        assert index.is_legal(move)
+        assert index.targets(move.from_square) & chess.BB_SQUARES[move.to_square]
+        assert index.target_mask & chess.BB_SQUARES[move.to_square]
+
+
+def test_find_move_handles_promotion_and_illegal_targets():
+    """find_move choisit la dame en promotion et refuse les cases non atteignables"""
+    board = chess.Board("8/P7/8/8/8/8/8/k6K w - - 0 1")
+    index = LegalMoveIndex(board)
+
+    move = index.find_move(chess.A7, chess.A8)
+    assert move == chess.Move.from_uci("a7a8q")
+    assert index.find_move(chess.A7, chess.B8) is None
+    assert not index.is_legal(chess.Move.from_uci("h1h3"))
+
+
+if __name__ == "__main__":
+    test_index_matches_legal_moves()
+    test_find_move_handles_promotion_and_illegal_targets()
+    print("SUCCES: index des coups légaux")
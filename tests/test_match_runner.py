@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Tests du lanceur de matchs (ouvertures, parties depuis une position, estimation d'Elo)
+"""
+
+import os
+import sys
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from match_runner import elo_estimate, load_openings, play_match_game, resolve_player
+
+
+def test_elo_estimate_is_centered_with_error_bars():
+    elo, low, high = elo_estimate(50, 0, 50)
+    assert abs(elo) < 1e-6 and low < 0 < high
+    elo, low, high = elo_estimate(75, 0, 25)
+    assert 180 < elo < 200  # Score de 75% : environ +191
+    assert low < elo < high
+
+
+def test_openings_from_pgn_and_epd_play_in_workers(tmp_path):
+    pgn = tmp_path / "openings.pgn"
+    pgn.write_text('[Event "a"]\n\n1. e4 e5 2. Nf3 *\n\n[Event "b"]\n\n1. d4 d5 *\n')
+    epd = tmp_path / "openings.epd"
+    epd.write_text('4k3/8/8/8/8/8/4P3/4K2R w K - id "finale";\n')
+    assert load_openings(str(pgn)) == [(None, ["e2e4", "e7e5", "g1f3"]), (None, ["d2d4", "d7d5"])]
+    [(fen, moves)] = load_openings(str(epd))
+    assert fen.startswith("4k3/8/8/8/8/8/4P3/4K2R w K") and moves == []
+
+    random_player = resolve_player("random")
+    result = play_match_game({"index": 0, "white": random_player, "black": random_player, "start_fen": fen,
+                              "opening_moves": ["e1g1"], "engine_time": 0.01, "max_plies": 40, "seed": 1})
+    assert result["moves"][0] == "e1g1"
+    assert result["result"] in ("1-0", "0-1", "1/2-1/2")
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Tests du constructeur de séquences de mouvements (suppression des mouvements inutiles)
+"""
+
+import os
+import sys
+
+# Add G-Code_Controller directory to path to import modules
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "G-Code_Controller"))
+
+from motion_sequence import MotionSequence
+
+Z_SAFE, Z_GRAB, Z_LIFT = 50.0, 5.0, 30.0
+
+
+def pick_and_place(sequence, source, target):
+    """Même suite d'appels que ChessRobotController.execute_move."""
+    sequence.move_to(*source, Z_SAFE, 10000)
+    sequence.move_to(*source, Z_GRAB, 1500)
+    sequence.action("M3 S1000", 0.5)
+    sequence.move_to(*source, Z_LIFT, 1500)
+    sequence.move_to(*target, Z_LIFT, 10000)
+    sequence.move_to(*target, Z_GRAB, 1500)
+    sequence.action("M5", 0.5)
+    sequence.move_to(*target, Z_SAFE, 1500)
+
+
+def test_pick_and_place_drops_repeated_xy_and_merges_z():
+    sequence = MotionSequence(position=(0.0, 0.0, Z_SAFE))
+    pick_and_place(sequence, (100.0, 100.0), (200.0, 100.0))
+    program = sequence.program(lambda z: f"G0 Z{z:.2f}")
+    assert program == ["G0 X100.00 Y100.00 F10000", "G0 Z5.00", "M3 S1000", "G0 Z30.00",
+                       "G0 X200.00 Y100.00 F10000", "G0 Z5.00", "M5", "G0 Z50.00"]
+    assert sequence.requested == 14
+    assert sequence.position == (200.0, 100.0, Z_SAFE)
+
+    # Coup suivant : l'outil est déjà à Z_SAFE, seule la descente reste
+    follow = MotionSequence(sequence.position)
+    pick_and_place(follow, (300.0, 100.0), (300.0, 200.0))
+    assert follow.counts() == {'xy': 2, 'z': 4, 'action': 2}
+
+
+def test_merged_z_returning_to_start_height_is_dropped():
+    sequence = MotionSequence(position=(10.0, 10.0, Z_SAFE))
+    sequence.move_to(10.0, 10.0, Z_GRAB)
+    sequence.move_to(10.0, 10.0, Z_SAFE)
+    assert sequence.steps == []
+
+    # Servo : deux hauteurs au-dessus de Z_GRAB sont la même position
+    servo = MotionSequence(position=(10.0, 10.0, Z_SAFE), z_key=lambda z: z <= Z_GRAB)
+    servo.move_to(10.0, 10.0, Z_LIFT)
+    assert servo.steps == []
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Tests des modèles de durée : attente des servos, rampes trapézoïdales, watchdog du coup en cours
+"""
+
+import os
+import sys
+import time
+
+# Add G-Code_Controller directory to path to import modules
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "G-Code_Controller"))
+
+from calibration_ramps import update_config_section
+from motion_timing import MoveWatchdog, ServoDwellModel, TrapezoidProfile, parse_servo_command
+
+
+def test_servo_dwell_follows_travel_with_floor():
+    model = ServoDwellModel(sec_per_60deg=0.12, margin=0.05, floor=0.1)
+    assert parse_servo_command("M280 P0 S168") == (0, 168.0)
+    assert parse_servo_command("G0 Z5 F3000") is None
+
+    # Position de départ inconnue : course complète
+    assert abs(model.dwell_for_command("M280 P0 S12") - (0.05 + 3 * 0.12)) < 1e-9
+    assert abs(model.dwell_for_command("M280 P0 S168") - (0.05 + 156 / 60 * 0.12)) < 1e-9
+    # Déjà en place : pas d'attente ; petit mouvement : plancher
+    assert model.dwell_for_command("M280 P0 S168") == 0.0
+    assert model.dwell_for_command("M280 P0 S170") == 0.1
+    # Chaque broche a sa propre position
+    assert model.dwell(1, 90) == model.dwell(2, 90)
+
+
+def test_trapezoid_profile_ramps_and_triangles():
+    profile = TrapezoidProfile(accel=1000.0)
+    # 6000 mm/min = 100 mm/s : 0.1 s et 5 mm par rampe, 90 mm de palier
+    assert abs(profile.move_time(100.0, 6000) - (0.2 + 0.9)) < 1e-9
+    # 4 mm : vitesse de pointe sqrt(1000 * 4) = 63 mm/s, jamais la vitesse d'avance
+    assert abs(profile.move_time(4.0, 6000) - 2 * (4000 ** 0.5) / 1000) < 1e-9
+    # Le jerk raccourcit les rampes ; la distance nulle ne coûte rien
+    assert TrapezoidProfile(1000.0, jerk=10.0).move_time(100.0, 6000) < profile.move_time(100.0, 6000)
+    assert profile.move_time(0.0, 6000) == 0.0
+
+
+def test_watchdog_adapts_timeout_and_detects_stall():
+    watchdog = MoveWatchdog(factor=2.0, margin=0.0)
+    assert watchdog.progress() is None and watchdog.time_left(30.0) == 30.0
+    watchdog.start(0.01, "capture")
+    assert 0.0 <= watchdog.progress() <= 0.99 and watchdog.time_left(30.0) <= 0.02
+    time.sleep(0.03)
+    assert watchdog.stalled() and watchdog.progress() == 0.99
+    label, predicted, actual = watchdog.finish()
+    assert (label, predicted) == ("capture", 0.01) and actual >= 0.03
+    assert not watchdog.stalled()
+
+
+def test_tuned_ramps_are_written_to_config(tmp_path):
+    config = tmp_path / "robot_config.ini"
+    config.write_text("[SPEEDS]\n# commentaire\nfeed_rate_travel = 10000\n\n[KINEMATICS]\naccel = 1000\n\n[ADVANCED]\nverbose = true\n")
+    update_config_section(str(config), "KINEMATICS", {"accel": 1600, "jerk": 10})
+    update_config_section(str(config), "NEW", {"key": 1})
+    assert config.read_text() == ("[SPEEDS]\n# commentaire\nfeed_rate_travel = 10000\n\n[KINEMATICS]\naccel = 1600\njerk = 10\n"
+                                  "\n[ADVANCED]\nverbose = true\n\n[NEW]\nkey = 1\n")
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Tests de la saisie souris : événements pygame -> actions discrètes (press / release),
+clic-clic, glisser-déposer et annulation d'une sélection
+"""
+
+import os
+import sys
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+from pygame.locals import MOUSEBUTTONDOWN, MOUSEBUTTONUP, MOUSEMOTION
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from headless_runner import create_headless_chess
+from utils import Utils
+
+SQUARE = 60
+
+
+def setup_module():
+    pygame.display.init()
+
+
+def teardown_module():
+    pygame.display.quit()
+
+
+def center(square):
+    """Centre d'une case à l'écran (plateau non retourné, a8 en haut à gauche)."""
+    return (ord(square[0]) - 97) * SQUARE + SQUARE // 2, (8 - int(square[1])) * SQUARE + SQUARE // 2
+
+
+def post(*events):
+    """Poste des événements souris synthétiques et retourne ceux lus dans la file pygame."""
+    pygame.event.clear()
+    for kind, square, button in events:
+        if kind == MOUSEMOTION:
+            pygame.event.post(pygame.event.Event(kind, pos=center(square), rel=(0, 0), buttons=(1, 0, 0)))
+        else:
+            pygame.event.post(pygame.event.Event(kind, pos=center(square), button=button))
+    return pygame.event.get()
+
+
+def new_game():
+    game = create_headless_chess()
+    game.board_locations = [[[c * SQUARE, r * SQUARE] for r in range(8)] for c in range(8)]
+    game.square_length = SQUARE
+    return game
+
+
+def play(game, *events):
+    for event in post(*events):
+        game.handle_event(event)
+    return game.handle_human_move("white", is_flipped=False)
+
+
+def test_only_left_button_transitions_become_actions():
+    utils = Utils()
+    consumed = [utils.handle_event(event) for event in post((MOUSEBUTTONDOWN, "e2", 1),
+                                                            (MOUSEMOTION, "e3", None),
+                                                            (MOUSEBUTTONDOWN, "e3", 3),
+                                                            (MOUSEBUTTONUP, "e4", 1))]
+    assert consumed == [True, False, False, True]
+    assert utils.get_action() == ("press", center("e2"))
+    assert utils.get_action() == ("release", center("e4"))
+    assert utils.get_action() is None
+
+    utils.handle_event(post((MOUSEBUTTONDOWN, "a1", 1))[0])
+    utils.clear_actions()
+    assert utils.get_action() is None
+
+
+def test_click_click_move():
+    game = new_game()
+    # Premier clic : sélection, la pièce reste sélectionnée au relâchement sur sa case
+    assert not play(game, (MOUSEBUTTONDOWN, "g1", 1), (MOUSEBUTTONUP, "g1", 1))
+    assert game.selected_square == ("g", 1) and not game.dragging
+    assert sorted(move.uci() for move in game.moves) == ["g1f3", "g1h3"]
+    # Second clic sur une cible légale : coup joué
+    assert play(game, (MOUSEBUTTONDOWN, "f3", 1), (MOUSEBUTTONUP, "f3", 1))
+    assert game.validation_board.move_stack[-1].uci() == "g1f3"
+    assert game.piece_location["f"][3][0] == "white_knight"
+    assert game.utils.get_action() is None  # Fin du geste consommée avec le coup
+
+
+def test_drag_and_drop_move():
+    game = new_game()
+    assert play(game, (MOUSEBUTTONDOWN, "e2", 1), (MOUSEMOTION, "e3", None),
+                (MOUSEMOTION, "e4", None), (MOUSEBUTTONUP, "e4", 1))
+    assert game.validation_board.move_stack[-1].uci() == "e2e4"
+    assert game.selected_square is None and not game.dragging
+
+
+def test_drop_on_illegal_square_cancels_the_selection():
+    game = new_game()
+    assert not play(game, (MOUSEBUTTONDOWN, "e2", 1), (MOUSEMOTION, "e5", None), (MOUSEBUTTONUP, "e5", 1))
+    assert game.selected_square is None and game.moves_mask == 0
+    assert game.validation_board.move_stack == []
+    assert game.piece_location["e"][2][0] == "white_pawn"
+
+    # Relâché hors du plateau : sélection conservée, aucun coup
+    game.select_square("d", 2)
+    game.dragging = True
+    game.utils.actions.put(("release", (9 * SQUARE, 9 * SQUARE)))
+    assert not game.handle_human_move("white", is_flipped=False)
+    assert game.selected_square == ("d", 2) and not game.dragging
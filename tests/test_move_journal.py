@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Tests du journal des coups en ajout seul (next_move.txt)
+"""
+
+import os
+import sys
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from move_journal import MoveJournal, JournalReader, read_journal
+
+
+def test_reader_gets_every_move_including_repeats(tmp_path):
+    """Un lecteur lent récupère tous les coups, y compris deux coups identiques"""
+    path = str(tmp_path / "next_move.txt")
+    journal = MoveJournal(path)
+    journal.start_game("g1")
+    reader = JournalReader(path)
+
+    journal.append(1, "W", "g1f3", "0")
+    journal.append(2, "B", "g8f6", "0")
+    journal.append(3, "W", "f3g1", "0")
+    journal.append(4, "B", "f6g8", "0")
+    journal.append(5, "W", "g1f3", "0")
+    assert [e.seq for e in reader.read_new()] == [1, 2, 3, 4, 5]
+    assert reader.read_new() == []
+
+
+def test_partial_line_and_compaction(tmp_path):
+    """Une ligne incomplète attend la fin de l'écriture ; la compaction ne rejoue rien"""
+    path = str(tmp_path / "next_move.txt")
+    journal = MoveJournal(path)
+    journal.start_game("old")
+    journal.append(1, "W", "e2e4", "0")
+    journal.start_game("g2")
+    reader = JournalReader(path)
+
+    with open(path, "a") as f:
+        f.write("1;W;d2d4")
+    assert reader.read_new() == []
+    with open(path, "a") as f:
+        f.write(";0\n")
+    entries = reader.read_new()
+    assert [(e.game_id, e.move) for e in entries] == [("g2", "d2d4")]
+
+    journal.append(2, "B", "d7d5", "0")
+    journal.compact()
+    assert [e.move for e in reader.read_new()] == ["d7d5"]
+    assert [e.move for e in read_journal(path)] == ["d2d4", "d7d5"]
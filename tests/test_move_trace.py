@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Tests des traces du cycle de vie des coups (move_trace)
+"""
+
+import os
+import sys
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import move_trace
+from move_trace import Tracer, load, report
+
+
+def test_spans_share_move_id_and_report(tmp_path, capsys):
+    path = str(tmp_path / "trace.jsonl")
+    tracer = Tracer(path)
+    mid = move_trace.move_id("g1", 3)
+
+    with tracer.span("validate", mid):
+        pass
+    tracer.event("journal_read", mid)
+    # Les commandes G-code sont rattachées au coup courant sans id explicite
+    with tracer.move(mid), tracer.span("robot_execute"):
+        with tracer.span("gcode", cmd="G1 X10"):
+            pass
+    tracer.file.close()
+
+    records = load(path)
+    assert [r["stage"] for r in records] == ["validate", "journal_read", "gcode", "robot_execute"]
+    assert {r["move_id"] for r in records} == {"g1-3"}
+    assert records[2]["attrs"] == {"cmd": "G1 X10"}
+
+    report(path)
+    out = capsys.readouterr().out
+    assert "1 coups" in out
+    assert "validate -> journal_read" in out
+
+
+def test_disabled_tracer_writes_nothing(tmp_path):
+    tracer = Tracer(None)
+    with tracer.span("validate", "g-1"):
+        pass
+    tracer.event("robot_done", "g-1")
+    assert tracer.file is None
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Tests du transport des coups PvP : aller-retour par socket, reconnexion d'un adversaire
+redémarré, repli sur le journal next_move.txt
+"""
+
+import os
+import socket
+import sys
+import threading
+import time
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from move_journal import MoveJournal
+from move_transport import FileMoveTransport, SocketMoveTransport
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def receive(transport, timeout=5.0):
+    moves = []
+    wait_until(lambda: moves.extend(transport.poll()) or moves, timeout)
+    return moves
+
+
+def test_socket_round_trip_is_acknowledged():
+    port = free_port()
+    received = threading.Event()
+    white = SocketMoveTransport('WHITE', port=port, on_receive=received.set, retry_delay=0.05)
+    black = SocketMoveTransport('BLACK', port=port, retry_delay=0.05)
+    try:
+        assert wait_until(lambda: white.conn is not None and black.conn is not None)
+        black.send_move("B", "e7e5", "0")
+        assert received.wait(5)
+        assert white.poll() == [("B", "e7e5", "0")]
+        assert wait_until(lambda: not black.pending) and black.ack_rtts
+
+        white.send_move("W", "g1f3", "0")
+        assert receive(black) == [("W", "g1f3", "0")]
+    finally:
+        black.close()
+        white.close()
+
+
+def test_restarted_peer_starts_a_new_session():
+    port = free_port()
+    white = SocketMoveTransport('WHITE', port=port, retry_delay=0.05)
+    black = SocketMoveTransport('BLACK', port=port, retry_delay=0.05)
+    try:
+        black.send_move("B", "e7e5", "0")
+        assert receive(white) == [("B", "e7e5", "0")]
+        black.close()
+
+        # Même numérotation (seq 1), nouvelle session : le coup n'est pas pris pour un doublon
+        black = SocketMoveTransport('BLACK', port=port, retry_delay=0.05)
+        black.send_move("B", "d7d5", "0")
+        assert receive(white) == [("B", "d7d5", "0")]
+    finally:
+        black.close()
+        white.close()
+
+
+def test_resent_frame_of_the_same_session_is_dropped():
+    white = SocketMoveTransport('WHITE', port=free_port())
+    try:
+        frame = b'{"type": "move", "session": "s1", "seq": 1, "player": "B", "move": "e7e5", "capture": "0"}'
+        white.handle_frame(frame)
+        white.handle_frame(frame)   # Renvoi après reconnexion
+        assert white.poll() == [("B", "e7e5", "0")]
+    finally:
+        white.close()
+
+
+def test_poll_reads_the_journal_while_disconnected(tmp_path):
+    path = str(tmp_path / "next_move.txt")
+    journal = MoveJournal(path)
+    journal.start_game("g1")
+    white = SocketMoveTransport('WHITE', port=free_port(), fallback=FileMoveTransport('WHITE', path))
+    try:
+        # Adversaire replié sur le fichier : aucune connexion, le coup arrive par le journal
+        journal.append(1, "B", "c7c5", "1")
+        assert white.poll() == [("B", "c7c5", "1")]
+        assert white.poll() == []
+    finally:
+        white.close()
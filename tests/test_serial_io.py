@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Tests du lecteur série : classement des lignes, acquittements par Future, messages spontanés,
+connexion rapide (bannière, sonde M115 / $I, cache du firmware)
+"""
+
+import json
+import os
+import sys
+import time
+
+import serial
+
+# Add G-Code_Controller directory to path to import modules
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "G-Code_Controller"))
+
+from serial_io import (BUSY, ECHO, ENDSTOP, ERROR, INFO, OK, POSITION, SETTING, STATUS, TEMPERATURE,
+                       SerialIO, classify_line, open_firmware)
+from virtual_firmware import VirtualFirmware
+
+
+def test_classify_line_only_matches_prefixes():
+    assert classify_line("ok") == OK
+    assert classify_line("ok T:21.3 /0.0") == OK
+    assert classify_line("echo:busy: processing") == BUSY
+    assert classify_line("echo:SD card ok") == ECHO          # 'ok' dans le texte : pas un acquittement
+    assert classify_line("x_min: open") == ENDSTOP
+    assert classify_line("T:25.00 /0.00 B:25.00 /0.00 @:0") == TEMPERATURE
+    assert classify_line("X:10.00 Y:5.00 Z:0.00 E:0.00 Count X:800") == POSITION
+    assert classify_line("<Idle|MPos:0.000,0.000,0.000|FS:0,0>") == STATUS
+    assert classify_line("$120=1000.000") == SETTING
+    assert classify_line("FIRMWARE_NAME:Marlin 2.1") == INFO
+    assert classify_line("Error:Printer halted. kill() called!") == ERROR
+
+
+def test_acks_resolve_futures_and_async_messages_are_published():
+    with VirtualFirmware('marlin', time_scale=0.02, busy_interval=0.5) as firmware:
+        port = serial.Serial(firmware.port, timeout=0.1)
+        io = SerialIO(port).start()
+        messages = []
+        io.subscribe(lambda kind, line: messages.append(kind), (BUSY, TEMPERATURE))
+
+        assert io.request("M155 S1", timeout=2).ok
+        move = io.send("G0 X200 Y200 F600")      # ~28 s simulées : busy et températures pendant M400
+        wait = io.request("M400", timeout=5)
+        assert move.future.done() and wait.ok and wait.lines == []
+
+        position = io.request("M114", timeout=2)
+        assert position.lines[0].startswith("X:200.00 Y:200.00")
+        rejected = io.request("M42", timeout=2)
+        assert rejected.ok and rejected.lines == ['echo:Unknown command: "M42"']
+
+        io.close()
+        port.close()
+
+    assert BUSY in messages and TEMPERATURE in messages
+    assert io.rtts and io.errors == 0
+
+
+def test_open_firmware_detects_and_caches_without_fixed_sleep(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # firmware_cache.json
+    for firmware_type in ('marlin', 'grbl'):
+        with VirtualFirmware(firmware_type, time_scale=0) as firmware:
+            started = time.monotonic()
+            # GRBL sondé d'abord avec M115 (Marlin par défaut) : error:20 suffit à le reconnaître
+            port, detected, banner = open_firmware(firmware.port, 250000, reset=False)
+            assert time.monotonic() - started < 1.0
+            assert detected == firmware_type
+            port.close()
+        assert json.loads((tmp_path / "firmware_cache.json").read_text())[firmware.port] == firmware_type
+
+    with VirtualFirmware('grbl', time_scale=0) as firmware:
+        (tmp_path / "firmware_cache.json").write_text(json.dumps({firmware.port: 'grbl'}))
+        port, detected, banner = open_firmware(firmware.port, 250000)
+        assert detected == 'grbl' and banner[0].startswith("Grbl")
+        # Cache : sonde $I directement, aucune commande refusée
+        assert "M115" not in firmware.received
+        port.close()
+
+
+class SlowProbeFirmware(VirtualFirmware):
+    """Firmware qui répond à M115 après plus d'un intervalle de sonde."""
+
+    def execute(self, line):
+        if line == "M115":
+            time.sleep(0.15)
+        super().execute(line)
+
+
+def test_late_probe_replies_are_not_taken_for_later_acks(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with SlowProbeFirmware('marlin', time_scale=0) as firmware:
+        port, detected, _ = open_firmware(firmware.port, 250000, reset=False, probe_interval=0.1)
+        assert detected == 'marlin' and firmware.received.count("M115") >= 2
+        io = SerialIO(port).start()
+        # L'ok de la seconde sonde ne doit pas acquitter M114 à la place de sa propre réponse
+        position = io.request("M114", timeout=2)
+        assert position.ok and position.lines and position.lines[0].startswith("X:")
+        assert io.request("M400", timeout=2).lines == []
+        io.close()
+        port.close()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Tests de l'ordonnanceur de la simultanée (priorité au prochain plateau de la tournée)
+"""
+
+import os
+import shutil
+import sys
+from concurrent.futures import Future
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+# Add parent directory to path to import modules
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import chess_with_validation
+import simul_mode
+from simul_mode import SimulGame, SimulScheduler
+
+
+class ManualPool:
+    """Pool dont les recherches se terminent à la demande."""
+
+    def __init__(self, size):
+        self.size = size
+        self.submitted = []
+
+    def submit(self, fen):
+        future = Future()
+        self.submitted.append((fen, future))
+        return future
+
+
+def test_next_board_in_tour_is_searched_first():
+    pool = ManualPool(size=1)
+    scheduler = SimulScheduler(pool, n_boards=5)
+    scheduler.move_to(3)
+    for index in (0, 1, 2, 3):
+        scheduler.request(index, f"fen{index}")
+    # Le plateau 0 part tout de suite (moteur libre) ; les autres attendent
+    assert [fen for fen, _ in pool.submitted] == ["fen0"]
+
+    # Le joueur est au plateau 3 : ordre de la tournée 4, 0, 1, 2, 3
+    pool.submitted[0][1].set_result("e7e5")
+    assert scheduler.results() == [(0, "fen0", "e7e5")]
+    assert pool.submitted[-1][0] == "fen1"
+
+    # Le joueur avance au plateau 1 : le plateau 2 devient prioritaire sur le 3
+    scheduler.move_to(1)
+    pool.submitted[-1][1].set_result(None)
+    scheduler.results()
+    assert pool.submitted[-1][0] == "fen2"
+    assert not scheduler.busy(1) and scheduler.busy(2) and scheduler.busy(3)
+
+
+
+def test_boards_share_one_sprite_sheet(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # res/, next_move.txt
+    shutil.copytree(os.path.join(ROOT, "res"), tmp_path / "res")
+    loads = []
+
+    class CountingPiece(simul_mode.Piece):
+        def __init__(self, *args, **kwargs):
+            loads.append(args[0])
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(simul_mode, "Piece", CountingPiece)
+    monkeypatch.setattr(chess_with_validation, "Piece", CountingPiece)
+    try:
+        game = SimulGame(6, ManualPool(size=2), window_size=(640, 480))
+        assert len(loads) == 1
+        assert all(board.chess_pieces is game.pieces for board in game.boards)
+    finally:
+        pygame.quit()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Tests du firmware simulé (pty) : réponses Marlin/GRBL, planificateur, trajectoire, contrôleur sans carte
+"""
+
+import os
+import sys
+
+import serial
+
+# Add G-Code_Controller directory to path to import modules
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "G-Code_Controller"))
+
+from virtual_firmware import VirtualFirmware
+
+
+def exchange(port, line):
+    """Envoie une ligne et retourne les réponses jusqu'à ok / error."""
+    port.write((line + "\n").encode())
+    replies = []
+    while True:
+        reply = port.readline().decode().strip()
+        assert reply, f"pas de réponse à {line}"
+        replies.append(reply)
+        if reply == "ok" or reply.startswith("error"):
+            return replies
+
+
+def test_marlin_planner_position_and_servo_timing():
+    with VirtualFirmware('marlin', time_scale=0.01) as firmware:
+        port = serial.Serial(firmware.port, timeout=2)
+        banner = [port.readline().decode().strip() for _ in range(3)]
+        assert banner[0] == "start" and firmware.opened == 1
+
+        assert exchange(port, "G0 X100 Y50 F6000") == ["ok"]
+        assert exchange(port, "M280 P0 S168") == ["ok"]  # Servo : n'attend pas le mouvement
+        assert exchange(port, "M114")[0].startswith("X:100.00 Y:50.00 Z:0.00")
+        assert exchange(port, "M400") == ["ok"]
+        assert exchange(port, "G4 P500") == ["ok"]
+        assert exchange(port, "M42")[0] == 'echo:Unknown command: "M42"'
+        port.close()
+
+        # Le servo démarre pendant le mouvement : enregistré avant la fin du bloc
+        servo, move = firmware.toolpath
+        assert move['to'] == [100.0, 50.0, 0.0] and servo['moving']
+        assert servo['t'] < move['end_t']
+        assert abs(firmware.clock - (move['end_t'] + 0.5)) < 1e-3
+
+
+def test_grbl_status_reports_and_errors():
+    with VirtualFirmware('grbl', time_scale=0) as firmware:
+        port = serial.Serial(firmware.port, timeout=2)
+        assert port.readline().decode().startswith("Grbl 1.1h")
+        assert exchange(port, "$I")[0].startswith("[VER:1.1h")
+        assert exchange(port, "G0 X10 Y10") == ["ok"]
+        assert exchange(port, "G4 P0") == ["ok"]
+        port.write(b"?")
+        assert port.readline().decode().strip().startswith("<Idle|MPos:10.000,10.000,0.000")
+        assert exchange(port, "M400") == ["error:20"]
+        port.close()
+
+
+def test_controller_runs_unchanged_against_virtual_port(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # robot_state.json
+    from robot_chess_controller import ChessRobotController
+
+    with VirtualFirmware('marlin', time_scale=0) as firmware:
+        robot = ChessRobotController(port=firmware.port)
+        assert robot.connect()
+        robot.home_robot()
+        robot.execute_move('e2e4')
+        robot.disconnect()
+
+    x, y = robot.uci_to_coordinates('e4')
+    assert firmware.moves()[-1]['to'] == [round(x, 2), round(y, 2), robot.Z_SAFE]
+    assert [a['command'] for a in firmware.toolpath if a['type'] == 'action'] == [robot.GRAB_COMMAND, robot.RELEASE_COMMAND]
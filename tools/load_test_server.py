@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Client de charge pour game_server.py : simule N joueurs (N/2 parties) jouant des coups aléatoires.
+
+Usage:
+    python tools/load_test_server.py --players 40                 # serveur lancé dans ce processus
+    python tools/load_test_server.py --players 40 --connect 50600 # serveur déjà lancé
+    python tools/load_test_server.py --players 20 --engine-games 10
+    python tools/load_test_server.py --players 20 --spectators 50   # 50 spectateurs par partie
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+import chess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine_pool import EnginePool
+from game_server import GameServer
+
+
+class LoadPlayer:
+    """Joueur simulé : tient une copie du plateau et joue au hasard quand c'est son tour."""
+
+    def __init__(self, host, port, rng, max_plies):
+        self.host = host
+        self.port = port
+        self.rng = rng
+        self.max_plies = max_plies
+        self.board = chess.Board()
+        self.latencies = []
+        self.result = None
+        self.sent_at = None
+
+    async def connect(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    async def request(self, line):
+        self.writer.write((line + "\n").encode())
+        await self.writer.drain()
+        return (await self.reader.readline()).decode().strip()
+
+    async def send_move(self):
+        move = self.rng.choice(list(self.board.legal_moves))
+        self.sent_at = time.perf_counter()
+        self.writer.write(f"MOVE {self.game_id} {move.uci()}\n".encode())
+        await self.writer.drain()
+
+    async def play(self, game_id, color):
+        """Boucle de jeu : les événements MOVE/END et les réponses arrivent sur la même connexion."""
+        self.game_id = game_id
+        if self.board.turn == color:
+            await self.send_move()
+        while self.result is None and len(self.board.move_stack) < self.max_plies:
+            line = (await self.reader.readline()).decode().strip()
+            if not line:
+                break
+            parts = line.split()
+            if parts[0] == "MOVE" and parts[1] == game_id:
+                self.board.push_uci(parts[3])
+                if self.board.turn != color and self.sent_at is not None:
+                    # Écho de notre propre coup : aller-retour complet par le serveur
+                    self.latencies.append((time.perf_counter() - self.sent_at) * 1000)
+                    self.sent_at = None
+                elif self.board.turn == color and not self.board.is_game_over():
+                    await self.send_move()
+            elif parts[0] == "END":
+                self.result = parts[2]
+            elif parts[0] == "ERR":
+                print(f"[LOAD] {game_id}: {line}")
+                break
+        self.writer.write(b"QUIT\n")
+        await self.writer.drain()
+        self.writer.close()
+
+
+async def watch(host, port, game_id, received):
+    """Spectateur : compte les lignes reçues (instantané + événements) jusqu'à annulation."""
+    writer = None
+    try:
+        reader, writer = await asyncio.open_connection(host, port)
+        writer.write(f"WATCH {game_id}\n".encode())
+        while await reader.readline():
+            received[0] += 1
+    except asyncio.CancelledError:
+        pass
+    finally:
+        if writer:
+            writer.close()
+
+
+async def run_pair(host, port, seed, max_plies, engine, spectators=0, received=None):
+    rng = random.Random(seed)
+    white = LoadPlayer(host, port, rng, max_plies)
+    await white.connect()
+    game_id = (await white.request("NEW")).split()[-1]
+    await white.request(f"JOIN {game_id} white")
+    watchers = [asyncio.create_task(watch(host, port, game_id, received)) for _ in range(spectators)]
+    tasks = [white.play(game_id, chess.WHITE)]
+    players = [white]
+    if engine:
+        await white.request(f"ENGINE {game_id} black")
+    else:
+        black = LoadPlayer(host, port, rng, max_plies)
+        await black.connect()
+        await black.request(f"JOIN {game_id} black")
+        tasks.append(black.play(game_id, chess.BLACK))
+        players.append(black)
+    await asyncio.gather(*tasks)
+    await asyncio.sleep(0.1)  # Laisse les derniers événements atteindre les spectateurs
+    for task in watchers:
+        task.cancel()
+    await asyncio.gather(*watchers)
+    return players
+
+
+async def run_load(args):
+    server = None
+    pool = None
+    port = args.connect
+    if not port:
+        pool = EnginePool(args.pool_size)
+        server = await GameServer(port=0, engine_pool=pool).start()
+        port = server.port
+
+    n_pairs = args.players // 2
+    received = [0]
+    start = time.perf_counter()
+    pairs = await asyncio.gather(*(run_pair("127.0.0.1", port, args.seed + i, args.max_plies, i < args.engine_games,
+                                            args.spectators, received)
+                                   for i in range(n_pairs)))
+    elapsed = time.perf_counter() - start
+
+    if server:
+        await server.close()
+        pool.close()
+
+    players = [p for pair in pairs for p in pair]
+    latencies = sorted(l for p in players for l in p.latencies)
+    plies = sum(len(pair[0].board.move_stack) for pair in pairs)
+    finished = sum(1 for pair in pairs if pair[0].result)
+    print("=" * 50)
+    print(f"Joueurs: {len(players)}  parties: {n_pairs} ({finished} terminées) en {elapsed:.2f}s")
+    print(f"Débit: {plies / elapsed:.0f} demi-coups/s")
+    if latencies:
+        p50 = latencies[len(latencies) // 2]
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        print(f"Aller-retour MOVE: p50={p50:.2f} ms  p99={p99:.2f} ms  max={latencies[-1]:.2f} ms")
+    if args.spectators:
+        print(f"Spectateurs: {args.spectators * n_pairs}, {received[0]} lignes reçues")
+    print("=" * 50)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test de charge du serveur de parties")
+    parser.add_argument('--players', type=int, default=40, help="Nombre de joueurs simulés")
+    parser.add_argument('--engine-games', type=int, default=0, help="Parties jouées contre le pool de moteurs")
+    parser.add_argument('--max-plies', type=int, default=200)
+    parser.add_argument('--spectators', type=int, default=0, help="Spectateurs par partie")
+    parser.add_argument('--pool-size', type=int, default=4)
+    parser.add_argument('--connect', type=int, default=0, help="Port d'un serveur déjà lancé")
+    parser.add_argument('--seed', type=int, default=0)
+    asyncio.run(run_load(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
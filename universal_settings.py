@@ -54,6 +54,11 @@ class UniversalEngineSettings:
         except:
             return "legacy_stockfish"
 
+    def select_engine(self, engine_id):
+        """Sélectionne le moteur engine_id (lu par UniversalEngine à l'initialisation)"""
+        with open("selected_engine.txt", "w") as f:
+            f.write(engine_id)
+
     def select_engine_by_name(self, name_part):
         """Sélectionne un moteur dont le nom contient name_part (ex: 'Stockfish')"""
         # Chercher dans engine_settings ou selected_engine
@@ -3,6 +3,10 @@ from pygame.locals import *
 import queue
 
 class Utils:
+    def __init__(self):
+        # Discrete mouse actions ("press"/"release", position) fed by the event loop
+        self.actions = queue.Queue()
+
     def get_mouse_event(self):
         # get coordinates of the mouse
         position = pygame.mouse.get_pos()
@@ -21,3 +25,29 @@ class Utils:
             left_click = True
 
         return left_click
+
+    def handle_event(self, event):
+        """
+        Converts a pygame event into a discrete action.
+        Only left button transitions are kept: one click = one press + one release.
+        Returns True if the event was consumed.
+        """
+        if event.type == MOUSEBUTTONDOWN and event.button == 1:
+            self.actions.put(("press", event.pos))
+            return True
+        if event.type == MOUSEBUTTONUP and event.button == 1:
+            self.actions.put(("release", event.pos))
+            return True
+        return False
+
+    def get_action(self):
+        """Returns the next pending action or None."""
+        try:
+            return self.actions.get_nowait()
+        except queue.Empty:
+            return None
+
+    def clear_actions(self):
+        """Drops pending actions (e.g. clicks made while it was not our turn)."""
+        while self.get_action() is not None:
+            pass